@@ -1,4 +1,4 @@
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
 import { diagnoseFromSymptoms, getAllSymptoms } from '../utils/diagnosticEngine';
 import OfflineIndicator from '../components/common/OfflineIndicator';
 import LoadingSpinner from '../components/common/LoadingSpinner';
@@ -19,7 +19,11 @@ function SymptomChecker() {
   const [isLoading, setIsLoading] = useState(false); // Loading state
   const [searchTerm, setSearchTerm] = useState(''); // Search term for filtering symptoms
 
-  const allSymptoms = getAllSymptoms(); // Get all available symptoms
+  const [allSymptoms, setAllSymptoms] = useState([]); // All available symptoms, from the backend catalog
+
+  useEffect(() => {
+    getAllSymptoms().then(setAllSymptoms);
+  }, []);
 
   // Filter symptoms based on search term
   const filteredSymptoms = searchTerm
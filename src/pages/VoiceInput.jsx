@@ -1,5 +1,5 @@
 import { useState, useEffect, useRef } from 'react';
-import { diagnoseFromSymptoms } from '../utils/diagnosticEngine';
+import { diagnoseFromText } from '../utils/diagnosticEngine';
 import OfflineIndicator from '../components/common/OfflineIndicator';
 import LoadingSpinner from '../components/common/LoadingSpinner';
 import { useAppContext } from '../context/AppContext';
@@ -88,54 +88,14 @@ function VoiceInput() {
     setIsProcessing(true);
     setResult(null);
 
-    // Extract symptoms from transcript
-    const symptoms = [];
-    const commonSymptoms = [
-      'back_pain', 'constipation', 'abdominal_pain', 'diarrhoea', 'yellow_urine', 'fever', 'cough', 'headache',
-      'yellowing_of_eyes', 'acute_liver_failure', 'fluid_overload', 'swelling_of_stomach',
-      'swelled_lymph_nodes', 'malaise', 'blurred_and_distorted_vision', 'phlegm', 'throat_irritation',
-      'redness_of_eyes', 'sinus_pressure', 'runny_nose', 'congestion', 'chest_pain', 'weakness_in_limbs',
-      'fast_heart_rate', 'pain_during_bowel_movements', 'pain_in_anal_region', 'bloody_stool',
-      'irritation_in_anus', 'neck_pain', 'dizziness', 'cramps', 'bruising', 'obesity', 'swollen_legs',
-      'swollen_blood_vessels', 'puffy_face_and_eyes', 'enlarged_thyroid', 'brittle_nails',
-      'swollen_extremeties', 'excessive_hunger', 'extra_marital_contacts', 'drying_and_tingling_lips',
-      'slurred_speech', 'knee_pain', 'hip_joint_pain', 'muscle_weakness', 'stiff_neck', 'swelling_joints',
-      'movement_stiffness', 'spinning_movements', 'loss_of_balance', 'unsteadiness',
-      'weakness_of_one_body_side', 'loss_of_smell', 'bladder_discomfort', 'foul_smell_of_urine',
-      'continuous_feel_of_urine', 'passage_of_gases', 'internal_itching', 'toxic_look_(typhos)',
-      'depression', 'irritability', 'muscle_pain', 'altered_sensorium', 'red_spots_over_body', 'belly_pain',
-      'abnormal_menstruation', 'dischromic_patches', 'watering_from_eyes', 'increased_appetite', 'polyuria',
-      'family_history', 'mucoid_sputum', 'rusty_sputum', 'lack_of_concentration', 'visual_disturbances',
-      'receiving_blood_transfusion', 'receiving_unsterile_injections', 'coma', 'stomach_bleeding',
-      'distention_of_abdomen', 'history_of_alcohol_consumption', 'fluid_overload.1', 'blood_in_sputum',
-      'prominent_veins_on_calf', 'palpitations', 'painful_walking', 'pus_filled_pimples', 'blackheads',
-      'scurring', 'skin_peeling', 'silver_like_dusting', 'small_dents_in_nails', 'inflammatory_nails',
-      'blister', 'red_sore_around_nose', 'yellow_crust_ooze'
-    ];
-
-    commonSymptoms.forEach((symptom) => {
-      if (transcript.toLowerCase().includes(symptom)) {
-        symptoms.push(symptom.replace(' ', '_'));
-      }
-    });
-
-    // Remove duplicate symptoms using Set
-    const uniqueSymptoms = [...new Set(symptoms)];
-
-    // If no symptoms found, use a fallback
-    if (uniqueSymptoms.length === 0) {
-      setIsProcessing(false);
-      setError('No recognizable symptoms found in your description. Please try again with more specific symptoms.');
-      return;
-    }
-
-    // Process with diagnostic engine
+    // Symptoms are extracted from the transcript by the backend
     try {
-      const diagnosisResult = await diagnoseFromSymptoms(uniqueSymptoms);
-      setResult({
-        ...diagnosisResult,
-        detectedSymptoms: uniqueSymptoms, // Add unique detected symptoms to the result
-      });
+      const diagnosisResult = await diagnoseFromText(transcript);
+      if (!diagnosisResult.success) {
+        setError(diagnosisResult.message);
+        return;
+      }
+      setResult(diagnosisResult);
     } catch (err) {
       setError('An error occurred while processing your symptoms. Please try again.');
     } finally {
@@ -1,688 +1,742 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Request, request, jsonify, g
 from flask_cors import CORS
-import pandas as pd
-import numpy as np
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.naive_bayes import GaussianNB
 import logging
-from sklearn.utils import shuffle
+import hmac
+import os
+import random
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+import bitset
+import capture
+import imaging
+import metrics
+import model_store
+import payloads
+import shadow
+import train
+from batcher import MicroBatcher
+from cache import LRUCache
+from conditions import disease, disease_details, disease_urgency, symptom_synonyms, urgency_levels
+from inference import MODEL_NAMES, SymptomModels, base_feature, invalid_symptoms, parse_weights, symptom_id
+from retrain import CaseLog, Retrainer
+from questions import planner_from_index
+from similar import load_index
+from text_match import SymptomMatcher
+
+class UploadRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # Uploaded files are streamed to disk, never buffered in memory, so
+        # the image workers can open them by path. The file is removed when
+        # the request is closed.
+        os.makedirs(imaging.UPLOAD_DIR, exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=imaging.UPLOAD_DIR, prefix="upload-")
 
 # Initialize Flask app
 app = Flask(__name__)
+app.request_class = UploadRequest
 CORS(app)  # Enable CORS for all routes
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"))
 logger = logging.getLogger(__name__)
 
-# Load datasets
-try:
-    df = pd.read_csv("Training.csv")
-    tr = pd.read_csv("Testing.csv")
-    logger.info("Datasets loaded successfully.")
-    logger.info(f"Training data sample:\n{df.head()}")
-    logger.info(f"Testing data sample:\n{tr.head()}")
-except Exception as e:
-    logger.error(f"Error loading datasets: {e}")
-    raise
-
-# Prepare data
-l1 = [
-    'back_pain', 'constipation', 'abdominal_pain', 'diarrhoea', 'mild_fever', 'yellow_urine',
-    'yellowing_of_eyes', 'acute_liver_failure', 'fluid_overload', 'swelling_of_stomach',
-    'swelled_lymph_nodes', 'malaise', 'blurred_and_distorted_vision', 'phlegm', 'throat_irritation',
-    'redness_of_eyes', 'sinus_pressure', 'runny_nose', 'congestion', 'chest_pain', 'weakness_in_limbs',
-    'fast_heart_rate', 'pain_during_bowel_movements', 'pain_in_anal_region', 'bloody_stool',
-    'irritation_in_anus', 'neck_pain', 'dizziness', 'cramps', 'bruising', 'obesity', 'swollen_legs',
-    'swollen_blood_vessels', 'puffy_face_and_eyes', 'enlarged_thyroid', 'brittle_nails',
-    'swollen_extremeties', 'excessive_hunger', 'extra_marital_contacts', 'drying_and_tingling_lips',
-    'slurred_speech', 'knee_pain', 'hip_joint_pain', 'muscle_weakness', 'stiff_neck', 'swelling_joints',
-    'movement_stiffness', 'spinning_movements', 'loss_of_balance', 'unsteadiness',
-    'weakness_of_one_body_side', 'loss_of_smell', 'bladder_discomfort', 'foul_smell_of urine',
-    'continuous_feel_of_urine', 'passage_of_gases', 'internal_itching', 'toxic_look_(typhos)',
-    'depression', 'irritability', 'muscle_pain', 'altered_sensorium', 'red_spots_over_body', 'belly_pain',
-    'abnormal_menstruation', 'dischromic _patches', 'watering_from_eyes', 'increased_appetite', 'polyuria',
-    'family_history', 'mucoid_sputum', 'rusty_sputum', 'lack_of_concentration', 'visual_disturbances',
-    'receiving_blood_transfusion', 'receiving_unsterile_injections', 'coma', 'stomach_bleeding',
-    'distention_of_abdomen', 'history_of_alcohol_consumption', 'fluid_overload.1', 'blood_in_sputum',
-    'prominent_veins_on_calf', 'palpitations', 'painful_walking', 'pus_filled_pimples', 'blackheads',
-    'scurring', 'skin_peeling', 'silver_like_dusting', 'small_dents_in_nails', 'inflammatory_nails',
-    'blister', 'red_sore_around_nose', 'yellow_crust_ooze'
-]
-
-# Disease list
-disease = [
-    'Fungal infection', 'Allergy', 'GERD', 'Chronic cholestasis', 'Drug Reaction',
-    'Peptic ulcer disease', 'AIDS', 'Diabetes', 'Gastroenteritis', 'Bronchial Asthma', 'Hypertension',
-    'Migraine', 'Cervical spondylosis', 'Paralysis (brain hemorrhage)', 'Jaundice', 'Malaria', 'Chicken pox',
-    'Dengue', 'Typhoid', 'Hepatitis A', 'Hepatitis B', 'Hepatitis C', 'Hepatitis D', 'Hepatitis E',
-    'Alcoholic hepatitis', 'Tuberculosis', 'Common Cold', 'Pneumonia', 'Dimorphic hemorrhoids (piles)',
-    'Heart attack', 'Varicose veins', 'Hypothyroidism', 'Hyperthyroidism', 'Hypoglycemia', 'Osteoarthritis',
-    'Arthritis', '(Vertigo) Paroxysmal Positional Vertigo', 'Acne', 'Urinary tract infection', 'Psoriasis',
-    'Impetigo'
-]
-
-disease_details = {
-    "Fungal infection": {
-        "description": "A fungal infection is caused by fungi that invade the skin, nails, or hair.",
-        "recommendations": [
-            "Use antifungal creams or ointments.",
-            "Keep the affected area clean and dry.",
-            "Consult a doctor if the infection persists."
-        ],
-        "tests": [
-            "Skin scraping for microscopic examination.",
-            "Fungal culture test."
-        ]
-    },
-    "Allergy": {
-        "description": "An allergy is an immune system response to a foreign substance that's not typically harmful to your body.",
-        "recommendations": [
-            "Avoid allergens that trigger your symptoms.",
-            "Take antihistamines as prescribed.",
-            "Consult an allergist for further testing."
-        ],
-        "tests": [
-            "Skin prick test.",
-            "Blood test (IgE levels)."
-        ]
-    },
-    "GERD": {
-        "description": "Gastroesophageal reflux disease (GERD) is a chronic condition where stomach acid flows back into the esophagus, causing irritation.",
-        "recommendations": [
-            "Avoid spicy, fatty, or acidic foods.",
-            "Elevate the head of your bed while sleeping.",
-            "Consult a gastroenterologist for further diagnosis."
-        ],
-        "tests": [
-            "Endoscopy.",
-            "Esophageal pH monitoring."
-        ]
-    },
-    "Chronic cholestasis": {
-        "description": "Chronic cholestasis is a condition where bile flow from the liver is reduced or blocked, leading to liver damage.",
-        "recommendations": [
-            "Consult a hepatologist (liver specialist) for further diagnosis.",
-            "Avoid alcohol and fatty foods.",
-            "Monitor liver function regularly."
-        ],
-        "tests": [
-            "Liver function tests (LFTs).",
-            "Abdominal ultrasound."
-        ]
-    },
-    "Drug Reaction": {
-        "description": "A drug reaction occurs when the body has an adverse response to a medication.",
-        "recommendations": [
-            "Stop taking the medication immediately.",
-            "Consult a doctor for further diagnosis.",
-            "Monitor for severe symptoms like difficulty breathing."
-        ],
-        "tests": [
-            "Allergy testing.",
-            "Blood tests to check for immune response."
-        ]
-    },
-    "Peptic ulcer disease": {
-        "description": "Peptic ulcer disease involves sores in the lining of the stomach or the upper part of the small intestine.",
-        "recommendations": [
-            "Avoid spicy foods and alcohol.",
-            "Take prescribed medications like proton pump inhibitors.",
-            "Consult a gastroenterologist for further diagnosis."
-        ],
-        "tests": [
-            "Endoscopy.",
-            "Helicobacter pylori (H. pylori) test."
-        ]
-    },
-    "AIDS": {
-        "description": "Acquired Immunodeficiency Syndrome (AIDS) is a chronic, potentially life-threatening condition caused by the human immunodeficiency virus (HIV).",
-        "recommendations": [
-            "Follow antiretroviral therapy (ART) as prescribed.",
-            "Practice safe sex and avoid sharing needles.",
-            "Consult an infectious disease specialist for further diagnosis."
-        ],
-        "tests": [
-            "HIV antibody test.",
-            "Viral load test."
-        ]
-    },
-    "Diabetes": {
-        "description": "Diabetes is a chronic condition that affects how your body processes blood sugar (glucose).",
-        "recommendations": [
-            "Monitor blood sugar levels regularly.",
-            "Follow a healthy diet and exercise routine.",
-            "Consult an endocrinologist for further diagnosis."
-        ],
-        "tests": [
-            "Fasting blood sugar test.",
-            "HbA1c test."
-        ]
-    },
-    "Gastroenteritis": {
-        "description": "Gastroenteritis is an inflammation of the stomach and intestines, typically due to infection.",
-        "recommendations": [
-            "Stay hydrated and drink plenty of fluids.",
-            "Avoid solid foods until vomiting stops.",
-            "Consult a doctor if symptoms persist."
-        ],
-        "tests": [
-            "Stool test for pathogens.",
-            "Blood tests to check for dehydration."
-        ]
-    },
-    "Bronchial Asthma": {
-        "description": "Bronchial asthma is a chronic inflammatory disease of the airways that causes wheezing, breathlessness, and coughing.",
-        "recommendations": [
-            "Use inhalers as prescribed.",
-            "Avoid triggers like smoke, pollen, and dust.",
-            "Consult a pulmonologist for further diagnosis."
-        ],
-        "tests": [
-            "Spirometry.",
-            "Peak flow test."
-        ]
-    },
-    "Hypertension": {
-        "description": "Hypertension (high blood pressure) is a condition where the force of blood against the artery walls is too high.",
-        "recommendations": [
-            "Follow a low-sodium diet and exercise regularly.",
-            "Take prescribed blood pressure medications.",
-            "Consult a cardiologist for further diagnosis."
-        ],
-        "tests": [
-            "Blood pressure measurement.",
-            "Blood tests to check for underlying conditions."
-        ]
-    },
-    "Migraine": {
-        "description": "A migraine is a severe headache often accompanied by nausea, vomiting, and sensitivity to light and sound.",
-        "recommendations": [
-            "Avoid triggers like stress, certain foods, and lack of sleep.",
-            "Take prescribed migraine medications.",
-            "Consult a neurologist for further diagnosis."
-        ],
-        "tests": [
-            "Neurological examination.",
-            "MRI or CT scan to rule out other conditions."
-        ]
-    },
-    "Cervical spondylosis": {
-        "description": "Cervical spondylosis is a degenerative condition affecting the neck vertebrae and discs.",
-        "recommendations": [
-            "Practice good posture and neck exercises.",
-            "Use pain relievers as prescribed.",
-            "Consult an orthopedic specialist for further diagnosis."
-        ],
-        "tests": [
-            "X-ray of the cervical spine.",
-            "MRI or CT scan."
-        ]
-    },
-    "Paralysis (brain hemorrhage)": {
-        "description": "Paralysis due to brain hemorrhage occurs when bleeding in the brain damages nerve cells, leading to loss of muscle function.",
-        "recommendations": [
-            "Seek immediate medical attention.",
-            "Follow a rehabilitation program as prescribed.",
-            "Consult a neurologist for further diagnosis."
-        ],
-        "tests": [
-            "CT scan or MRI of the brain.",
-            "Neurological examination."
-        ]
-    },
-    "Jaundice": {
-        "description": "Jaundice is a condition where the skin and eyes turn yellow due to high bilirubin levels in the blood.",
-        "recommendations": [
-            "Avoid alcohol and fatty foods.",
-            "Stay hydrated and rest.",
-            "Consult a hepatologist for further diagnosis."
-        ],
-        "tests": [
-            "Liver function tests (LFTs).",
-            "Bilirubin level test."
-        ]
-    },
-    "Malaria": {
-        "description": "Malaria is a mosquito-borne infectious disease that causes fever, chills, and flu-like symptoms.",
-        "recommendations": [
-            "Take antimalarial medications as prescribed.",
-            "Use mosquito nets and repellents to prevent bites.",
-            "Consult an infectious disease specialist for further diagnosis."
-        ],
-        "tests": [
-            "Blood smear test.",
-            "Rapid diagnostic test (RDT)."
-        ]
-    },
-    "Chicken pox": {
-        "description": "Chicken pox is a highly contagious viral infection characterized by an itchy rash and red spots or blisters.",
-        "recommendations": [
-            "Keep the skin clean and avoid scratching.",
-            "Use calamine lotion to relieve itching.",
-            "Consult a doctor for antiviral medication."
-        ],
-        "tests": [
-            "Clinical examination of the rash.",
-            "PCR test for varicella-zoster virus."
-        ]
-    },
-    "Dengue": {
-        "description": "Dengue is a mosquito-borne viral infection that causes high fever, severe headache, and joint pain.",
-        "recommendations": [
-            "Stay hydrated and rest.",
-            "Avoid aspirin and use paracetamol for fever.",
-            "Consult a doctor if symptoms worsen."
-        ],
-        "tests": [
-            "NS1 antigen test.",
-            "Dengue IgM and IgG antibody tests."
-        ]
-    },
-    "Typhoid": {
-        "description": "Typhoid is a bacterial infection caused by Salmonella typhi, leading to high fever, abdominal pain, and weakness.",
-        "recommendations": [
-            "Take antibiotics as prescribed.",
-            "Maintain good hygiene and drink clean water.",
-            "Consult a doctor for further diagnosis."
-        ],
-        "tests": [
-            "Widal test.",
-            "Blood culture test."
-        ]
-    },
-    "Hepatitis A": {
-        "description": "Hepatitis A is a viral infection that affects the liver and is spread through contaminated food or water.",
-        "recommendations": [
-            "Get vaccinated against Hepatitis A.",
-            "Avoid alcohol and fatty foods.",
-            "Consult a hepatologist for further diagnosis."
-        ],
-        "tests": [
-            "Hepatitis A IgM antibody test.",
-            "Liver function tests (LFTs)."
-        ]
-    },
-    "Hepatitis B": {
-        "description": "Hepatitis B is a viral infection that attacks the liver and can cause both acute and chronic disease.",
-        "recommendations": [
-            "Get vaccinated against Hepatitis B.",
-            "Avoid alcohol and fatty foods.",
-            "Consult a hepatologist for further diagnosis."
-        ],
-        "tests": [
-            "Hepatitis B surface antigen (HBsAg) test.",
-            "Liver function tests (LFTs)."
-        ]
-    },
-    "Hepatitis C": {
-        "description": "Hepatitis C is a viral infection that causes liver inflammation and can lead to serious liver damage.",
-        "recommendations": [
-            "Avoid sharing needles or personal items like razors.",
-            "Take antiviral medications as prescribed.",
-            "Consult a hepatologist for further diagnosis."
-        ],
-        "tests": [
-            "Hepatitis C antibody test.",
-            "HCV RNA test."
-        ]
-    },
-    "Hepatitis D": {
-        "description": "Hepatitis D is a viral infection that occurs only in people who are also infected with Hepatitis B.",
-        "recommendations": [
-            "Get vaccinated against Hepatitis B to prevent Hepatitis D.",
-            "Avoid alcohol and fatty foods.",
-            "Consult a hepatologist for further diagnosis."
-        ],
-        "tests": [
-            "Hepatitis D antibody test.",
-            "Liver function tests (LFTs)."
-        ]
-    },
-    "Hepatitis E": {
-        "description": "Hepatitis E is a viral infection that affects the liver and is spread through contaminated water.",
-        "recommendations": [
-            "Drink clean and safe water.",
-            "Avoid alcohol and fatty foods.",
-            "Consult a hepatologist for further diagnosis."
-        ],
-        "tests": [
-            "Hepatitis E IgM antibody test.",
-            "Liver function tests (LFTs)."
-        ]
-    },
-    "Alcoholic hepatitis": {
-        "description": "Alcoholic hepatitis is liver inflammation caused by excessive alcohol consumption.",
-        "recommendations": [
-            "Stop drinking alcohol immediately.",
-            "Follow a healthy diet and lifestyle.",
-            "Consult a hepatologist for further diagnosis."
-        ],
-        "tests": [
-            "Liver function tests (LFTs).",
-            "Abdominal ultrasound."
-        ]
-    },
-    "Tuberculosis": {
-        "description": "Tuberculosis (TB) is a bacterial infection that primarily affects the lungs but can spread to other organs.",
-        "recommendations": [
-            "Take prescribed antibiotics for the full course.",
-            "Practice good hygiene and cover your mouth when coughing.",
-            "Consult an infectious disease specialist for further diagnosis."
-        ],
-        "tests": [
-            "Tuberculin skin test (TST).",
-            "Sputum test for acid-fast bacilli (AFB)."
-        ]
-    },
-    "Common Cold": {
-        "description": "The common cold is a viral infection of the upper respiratory tract, causing symptoms like a runny nose and sore throat.",
-        "recommendations": [
-            "Stay hydrated and rest.",
-            "Use over-the-counter cold medications.",
-            "Consult a doctor if symptoms persist."
-        ],
-        "tests": [
-            "Clinical examination.",
-            "No specific test required."
-        ]
-    },
-    "Pneumonia": {
-        "description": "Pneumonia is an infection that inflames the air sacs in one or both lungs, causing cough, fever, and difficulty breathing.",
-        "recommendations": [
-            "Take prescribed antibiotics.",
-            "Stay hydrated and rest.",
-            "Consult a pulmonologist for further diagnosis."
-        ],
-        "tests": [
-            "Chest X-ray.",
-            "Sputum culture."
-        ]
-    },
-    "Dimorphic hemorrhoids (piles)": {
-        "description": "Hemorrhoids are swollen veins in the lower rectum and anus, causing discomfort and bleeding.",
-        "recommendations": [
-            "Eat a high-fiber diet and stay hydrated.",
-            "Use over-the-counter creams or ointments.",
-            "Consult a gastroenterologist for further diagnosis."
-        ],
-        "tests": [
-            "Digital rectal examination.",
-            "Anoscopy."
-        ]
-    },
-    "Heart attack": {
-        "description": "A heart attack occurs when blood flow to the heart is blocked, causing damage to the heart muscle.",
-        "recommendations": [
-            "Seek immediate medical attention.",
-            "Follow a heart-healthy diet and lifestyle.",
-            "Consult a cardiologist for further diagnosis."
-        ],
-        "tests": [
-            "Electrocardiogram (ECG).",
-            "Cardiac enzyme tests."
-        ]
-    },
-    "Varicose veins": {
-        "description": "Varicose veins are swollen, twisted veins that are visible just under the surface of the skin.",
-        "recommendations": [
-            "Wear compression stockings.",
-            "Elevate your legs to reduce swelling.",
-            "Consult a vascular specialist for further diagnosis."
-        ],
-        "tests": [
-            "Doppler ultrasound.",
-            "Venography."
-        ]
-    },
-    "Hypothyroidism": {
-        "description": "Hypothyroidism is a condition where the thyroid gland does not produce enough thyroid hormone.",
-        "recommendations": [
-            "Take prescribed thyroid hormone replacement therapy.",
-            "Follow a healthy diet and exercise routine.",
-            "Consult an endocrinologist for further diagnosis."
-        ],
-        "tests": [
-            "Thyroid-stimulating hormone (TSH) test.",
-            "Free T4 test."
-        ]
-    },
-    "Hyperthyroidism": {
-        "description": "Hyperthyroidism is a condition where the thyroid gland produces too much thyroid hormone.",
-        "recommendations": [
-            "Take prescribed antithyroid medications.",
-            "Avoid iodine-rich foods.",
-            "Consult an endocrinologist for further diagnosis."
-        ],
-        "tests": [
-            "Thyroid-stimulating hormone (TSH) test.",
-            "Free T4 and T3 tests."
-        ]
-    },
-    "Hypoglycemia": {
-        "description": "Hypoglycemia is a condition where blood sugar levels drop too low, causing symptoms like dizziness and confusion.",
-        "recommendations": [
-            "Eat small, frequent meals.",
-            "Carry a source of fast-acting sugar (e.g., glucose tablets).",
-            "Consult an endocrinologist for further diagnosis."
-        ],
-        "tests": [
-            "Blood glucose test.",
-            "Fasting blood sugar test."
-        ]
-    },
-    "Osteoarthritis": {
-        "description": "Osteoarthritis is a degenerative joint disease that causes pain, stiffness, and swelling in the joints.",
-        "recommendations": [
-            "Maintain a healthy weight to reduce joint stress.",
-            "Use pain relievers and anti-inflammatory medications.",
-            "Consult an orthopedic specialist for further diagnosis."
-        ],
-        "tests": [
-            "X-ray of the affected joint.",
-            "MRI or CT scan."
-        ]
-    },
-    "Arthritis": {
-        "description": "Arthritis is inflammation of the joints, causing pain and stiffness.",
-        "recommendations": [
-            "Exercise regularly to maintain joint flexibility.",
-            "Use pain relievers and anti-inflammatory medications.",
-            "Consult a rheumatologist for further diagnosis."
-        ],
-        "tests": [
-            "Blood tests (e.g., rheumatoid factor, anti-CCP).",
-            "X-ray or MRI of the affected joints."
-        ]
-    },
-    "(Vertigo) Paroxysmal Positional Vertigo": {
-        "description": "Vertigo is a sensation of spinning or dizziness, often caused by inner ear problems.",
-        "recommendations": [
-            "Perform vestibular rehabilitation exercises.",
-            "Avoid sudden head movements.",
-            "Consult an ENT specialist for further diagnosis."
-        ],
-        "tests": [
-            "Dix-Hallpike maneuver.",
-            "Videonystagmography (VNG)."
-        ]
-    },
-    "Acne": {
-        "description": "Acne is a skin condition that occurs when hair follicles become clogged with oil and dead skin cells.",
-        "recommendations": [
-            "Wash your face twice daily with a gentle cleanser.",
-            "Use over-the-counter acne treatments.",
-            "Consult a dermatologist for further diagnosis."
-        ],
-        "tests": [
-            "Clinical examination.",
-            "No specific test required."
-        ]
-    },
-    "Urinary tract infection": {
-        "description": "A urinary tract infection (UTI) is an infection in any part of the urinary system, including kidneys, bladder, or urethra.",
-        "recommendations": [
-            "Drink plenty of water to flush out bacteria.",
-            "Take prescribed antibiotics.",
-            "Consult a urologist for further diagnosis."
-        ],
-        "tests": [
-            "Urinalysis.",
-            "Urine culture."
-        ]
-    },
-    "Psoriasis": {
-        "description": "Psoriasis is a chronic skin condition that causes red, itchy, and scaly patches.",
-        "recommendations": [
-            "Use topical treatments like corticosteroids.",
-            "Avoid triggers like stress and alcohol.",
-            "Consult a dermatologist for further diagnosis."
-        ],
-        "tests": [
-            "Clinical examination.",
-            "Skin biopsy."
-        ]
-    },
-    "Impetigo": {
-        "description": "Impetigo is a highly contagious skin infection that causes red sores and blisters.",
-        "recommendations": [
-            "Keep the affected area clean and dry.",
-            "Use prescribed antibiotic creams or ointments.",
-            "Consult a dermatologist for further diagnosis."
-        ],
-        "tests": [
-            "Clinical examination.",
-            "Bacterial culture from the sores."
-        ]
-    }
-}
-
-# Create disease to integer mapping
-disease_to_int = {disease: i for i, disease in enumerate(disease)}
-
-# Map prognosis to integers
-try:
-    df = pd.read_csv("Training.csv")
-    tr = pd.read_csv("Testing.csv")
-    logger.info("Datasets loaded successfully.")
-except Exception as e:
-    logger.error(f"Error loading datasets: {e}")
-    raise
-
-# Data cleaning pipeline
-def clean_prognosis(dataframe):
-    # Convert to string and clean
-    df_clean = dataframe.copy()
-    df_clean['prognosis'] = df_clean['prognosis'].astype(str).str.strip()
-    df_clean['prognosis'] = df_clean['prognosis'].replace(['', 'nan'], np.nan)
-    df_clean = df_clean.dropna(subset=['prognosis'])
-    df_clean = df_clean[df_clean['prognosis'].isin(disease)]
-    return df_clean
-
-df = clean_prognosis(df)
-tr = clean_prognosis(tr)
-
-# Create mapping and convert to integers
-disease_to_int = {d: i for i, d in enumerate(disease)}
-df['prognosis'] = df['prognosis'].map(disease_to_int).astype(int)
-tr['prognosis'] = tr['prognosis'].map(disease_to_int).astype(int)
-
-# Verify no NaN values remain
-assert df['prognosis'].isna().sum() == 0
-assert tr['prognosis'].isna().sum() == 0
-
-# Shuffle data to avoid order bias
-df = shuffle(df, random_state=42)
-tr = shuffle(tr, random_state=42)
-
-# For memory optimization
-df = df.sample(frac=0.7, random_state=42) if len(df) > 2000 else df
-tr = tr.sample(frac=0.7, random_state=42) if len(tr) > 500 else tr
-
-# Prepare features and target
-X = df[l1]
-y = df["prognosis"].values.ravel()
-
-X_test = tr[l1]
-y_test = tr["prognosis"].values.ravel()
-
-# Train models
-try:
-    logger.info("Training models...")
-    clf3 = DecisionTreeClassifier(max_depth=5, random_state=42)
-    clf3.fit(X, y)
-    
-    clf4 = RandomForestClassifier(n_estimators=50, max_depth=5, random_state=42)
-    clf4.fit(X, y)
-    
-    gnb = GaussianNB()
-    gnb.fit(X, y)
-    logger.info("Models trained successfully")
-except Exception as e:
-    logger.error(f"Error training models: {e}")
-    raise
+# Per-request logs are opt-in: with LOG_LEVEL=DEBUG, this fraction of
+# predictions is logged
+LOG_SAMPLE_RATE = float(os.environ.get("LOG_SAMPLE_RATE", "0"))
+
+def log_sampled():
+    return LOG_SAMPLE_RATE > 0 and random.random() < LOG_SAMPLE_RATE and logger.isEnabledFor(logging.DEBUG)
+
+# "sklearn" runs the fitted estimators directly; "compiled" serves them from
+# flattened NumPy arrays (see compiled.py) after checking they agree on Testing.csv
+INFERENCE_ENGINE = os.environ.get("INFERENCE_ENGINE", "sklearn")
+
+# Relative weight of each model in the ensemble, e.g. "dt:1,rf:2,nb:1"
+ENSEMBLE_WEIGHTS = parse_weights(os.environ.get("ENSEMBLE_WEIGHTS", ""))
+
+# Number of ranked conditions returned per case unless the request asks for topK
+DEFAULT_TOP_K = int(os.environ.get("TOP_K", "3"))
+
+# Responses of /api/predict keyed on the recognized symptom set; 0 disables
+response_cache = LRUCache(int(os.environ.get("RESPONSE_CACHE_SIZE", "4096")))
+metrics.registry.register(metrics.Gauge(
+    "symptom_api_cache", "Response cache counters", ("field",),
+    callback=lambda: {(field,): response_cache.stats()[field] for field in ("hits", "misses", "size", "hitRate")},
+))
+
+def serving_models_for(artifact, model_version):
+    serving_models = artifact["models"]
+    serving_engine = "sklearn"
+    if INFERENCE_ENGINE == "compiled":
+        import compiled
+        try:
+            if "sha256" in artifact["manifest"]:
+                serving_models = compiled.load_compiled(
+                    artifact["models"], artifact["features"], model_store.DEFAULT_ARTIFACT_DIR, artifact["manifest"]
+                )
+            else:
+                serving_models = compiled.compile_checked(artifact["models"], artifact["features"])
+            serving_engine = "compiled"
+        except ValueError as e:
+            logger.error(f"Compiled models disagree with sklearn, using sklearn: {e}")
+    models = SymptomModels(
+        serving_models, artifact["features"], artifact["labels"], weights=ENSEMBLE_WEIGHTS, version=model_version,
+        calibration=artifact.get("calibration"),
+    )
+    models.observe = metrics.stage_seconds.observe
+    return models, serving_engine
+
+# The served models, their artifact and the text matcher are replaced together
+# by activate(). Handlers read symptom_models once per request, so a swap never
+# affects a prediction that is already running.
+activate_lock = threading.Lock()
+artifact = None
+symptom_models = None
+symptom_matcher = None
+# /api/catalog documents for the served features (see payloads.py)
+catalog = None
+
+# Index of recorded cases for /api/similar-cases and the symptom frequencies
+# for /api/next-question derived from it, built on first use and rebuilt
+# after every model swap so appended cases are included
+case_index = None
+question_planner = None
+case_index_lock = threading.Lock()
+
+def activate(new_artifact):
+    global artifact, symptom_models, symptom_matcher, catalog, case_index, question_planner
+    with activate_lock:
+        model_version = new_artifact["manifest"]["model_version"]
+        if symptom_models is not None and symptom_models.version == model_version:
+            return
+        models, serving_engine = serving_models_for(new_artifact, model_version)
+        matcher = symptom_matcher
+        new_catalog = catalog
+        if matcher is None or models.features != symptom_models.features:
+            # Free-text extraction of the model's symptom features for /api/predict/text
+            matcher = SymptomMatcher(models.features, symptom_synonyms)
+            new_catalog = payloads.Catalog(
+                models.features, disease, disease_details, disease_urgency, urgency_levels, symptom_synonyms
+            )
+        # Bind the cache first: responses from the old models are then dropped
+        # by put(), and lookups only ever see entries from the new models
+        response_cache.bind(model_version)
+        artifact = new_artifact
+        symptom_models = models
+        symptom_matcher = matcher
+        catalog = new_catalog
+        case_index = None
+        question_planner = None
+        metrics.model_info.clear()
+        metrics.model_info.set(1, model_version, serving_engine)
+        logger.info(f"Serving model version {model_version} ({serving_engine})")
+
+# Labelled cases posted to /api/cases are logged and trained on incrementally
+# (see retrain.py). The endpoint is disabled unless RETRAIN_TOKEN is set.
+RETRAIN_TOKEN = os.environ.get("RETRAIN_TOKEN", "")
+retrainer = None
+
+# "eager" loads the models while the app is imported. "background" imports
+# only what serving needs, answers /healthz at once and loads the models on
+# a thread; the model endpoints return 503 until /readyz reports ready.
+STARTUP_MODE = os.environ.get("STARTUP_MODE", "eager")
+models_ready = threading.Event()
+load_error = None
+
+# Candidate model scoring a copy of the /api/predict traffic on its own
+# thread when SHADOW_ARTIFACT_DIR is set (see shadow.py)
+shadow_evaluator = None
+metrics.registry.register(metrics.Gauge(
+    "symptom_api_shadow", "Shadow model counters and agreement with the served models", ("field",),
+    callback=lambda: {} if shadow_evaluator is None else {
+        (field,): value for field, value in shadow_evaluator.counters().items() if value is not None
+    },
+))
+
+def load_shadow():
+    # A broken candidate must not keep the served models from loading
+    global shadow_evaluator
+    try:
+        shadow_evaluator = shadow.load_evaluator(disease, weights=ENSEMBLE_WEIGHTS)
+    except Exception as e:
+        logger.error(f"Shadow model not loaded: {e}")
+
+def load_models():
+    # Load the fitted models exported by train.py, training in-process only
+    # when no usable artifact is available. Plain NumPy model arrays are
+    # memory-mapped from the payload and shared between worker processes;
+    # sklearn trees keep their nodes in process memory (the compiled engine
+    # memory-maps those too).
+    global retrainer
+    load_started = time.perf_counter()
+    try:
+        initial_artifact = model_store.load_artifact(labels=disease, mmap_mode="r")
+        logger.info(f"Loaded model artifact {initial_artifact['manifest']['model_version']}")
+    except model_store.ArtifactError as e:
+        logger.warning(f"{e}; training models at startup. Run train.py to export an artifact.")
+        try:
+            initial_artifact = train.build_artifact()
+            initial_artifact["manifest"] = {"model_version": "in-process"}
+        except Exception as e:
+            logger.error(f"Error training models: {e}")
+            raise
+    activate(initial_artifact)
+    retrainer = Retrainer(activate, CaseLog(train.APPENDED_CSV, symptom_models.features))
+    load_shadow()
+    metrics.model_load_seconds.set(round(time.perf_counter() - load_started, 6))
+    models_ready.set()
+
+# Follow artifacts published by train.py or by the retrainer of any worker;
+# 0 disables polling
+ARTIFACT_POLL_SECONDS = float(os.environ.get("ARTIFACT_POLL_SECONDS", "5"))
+artifact_watcher = model_store.ArtifactWatcher(
+    activate, lambda: symptom_models.version, interval=ARTIFACT_POLL_SECONDS, labels=disease, mmap_mode="r"
+)
+
+def load_in_background():
+    global load_error
+    try:
+        load_models()
+    except Exception as e:
+        load_error = str(e)
+        logger.error(f"Model loading failed: {e}")
+        return
+    if ARTIFACT_POLL_SECONDS > 0:
+        artifact_watcher.start()
+
+def start_background_tasks():
+    # Threads do not survive fork. When a master process preloads the app
+    # (PRELOAD_APP=1, see gunicorn.conf.py) each worker calls this after the
+    # fork instead.
+    if not models_ready.is_set():
+        threading.Thread(target=load_in_background, name="model-loader", daemon=True).start()
+    elif ARTIFACT_POLL_SECONDS > 0:
+        artifact_watcher.start()
+
+if STARTUP_MODE != "background":
+    load_models()
+if os.environ.get("PRELOAD_APP") != "1":
+    start_background_tasks()
+
+# Longest transcript accepted by /api/predict/text
+MAX_TEXT_CHARS = int(os.environ.get("MAX_TEXT_CHARS", "20000"))
+
+# JSON of every disease's details, encoded once (see payloads.py)
+condition_payloads = payloads.ConditionPayloads(disease, disease_details, disease_urgency)
+
+# Upper bound on the number of cases accepted by /api/predict/batch
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", "10000"))
+
+# CPU image model served by /analyze-image from a separate process pool
+image_analyzer = imaging.ImageAnalyzer()
+
+# Upper bound on topK for /api/similar-cases
+MAX_SIMILAR_CASES = int(os.environ.get("MAX_SIMILAR_CASES", "100"))
+
+def similar_case_index():
+    global case_index
+    index = case_index
+    if index is None:
+        with case_index_lock:
+            if case_index is None:
+                case_index = load_index(train.TRAINING_CSV, train.APPENDED_CSV)
+                logger.info(f"Indexed {case_index.n_rows} recorded cases as {len(case_index)} distinct patterns")
+            index = case_index
+    return index
+
+def next_question_planner():
+    global question_planner
+    planner = question_planner
+    if planner is None:
+        index = similar_case_index()
+        with case_index_lock:
+            if question_planner is None:
+                question_planner = planner_from_index(index, len(disease))
+            planner = question_planner
+    return planner
+
+def request_object():
+    # The JSON body if it is an object; a list, scalar or invalid body reads
+    # as empty, so the route's own validation answers 400, as in
+    # prediction_job
+    data = request.get_json(silent=True)
+    return data if isinstance(data, dict) else {}
+
+def parse_top_k(data, default=DEFAULT_TOP_K):
+    top_k = data.get('topK', default)
+    if isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1:
+        raise ValueError("topK must be a positive integer")
+    return top_k
+
+@app.before_request
+def start_timer():
+    g.request_started = time.perf_counter()
+
+# Endpoints that answer 503 until the models are loaded
+MODEL_ENDPOINTS = {"predict", "predict_text", "predict_batch", "add_cases", "catalog_document"}
+
+@app.before_request
+def require_models():
+    if request.endpoint in MODEL_ENDPOINTS and not models_ready.is_set():
+        response = jsonify({"error": "Models are loading, try again"})
+        response.headers["Retry-After"] = "1"
+        return response, 503
+
+@app.after_request
+def record_request(response):
+    # Label by route pattern rather than raw path to keep cardinality bounded
+    endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    metrics.requests_total.inc(endpoint, str(response.status_code))
+    started = g.get("request_started")
+    if started is not None:
+        metrics.request_seconds.observe(time.perf_counter() - started, endpoint)
+    return response
 
 # Flask routes
 @app.route('/')
 def home():
     return "Welcome to the Symptom Checker API! Use the /api/predict endpoint for diagnosis."
 
+json_body = payloads.dumps
+
+def prediction_job(data):
+    # Validates a /api/predict body and serves it from the cache if possible.
+    # Returns (status, JSON body bytes), or (None, job) when the case still
+    # has to be scored by predict_jobs.
+    data = data if isinstance(data, dict) else {}
+    symptoms = data.get('symptoms', [])
+
+    if not symptoms or not isinstance(symptoms, list):
+        return 400, json_body({"error": "No symptoms provided"})
+    invalid = invalid_symptoms(symptoms)
+    if invalid:
+        return 400, json_body({"error": f"Symptoms must be strings: {invalid}"})
+
+    try:
+        top_k = parse_top_k(data)
+    except ValueError as e:
+        return 400, json_body({"error": str(e)})
+
+    models = symptom_models
+
+    # Repeated symptom combinations are served straight from the cache
+    mask, unknown = models.mask(symptoms)
+    if unknown:
+        metrics.unknown_symptoms_total.inc(amount=len(unknown))
+    body = response_cache.get((mask, top_k))
+    if body is not None:
+        return 200, body
+    return None, (models, mask, top_k, symptoms, unknown)
+
+def predict_jobs(jobs):
+    # Response bodies for jobs from prediction_job, scoring all cases of the
+    # same models with one pass per model
+    bodies = [None] * len(jobs)
+    groups = {}
+    for i, job in enumerate(jobs):
+        groups.setdefault(id(job[0]), []).append(i)
+    for indices in groups.values():
+        models = jobs[indices[0]][0]
+        # The masks already are the packed feature rows
+        with metrics.stage_seconds.time("encode"):
+            X = models.encode_masks([jobs[i][1] for i in indices])
+
+        # Rank conditions with one fused pass over all models
+        started = time.perf_counter()
+        fused, votes = models.predict_proba(X)
+        model_seconds = time.perf_counter() - started
+        evaluator = shadow_evaluator
+        by_k = {}
+        for row, i in enumerate(indices):
+            by_k.setdefault(jobs[i][2], []).append(row)
+        for top_k, rows in by_k.items():
+            started = time.perf_counter()
+            labels, confidence = models.top_k(fused[rows], top_k)
+            serving_seconds = model_seconds + time.perf_counter() - started
+            with metrics.stage_seconds.time("response"):
+                for j, row in enumerate(rows):
+                    _, mask, _, symptoms, unknown = jobs[indices[row]]
+                    body = condition_payloads.prediction(labels[j], confidence[j], votes[:, row])
+                    response_cache.put((mask, top_k), body, version=models.version)
+                    bodies[indices[row]] = body
+                    if evaluator is not None:
+                        evaluator.offer(symptoms, labels[j].tolist(), serving_seconds)
+
+                    if log_sampled():
+                        logger.debug(
+                            f"Symptoms {symptoms} (unknown: {unknown}) - " +
+                            ", ".join(f"{name}: {disease[vote]}" for (_, name), vote in zip(MODEL_NAMES, votes[:, row]))
+                        )
+    return bodies
+
+# Concurrent single predictions are scored together when BATCH_WINDOW_MS is
+# set (see batcher.py)
+prediction_batcher = MicroBatcher(predict_jobs, observe=metrics.batch_size.observe)
+
+# Opt-in sampled recording of /api/predict requests for replay (see capture.py)
+traffic_capture = capture.TrafficCapture()
+
+def predict_symptoms(data):
+    # Request handling for /api/predict outside any web framework so the WSGI
+    # view and the ASGI server share it. Returns (status, JSON body bytes).
+    status, result = prediction_job(data)
+    if status is not None:
+        return status, result
+    if prediction_batcher.enabled:
+        return 200, prediction_batcher.submit(result).result()
+    return 200, predict_jobs([result])[0]
+
 @app.route('/api/predict', methods=['POST'])
 def predict():
     try:
-        logger.info("Received request to /api/predict")
-        data = request.json
-        symptoms = data.get('symptoms', [])
-        logger.info(f"Symptoms received: {symptoms}")
+        status, body = predict_symptoms(request.get_json(silent=True))
+        if traffic_capture.enabled:
+            traffic_capture.record(request.get_data(), status, time.perf_counter() - g.request_started)
+        return app.response_class(body, status=status, mimetype="application/json")
+    except Exception as e:
+        logger.error(f"Error in /api/predict endpoint: {e}")
+        metrics.errors_total.inc("/api/predict")
+        return jsonify({"error": "Internal server error"}), 500
 
+@app.route('/api/predict/text', methods=['POST'])
+def predict_text():
+    try:
+        data = request_object()
+        text = data.get('text')
+        if not isinstance(text, str) or not text.strip():
+            return jsonify({"error": "No text provided"}), 400
+        if len(text) > MAX_TEXT_CHARS:
+            return jsonify({"error": f"Text exceeds the limit of {MAX_TEXT_CHARS} characters"}), 413
+
+        with metrics.stage_seconds.time("extract"):
+            symptoms = symptom_matcher.extract(text)
         if not symptoms:
-            logger.warning("No symptoms provided in the input.")
+            return jsonify({
+                "success": False,
+                "error": "No recognizable symptoms found",
+                "detectedSymptoms": [],
+            }), 422
+
+        status, body = predict_symptoms({"symptoms": symptoms, "topK": data.get('topK', DEFAULT_TOP_K)})
+        if status == 200:
+            # Splice the detected symptoms into the (possibly cached) body
+            body = json_body({"detectedSymptoms": symptoms})[:-1] + b"," + body[1:]
+        return app.response_class(body, status=status, mimetype="application/json")
+    except Exception as e:
+        logger.error(f"Error in /api/predict/text endpoint: {e}")
+        metrics.errors_total.inc("/api/predict/text")
+        return jsonify({"error": "Internal server error"}), 500
+
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_batch():
+    try:
+        data = request_object()
+        cases = data.get('cases')
+        if not isinstance(cases, list) or not cases:
+            return jsonify({"error": "No cases provided"}), 400
+        if len(cases) > MAX_BATCH_SIZE:
+            return jsonify({"error": f"Batch size exceeds the limit of {MAX_BATCH_SIZE} cases"}), 413
+        if not all(isinstance(case, list) for case in cases):
+            return jsonify({"error": "Each case must be a list of symptoms"}), 400
+        for i, case in enumerate(cases):
+            invalid = invalid_symptoms(case)
+            if invalid:
+                return jsonify({"error": f"Case {i} has symptoms that are not strings: {invalid}"}), 400
+
+        try:
+            top_k = parse_top_k(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        if log_sampled():
+            logger.debug(f"Received batch of {len(cases)} cases")
+        models = symptom_models
+        X, unknown = models.encode(cases)
+        labels, confidence, votes = models.rank(X, top_k)
+
+        results = []
+        for i in range(len(cases)):
+            results.append(
+                b'{"possibleConditions":[' + condition_payloads.conditions(labels[i], confidence[i], votes[:, i]) +
+                b'],"unrecognizedSymptoms":' + json_body(unknown[i]) + b"}"
+            )
+        body = payloads.BATCH_HEAD + b",".join(results) + payloads.BATCH_TAIL
+        return app.response_class(body, mimetype="application/json")
+    except Exception as e:
+        logger.error(f"Error in /api/predict/batch endpoint: {e}")
+        metrics.errors_total.inc("/api/predict/batch")
+        return jsonify({"error": "Internal server error"}), 500
+
+@app.route('/api/diseases/<disease_id>')
+def disease_detail(disease_id):
+    # disease_id is the label index or the disease name
+    label = condition_payloads.lookup(disease_id)
+    if label is None:
+        return jsonify({"error": "Unknown disease"}), 404
+    etag = condition_payloads.etags[label]
+    if etag in request.if_none_match:
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(condition_payloads.documents[label], mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "public, max-age=3600"
+    return response
+
+# Lifetime of /api/catalog responses in client caches; clients revalidate
+# with If-None-Match afterwards
+CATALOG_MAX_AGE = int(os.environ.get("CATALOG_MAX_AGE", "86400"))
+
+@app.route('/api/catalog', defaults={"part": ""})
+@app.route('/api/catalog/<part>')
+def catalog_document(part):
+    # The whole catalog, or only its "symptoms" or "diseases"
+    document = catalog.documents.get(part)
+    if document is None:
+        return jsonify({"error": "Unknown catalog part"}), 404
+    body, compressed, etag = document
+    # Each encoding is its own representation with its own strong ETag
+    gzipped = request.accept_encodings["gzip"] > 0
+    if gzipped:
+        etag += "-gzip"
+    if etag in request.if_none_match:
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(compressed if gzipped else body, mimetype="application/json")
+        if gzipped:
+            response.headers["Content-Encoding"] = "gzip"
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = f"public, max-age={CATALOG_MAX_AGE}"
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+@app.route('/api/similar-cases', methods=['POST'])
+def similar_cases():
+    try:
+        data = request_object()
+        symptoms = data.get('symptoms', [])
+        if not symptoms or not isinstance(symptoms, list):
             return jsonify({"error": "No symptoms provided"}), 400
+        invalid = invalid_symptoms(symptoms)
+        if invalid:
+            return jsonify({"error": f"Symptoms must be strings: {invalid}"}), 400
+        try:
+            top_k = parse_top_k(data, default=5)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if top_k > MAX_SIMILAR_CASES:
+            return jsonify({"error": f"topK exceeds the limit of {MAX_SIMILAR_CASES}"}), 400
 
-        # Initialize the symptom vector
-        l2 = [0] * len(l1)
-        for symptom in symptoms:
-            if symptom in l1:
-                l2[l1.index(symptom)] = 1
-                logger.info(f"Mapped symptom: {symptom} to index {l1.index(symptom)}")
-            else:
-                logger.warning(f"Symptom not found in list: {symptom}")
-
-        # Convert input_test to a DataFrame with feature names
-        input_test_df = pd.DataFrame([l2], columns=l1)
-        logger.info(f"Input data for prediction: {input_test_df}")
-
-        # Predict using all models
-        dt_pred = int(clf3.predict(input_test_df)[0])
-        rf_pred = int(clf4.predict(input_test_df)[0])
-        nb_pred = int(gnb.predict(input_test_df)[0])
-        logger.info(f"Predictions - Decision Tree: {dt_pred}, Random Forest: {rf_pred}, Naive Bayes: {nb_pred}")
-
-        # Create a list of possible conditions
-        possible_conditions = []
-        for model_name, pred in [("Decision Tree", dt_pred), ("Random Forest", rf_pred), ("Naive Bayes", nb_pred)]:
-            disease_name = disease[pred]
-            details = disease_details.get(disease_name, {})
-            logger.info(f"Disease details for {disease_name}: {details}")
-            possible_conditions.append({
-                "name": disease_name,
-                "description": details.get("description", "No description available"),
-                "recommendations": details.get("recommendations", []),
-                "tests": details.get("tests", []),
-                "urgency": "medium"  # Default urgency
+        index = similar_case_index()
+        with metrics.stage_seconds.time("similar"):
+            cols, unknown = index.columns_of(symptoms)
+            patterns, similarity, shared = index.query(cols, top_k)
+
+        cases = []
+        for pattern, score, overlap in zip(patterns, similarity, shared):
+            cases.append({
+                "prognosis": disease[index.labels[pattern]],
+                "similarity": round(float(score), 4),
+                "sharedSymptoms": int(overlap),
+                "symptoms": index.symptoms_of(pattern),
+                "recordedCases": int(index.counts[pattern]),
             })
+        return jsonify({
+            "success": True,
+            "cases": cases,
+            "unrecognizedSymptoms": unknown,
+            "indexedCases": index.n_rows,
+        })
+    except Exception as e:
+        logger.error(f"Error in /api/similar-cases endpoint: {e}")
+        metrics.errors_total.inc("/api/similar-cases")
+        return jsonify({"error": "Internal server error"}), 500
 
-        # Return the response
+@app.route('/api/next-question', methods=['POST'])
+def next_question():
+    try:
+        # An empty object is valid here (it asks the first question), so a
+        # body that is not an object is rejected instead of read as empty
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"error": "Request body must be a JSON object"}), 400
+        symptoms = data.get('symptoms', [])
+        denied = data.get('denied', [])
+        if not isinstance(symptoms, list) or not isinstance(denied, list):
+            return jsonify({"error": "symptoms and denied must be lists"}), 400
+        invalid = invalid_symptoms(symptoms + denied)
+        if invalid:
+            return jsonify({"error": f"Symptoms must be strings: {invalid}"}), 400
+        try:
+            top_k = parse_top_k(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        index = similar_case_index()
+        planner = next_question_planner()
+        with metrics.stage_seconds.time("next_question"):
+            confirmed, unknown = index.columns_of(symptoms)
+            rejected, unknown_denied = index.columns_of(denied)
+            column, gain, posterior, entropy = planner.next_question(confirmed, rejected)
+            top = np.argsort(-posterior, kind="stable")[:top_k]
+
+        question = None
+        if column is not None:
+            # A repeated column is asked about under the symptom's catalog id
+            feature = base_feature(index.columns[column], index.columns)
+            question = {
+                "symptom": feature,
+                "id": symptom_id(feature),
+                "informationGain": round(gain, 4),
+            }
         return jsonify({
             "success": True,
-            "message": "Diagnosis completed",
-            "possibleConditions": possible_conditions,
-            "disclaimer": "This is an AI-assisted diagnosis and should not replace professional medical advice."
+            "question": question,
+            "entropy": round(entropy, 4),
+            "possibleConditions": [
+                {"name": disease[planner.labels[i]], "probability": round(float(posterior[i]), 4)} for i in top
+            ],
+            "unrecognizedSymptoms": unknown + unknown_denied,
         })
     except Exception as e:
-        logger.error(f"Error in /api/predict endpoint: {e}")
+        logger.error(f"Error in /api/next-question endpoint: {e}")
+        metrics.errors_total.inc("/api/next-question")
+        return jsonify({"error": "Internal server error"}), 500
+
+def parse_cases(data, models):
+    # Validate submitted training cases against the served schema; returns
+    # the 0/1 matrix and label indices, or raises ValueError
+    cases = data.get('cases')
+    if not isinstance(cases, list) or not cases:
+        raise ValueError("No cases provided")
+    if len(cases) > MAX_BATCH_SIZE:
+        raise ValueError(f"Batch size exceeds the limit of {MAX_BATCH_SIZE} cases")
+    label_index = {label: i for i, label in enumerate(models.labels)}
+    masks = []
+    y = np.empty(len(cases), dtype=np.intp)
+    for i, case in enumerate(cases):
+        symptoms = case.get('symptoms') if isinstance(case, dict) else None
+        if not isinstance(symptoms, list) or not symptoms:
+            raise ValueError(f"Case {i} has no symptoms")
+        invalid = invalid_symptoms(symptoms)
+        if invalid:
+            raise ValueError(f"Case {i} has symptoms that are not strings: {invalid}")
+        prognosis = case.get('prognosis')
+        if not isinstance(prognosis, str) or prognosis not in label_index:
+            raise ValueError(f"Case {i} has an unknown prognosis: {prognosis}")
+        mask, unknown = models.mask(symptoms)
+        if unknown:
+            raise ValueError(f"Case {i} has unknown symptoms: {unknown}")
+        masks.append(mask)
+        y[i] = label_index[prognosis]
+    return bitset.unpack(bitset.from_masks(masks, len(models.features)), len(models.features)), y
+
+@app.route('/api/cases', methods=['POST'])
+def add_cases():
+    try:
+        if not RETRAIN_TOKEN:
+            return jsonify({"error": "Case submission is disabled"}), 403
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if not hmac.compare_digest(supplied.encode(), RETRAIN_TOKEN.encode()):
+            return jsonify({"error": "Invalid token"}), 401
+
+        try:
+            X, y = parse_cases(request_object(), symptom_models)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        manifest = retrainer.add_cases(artifact, X, y)
+        logger.info(f"Appended {len(y)} cases, serving model version {manifest['model_version']}")
+        return jsonify({
+            "success": True,
+            "accepted": int(len(y)),
+            "modelVersion": manifest["model_version"],
+            "refitInSeconds": retrainer.refit_delay,
+        }), 202
+    except Exception as e:
+        logger.error(f"Error in /api/cases endpoint: {e}")
+        metrics.errors_total.inc("/api/cases")
         return jsonify({"error": "Internal server error"}), 500
 
+@app.route('/analyze-image', methods=['POST'])
+def analyze_image():
+    try:
+        if not image_analyzer.available:
+            # "configured": false tells the image page to offer its text
+            # description fallback instead of retrying
+            return jsonify({"error": "Image analysis is not configured", "configured": False}), 503
+        if request.content_length is None:
+            return jsonify({"error": "Content-Length required"}), 411
+        if request.content_length > imaging.MAX_IMAGE_BYTES:
+            return jsonify({"error": f"Image exceeds the limit of {imaging.MAX_IMAGE_BYTES} bytes"}), 413
+
+        upload = request.files.get('image')
+        if upload is None or not upload.filename:
+            return jsonify({"error": "No image provided"}), 400
+        upload.stream.flush()
+
+        try:
+            with metrics.stage_seconds.time("image"):
+                predictions = image_analyzer.analyze(upload.stream.name)
+        except imaging.QueueFull as e:
+            response = jsonify({"error": str(e)})
+            response.headers["Retry-After"] = "1"
+            return response, 503
+        except TimeoutError:
+            return jsonify({"error": "Image analysis timed out"}), 504
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 422
+
+        best = predictions[0]
+        diagnosis = f"{best['label']} ({best['confidence']:.0%} confidence)"
+        if best["description"]:
+            diagnosis += f". {best['description']}"
+        return jsonify({
+            "success": True,
+            "diagnosis": diagnosis,
+            "predictions": predictions,
+            "disclaimer": payloads.DISCLAIMER,
+        })
+    except Exception as e:
+        logger.error(f"Error in /analyze-image endpoint: {e}")
+        metrics.errors_total.inc("/analyze-image")
+        return jsonify({"error": "Internal server error"}), 500
+
+def readiness():
+    # Readiness: the models are loaded and predictions can be served.
+    # Returns (status, JSON body bytes) for the WSGI and ASGI servers.
+    if models_ready.is_set():
+        return 200, json_body({"status": "ready", "modelVersion": symptom_models.version})
+    if load_error is not None:
+        return 503, json_body({"status": "failed", "error": load_error})
+    return 503, json_body({"status": "loading"})
+
+@app.route('/healthz')
+def healthz():
+    # Liveness: the process serves requests, loaded or not
+    return jsonify({"status": "ok"})
+
+@app.route('/readyz')
+def readyz():
+    status, body = readiness()
+    return app.response_class(body, status=status, mimetype="application/json")
+
+@app.route('/api/cache/stats')
+def cache_stats():
+    return jsonify(response_cache.stats())
+
+@app.route('/api/shadow/stats')
+def shadow_stats():
+    if shadow_evaluator is None:
+        return jsonify({"error": "No shadow model configured"}), 404
+    return jsonify(shadow_evaluator.stats())
+
+@app.route('/metrics')
+def metrics_endpoint():
+    return app.response_class(metrics.registry.render(), mimetype=metrics.CONTENT_TYPE)
+
 if __name__ == '__main__':
     app.run(debug=True, host="0.0.0.0", port=5000)
\ No newline at end of file
@@ -0,0 +1,157 @@
+# Production ASGI entry point.
+#
+#   uvicorn asgi:application --host 0.0.0.0 --port 8000 --workers 4
+#
+# Concurrency model: each uvicorn worker process runs one asyncio event loop.
+# POST /api/predict is handled natively on that loop: the request body is read
+# asynchronously and the CPU-bound inference runs on a bounded thread pool of
+# INFERENCE_THREADS threads. At most INFERENCE_QUEUE_SIZE predictions may be
+# running or waiting per worker; beyond that the request is rejected at once
+# with 503 and a Retry-After header instead of piling up behind the pool.
+# With BATCH_WINDOW_MS set, predictions are instead queued on the
+# micro-batcher (see batcher.py) and awaited on the loop, so concurrent
+# requests are scored together without one thread each.
+# GET /healthz and /readyz are answered on the loop as well.
+# Every other route is served by the Flask app through asgiref's WSGI adapter,
+# on asgiref's own threads. /analyze-image runs there too and leaves the
+# decoding to the image process pool (see imaging.py), so image uploads never
+# occupy the inference threads.
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.wsgi import WsgiToAsgi
+
+import app as symptom_app
+import metrics
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_THREADS = int(os.environ.get("INFERENCE_THREADS", str(os.cpu_count() or 1)))
+INFERENCE_QUEUE_SIZE = int(os.environ.get("INFERENCE_QUEUE_SIZE", "64"))
+MAX_BODY_BYTES = int(os.environ.get("MAX_BODY_BYTES", str(64 * 1024)))
+
+executor = ThreadPoolExecutor(max_workers=INFERENCE_THREADS, thread_name_prefix="inference")
+flask_application = WsgiToAsgi(symptom_app.app)
+
+# Predictions admitted and not finished yet; only touched from the event loop
+pending = 0
+
+
+async def send_json(send, status, body, extra_headers=()):
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        (b"access-control-allow-origin", b"*"),
+    ]
+    headers.extend(extra_headers)
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def read_body(receive):
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise ValueError("Request body too large")
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+async def predict(receive, send):
+    global pending
+    started = time.perf_counter()
+    if pending >= INFERENCE_QUEUE_SIZE:
+        await send_json(send, 503, symptom_app.json_body({"error": "Server busy, try again"}), [(b"retry-after", b"1")])
+        metrics.requests_total.inc("/api/predict", "503")
+        return
+
+    if not symptom_app.models_ready.is_set():
+        await send_json(send, 503, symptom_app.json_body({"error": "Models are loading, try again"}), [(b"retry-after", b"1")])
+        metrics.requests_total.inc("/api/predict", "503")
+        return
+
+    pending += 1
+    status = None
+    raw = None
+    try:
+        try:
+            raw = await read_body(receive)
+        except ValueError as e:
+            status = 413
+            await send_json(send, status, symptom_app.json_body({"error": str(e)}))
+            return
+        if raw is None:
+            return
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            data = None
+
+        loop = asyncio.get_running_loop()
+        try:
+            if symptom_app.prediction_batcher.enabled:
+                # Validation and the cache lookup are cheap enough for the
+                # loop; scoring waits for the batcher without taking a thread
+                status, body = symptom_app.prediction_job(data)
+                if status is None:
+                    status, body = 200, await asyncio.wrap_future(symptom_app.prediction_batcher.submit(body))
+            else:
+                status, body = await loop.run_in_executor(executor, symptom_app.predict_symptoms, data)
+        except Exception as e:
+            logger.error(f"Error in /api/predict endpoint: {e}")
+            metrics.errors_total.inc("/api/predict")
+            status, body = 500, symptom_app.json_body({"error": "Internal server error"})
+        await send_json(send, status, body)
+    finally:
+        pending -= 1
+        if status is not None:
+            elapsed = time.perf_counter() - started
+            metrics.requests_total.inc("/api/predict", str(status))
+            metrics.request_seconds.observe(elapsed, "/api/predict")
+            if raw is not None and symptom_app.traffic_capture.enabled:
+                symptom_app.traffic_capture.record(raw, status, elapsed)
+
+
+async def probe(scope, send):
+    # Health probes are answered on the loop, without a WSGI thread, so they
+    # stay fast while the models load in the background
+    if scope["path"] == "/healthz":
+        status, body = 200, b'{"status":"ok"}'
+    else:
+        status, body = symptom_app.readiness()
+    await send_json(send, status, body)
+    metrics.requests_total.inc(scope["path"], str(status))
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            executor.shutdown(wait=False)
+            symptom_app.image_analyzer.shutdown()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+    elif scope["type"] == "http" and scope["path"] == "/api/predict" and scope["method"] == "POST":
+        await predict(receive, send)
+    elif scope["type"] == "http" and scope["path"] in ("/healthz", "/readyz") and scope["method"] == "GET":
+        await probe(scope, send)
+    else:
+        await flask_application(scope, receive, send)
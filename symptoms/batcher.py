@@ -0,0 +1,90 @@
+# Micro-batching of concurrent single predictions.
+#
+# Every sklearn predict_proba call has a fixed overhead of tens of
+# microseconds per model, whether it scores one row or a hundred. When many
+# clients send one case each, MicroBatcher collects the requests that arrive
+# within BATCH_WINDOW_MS of the first one, up to BATCH_MAX_SIZE, and hands
+# them to a single run(items) call on its own thread, which scores the
+# stacked rows with one pass per model. Each caller gets a
+# concurrent.futures.Future for its own result: threads wait on it and the
+# ASGI server awaits it without holding a thread.
+#
+# The window starts with the first request of a batch, and a full batch is
+# scored at once, so a request waits at most the window plus the batch ahead
+# of it.
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+# 0 disables batching; requests are then scored on their own thread
+BATCH_WINDOW_MS = float(os.environ.get("BATCH_WINDOW_MS", "0"))
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", "64"))
+
+
+class MicroBatcher:
+    def __init__(self, run, window_ms=BATCH_WINDOW_MS, max_size=BATCH_MAX_SIZE, observe=None):
+        # run(items) returns one result per item, in order
+        self.run = run
+        self.window = window_ms / 1000
+        self.max_size = max(1, max_size)
+        # observe(batch_size) is called for every batch, e.g. a histogram
+        self.observe = observe
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.window > 0
+
+    def submit(self, item):
+        future = Future()
+        self._queue.put((item, future))
+        if self._thread is None:
+            self._start()
+        return future
+
+    def _start(self):
+        # Started on first use, so a worker forked from a preloading master
+        # gets its own thread
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="micro-batcher", daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            # Requests whose caller gave up are skipped
+            batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            if self.observe is not None:
+                self.observe(len(batch))
+            try:
+                results = self.run([item for item, _ in batch])
+            except Exception as e:
+                logger.error(f"Prediction batch of {len(batch)} failed: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
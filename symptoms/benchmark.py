@@ -0,0 +1,642 @@
+# Local benchmarks for the symptom API.
+#
+# Usage: python benchmark.py batch [--cases 10000] [--single 200]
+#        python benchmark.py latency [--requests 500]
+#        python benchmark.py load --url http://127.0.0.1:8000/api/predict [--clients 200] [--duration 10]
+#        python benchmark.py evaluate [--engine sklearn|compiled] [--output results.json] [--baseline old.json]
+#        python benchmark.py images [--images 200] [--workers 2] [--width 2048] [--height 1536] [--model image_model.joblib]
+#        python benchmark.py startup [--modes eager background] [--runs 3]
+#        python benchmark.py replay capture.ndjson.gz --url http://127.0.0.1:8000/api/predict [--speed 2] [--pid 1234]
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+import warnings
+from collections import Counter
+from urllib.parse import urlsplit
+
+import numpy as np
+
+
+def random_cases(features, n, seed=42):
+    # Typical requests carry a handful of symptoms
+    rng = random.Random(seed)
+    return [rng.sample(features, rng.randint(2, 6)) for _ in range(n)]
+
+
+def load_app():
+    # Keep per-request logging out of the measurements
+    logging.basicConfig(level=logging.WARNING)
+    import app
+    logging.getLogger("app").setLevel(logging.WARNING)
+    return app
+
+
+def bench_batch(args):
+    app = load_app()
+    client = app.app.test_client()
+    cases = random_cases(app.symptom_models.features, args.cases)
+
+    started = time.perf_counter()
+    for case in cases[:args.single]:
+        response = client.post('/api/predict', json={"symptoms": case})
+        assert response.status_code == 200
+    single_elapsed = time.perf_counter() - started
+    single_rate = args.single / single_elapsed
+
+    started = time.perf_counter()
+    response = client.post('/api/predict/batch', json={"cases": cases})
+    assert response.status_code == 200
+    batch_elapsed = time.perf_counter() - started
+    batch_rate = args.cases / batch_elapsed
+
+    print(f"single /api/predict:      {single_rate:10.1f} cases/s ({args.single} calls in {single_elapsed:.2f}s)")
+    print(f"batch  /api/predict/batch: {batch_rate:10.1f} cases/s ({args.cases} cases in {batch_elapsed:.3f}s)")
+    print(f"speedup: {batch_rate / single_rate:.0f}x")
+
+
+def percentiles(samples):
+    values = np.percentile(np.asarray(samples) * 1e6, [50, 95, 99])
+    return "p50 {:8.1f}us  p95 {:8.1f}us  p99 {:8.1f}us".format(*values)
+
+
+def bench_latency(args):
+    app = load_app()
+    import pandas as pd
+
+    models = app.symptom_models
+    features = models.features
+    cases = random_cases(features, args.requests)
+
+    def legacy(symptoms):
+        # Previous hot path: list vector, list.index scans, one-row DataFrame
+        # formatted for the log, then three predict calls
+        l2 = [0] * len(features)
+        for symptom in symptoms:
+            if symptom in features:
+                l2[features.index(symptom)] = 1
+        frame = pd.DataFrame([l2], columns=features)
+        f"Input data for prediction: {frame}"
+        return [int(models.models[key].predict(frame)[0]) for key in ("dt", "rf", "nb")]
+
+    def current(symptoms):
+        X, _ = models.encode([symptoms])
+        predictions = models.predict(X)
+        return [int(predictions[key][0]) for key in ("dt", "rf", "nb")]
+
+    import compiled
+    from inference import SymptomModels
+    compiled_models = SymptomModels(
+        compiled.compile_checked(models.models, features), features, models.labels
+    )
+
+    def compiled_path(symptoms):
+        X, _ = compiled_models.encode([symptoms])
+        predictions = compiled_models.predict(X)
+        return [int(predictions[key][0]) for key in ("dt", "rf", "nb")]
+
+    results = {}
+    with warnings.catch_warnings():
+        # Models are fitted without feature names; the legacy path passes a DataFrame
+        warnings.simplefilter("ignore", UserWarning)
+        for name, fn in [("pandas (before)", legacy), ("numpy (after)", current), ("compiled", compiled_path)]:
+            for case in cases[:50]:
+                fn(case)
+            samples = []
+            for case in cases:
+                started = time.perf_counter()
+                fn(case)
+                samples.append(time.perf_counter() - started)
+            results[name] = samples
+            print(f"{name:16s} {percentiles(samples)}")
+
+    before = np.median(results["pandas (before)"])
+    after = np.median(results["numpy (after)"])
+    print(f"median speedup: {before / after:.1f}x")
+    print(f"median speedup of the compiled engine over numpy: {after / np.median(results['compiled']):.1f}x")
+
+
+async def post(reader, writer, host, path, body):
+    # One request on an open keep-alive connection. Returns the status and
+    # whether the server keeps the connection open.
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    else:
+        await reader.read()
+        headers["connection"] = "close"
+    return status, headers.get("connection", "").lower() != "close"
+
+
+async def http_client(url, bodies, deadline, latencies, statuses):
+    # Minimal HTTP/1.1 keep-alive client; reconnects when the server closes
+    host, port = url.hostname, url.port or 80
+    path = url.path or "/"
+    reader = writer = None
+    i = 0
+    while time.perf_counter() < deadline:
+        body = bodies[i % len(bodies)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            status, keep_alive = await post(reader, writer, host, path, body)
+            latencies.append(time.perf_counter() - started)
+            statuses[status] += 1
+            if not keep_alive:
+                writer.close()
+                writer = None
+        except (OSError, IndexError, ValueError, asyncio.IncompleteReadError):
+            statuses["connection error"] += 1
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.01)
+    if writer is not None:
+        writer.close()
+
+
+def bench_load(args):
+    # Drive a running server with concurrent clients, e.g. the Flask debug
+    # server (python app.py) or the ASGI server (uvicorn asgi:application)
+    import dataset
+    import train
+
+    url = urlsplit(args.url)
+    features = dataset.load(train.TRAINING_CSV).columns
+    bodies = [json.dumps({"symptoms": case}).encode() for case in random_cases(features, 1000)]
+    latencies = []
+    statuses = Counter()
+
+    async def run():
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(*[
+            http_client(url, bodies, deadline, latencies, statuses) for _ in range(args.clients)
+        ])
+
+    started = time.perf_counter()
+    asyncio.run(run())
+    elapsed = time.perf_counter() - started
+
+    ok = statuses.get(200, 0)
+    print(f"{args.clients} clients for {elapsed:.1f}s against {args.url}")
+    print(f"responses: {dict(statuses)}")
+    print(f"throughput: {ok / elapsed:.1f} ok responses/s")
+    if latencies:
+        print(f"latency: {percentiles(latencies)}  max {max(latencies) * 1e3:.1f}ms")
+
+
+def latency_samples(fn, rows, repeat):
+    for row in rows[:10]:
+        fn(row)
+    samples = []
+    for i in range(repeat):
+        row = rows[i % len(rows)]
+        started = time.perf_counter()
+        fn(row)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def bench_evaluate(args):
+    # Offline quality and performance report for the served models, written
+    # as JSON so runs can be compared across model and code changes
+    logging.basicConfig(level=logging.WARNING)
+    from sklearn.base import clone
+    from sklearn.metrics import accuracy_score, recall_score
+
+    import dataset
+    import model_store
+    import train
+    from conditions import disease
+    from inference import MODEL_NAMES, SymptomModels
+
+    try:
+        artifact = model_store.load_artifact(labels=disease)
+        model_version = artifact["manifest"]["model_version"]
+    except model_store.ArtifactError as e:
+        print(f"{e}; training models in-process", file=sys.stderr)
+        artifact = train.build_artifact()
+        model_version = "in-process"
+
+    features = artifact["features"]
+    labels = artifact["labels"]
+    models = artifact["models"]
+    if args.engine == "compiled":
+        import compiled
+        models = compiled.compile_checked(models, features)
+
+    training = dataset.load(train.TRAINING_CSV)
+    X_train = training.matrix(features)
+    y_train = np.asarray(training.y)
+    testing = dataset.load(train.TESTING_CSV)
+    X_test = testing.matrix(features, dtype=np.float32)
+    y_test = np.asarray(testing.y)
+    present = sorted(set(y_test))
+
+    rows = [X_test[i:i + 1] for i in range(len(X_test))]
+    batch = np.resize(X_test, (args.batch_rows, X_test.shape[1]))
+
+    report = {
+        "generatedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "modelVersion": model_version,
+        "engine": args.engine,
+        "testRows": int(len(X_test)),
+        "models": {},
+    }
+    for key, name in MODEL_NAMES:
+        model = models[key]
+        predicted = model.predict(X_test)
+        recall = recall_score(y_test, predicted, labels=present, average=None, zero_division=0)
+
+        # Training time of the same estimator configuration on the full data
+        estimator = clone(artifact["models"][key])
+        started = time.perf_counter()
+        estimator.fit(X_train, y_train)
+        training_seconds = time.perf_counter() - started
+
+        samples = np.asarray(latency_samples(model.predict, rows, args.repeat)) * 1e6
+        started = time.perf_counter()
+        model.predict(batch)
+        batch_seconds = time.perf_counter() - started
+
+        report["models"][key] = {
+            "name": name,
+            "accuracy": round(float(accuracy_score(y_test, predicted)), 4),
+            "recall": {labels[label]: round(float(r), 4) for label, r in zip(present, recall)},
+            "latencyMicros": {
+                f"p{q}": round(float(v), 1) for q, v in zip((50, 95, 99), np.percentile(samples, [50, 95, 99]))
+            },
+            "batchRowsPerSecond": round(len(batch) / batch_seconds, 1),
+            "trainingSeconds": round(training_seconds, 4),
+        }
+
+    ensemble = SymptomModels(models, features, labels)
+    top, _, _ = ensemble.rank(X_test, 3)
+    report["ensemble"] = {
+        "top1Accuracy": round(float(np.mean(top[:, 0] == y_test)), 4),
+        "top3Accuracy": round(float(np.mean((top == y_test[:, np.newaxis]).any(axis=1))), 4),
+    }
+    # ru_maxrss is in kilobytes on Linux
+    report["peakRssMb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_reports(baseline, report, args.max_accuracy_drop, args.max_latency_increase)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+def compare_reports(baseline, report, max_accuracy_drop, max_latency_increase):
+    regressions = []
+    for key, current in report["models"].items():
+        previous = baseline.get("models", {}).get(key)
+        if not previous:
+            continue
+        if previous["accuracy"] - current["accuracy"] > max_accuracy_drop:
+            regressions.append(f"{key} accuracy {previous['accuracy']} -> {current['accuracy']}")
+        before = previous["latencyMicros"]["p95"]
+        after = current["latencyMicros"]["p95"]
+        if after > before * (1 + max_latency_increase):
+            regressions.append(f"{key} p95 latency {before}us -> {after}us")
+    return regressions
+
+
+def synthetic_photos(directory, count, width, height, seed=42):
+    # Smooth gradients with noise, saved as JPEG like camera uploads
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(count):
+        x = np.linspace(0, 255, width, dtype=np.float32)
+        y = np.linspace(0, 255, height, dtype=np.float32)[:, np.newaxis]
+        base = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=2)
+        pixels = np.clip(base + rng.normal(0, 20, base.shape), 0, 255).astype(np.uint8)
+        path = os.path.join(directory, f"photo-{i}.jpg")
+        Image.fromarray(pixels).save(path, quality=90)
+        paths.append(path)
+    return paths
+
+
+def bench_images(args):
+    # Images/s through the /analyze-image process pool, with a throwaway
+    # classifier unless --model points at a real one
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    import joblib
+    from sklearn.linear_model import LogisticRegression
+
+    import imaging
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = synthetic_photos(directory, 8, args.width, args.height)
+        model_path = args.model
+        if model_path is None:
+            rng = np.random.default_rng(0)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                model = LogisticRegression(max_iter=100).fit(rng.random((200, 32 * 32)), rng.integers(0, 4, 200))
+            model_path = os.path.join(directory, "image_model.joblib")
+            joblib.dump({"model": model, "labels": ["a", "b", "c", "d"], "size": [32, 32], "mode": "L"}, model_path)
+
+        spec = imaging.load_model(model_path)
+        started = time.perf_counter()
+        for path in paths:
+            imaging.load_pixels(path, spec["size"], spec["mode"])
+        decode_ms = (time.perf_counter() - started) / len(paths) * 1e3
+
+        analyzer = imaging.ImageAnalyzer(model_path, workers=args.workers, queue_size=args.images, timeout=60)
+        try:
+            # Start the pool processes and load the model in each
+            with ThreadPoolExecutor(args.workers) as threads:
+                list(threads.map(analyzer.analyze, paths[:args.workers]))
+                started = time.perf_counter()
+                list(threads.map(analyzer.analyze, [paths[i % len(paths)] for i in range(args.images)]))
+                elapsed = time.perf_counter() - started
+        finally:
+            analyzer.shutdown()
+
+    print(f"decode + resize of one {args.width}x{args.height} JPEG: {decode_ms:.1f}ms")
+    print(f"{args.images} images with {args.workers} pool processes in {elapsed:.2f}s: {args.images / elapsed:.1f} images/s")
+
+
+def wait_for(url, deadline, body=None):
+    # Seconds since the epoch at which url first answered 200
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(request, timeout=1) as response:
+                response.read()
+                return time.time()
+        except urllib.error.HTTPError as e:
+            e.read()
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            pass
+        time.sleep(0.05)
+    raise TimeoutError(f"{url} did not answer 200 in time")
+
+
+def bench_startup(args):
+    # Time from launching a fresh uvicorn process to its first liveness
+    # answer, to readiness and to its first prediction, per startup mode
+    base = f"http://127.0.0.1:{args.port}"
+    body = json.dumps({"symptoms": ["itching", "skin_rash"]}).encode()
+    for mode in args.modes:
+        timings = {"healthz": [], "readyz": [], "prediction": []}
+        for _ in range(args.runs):
+            env = dict(os.environ, STARTUP_MODE=mode, LOG_LEVEL="WARNING", ARTIFACT_POLL_SECONDS="0")
+            started = time.time()
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "asgi:application", "--port", str(args.port), "--log-level", "warning"],
+                cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+            )
+            try:
+                deadline = started + args.timeout
+                timings["healthz"].append(wait_for(f"{base}/healthz", deadline) - started)
+                timings["readyz"].append(wait_for(f"{base}/readyz", deadline) - started)
+                timings["prediction"].append(wait_for(f"{base}/api/predict", deadline, body) - started)
+            finally:
+                server.terminate()
+                server.wait()
+        print(f"{mode:>10}: " + "  ".join(
+            f"first {name} {np.median(samples) * 1e3:7.0f}ms" for name, samples in timings.items()
+        ) + f"  (median of {args.runs})")
+
+
+def process_cpu_seconds(pid):
+    # User plus system CPU seconds of pid and its direct children, e.g. the
+    # workers of a gunicorn master, from /proc
+    ticks = os.sysconf("SC_CLK_TCK")
+    total = 0
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # Fields after the parenthesized command name, from the state on
+                fields = f.read().rpartition(")")[2].split()
+        except OSError:
+            continue
+        if int(entry) == pid or int(fields[1]) == pid:
+            total += (int(fields[11]) + int(fields[12])) / ticks
+    return total
+
+
+def distribution_ms(samples):
+    values = np.percentile(np.asarray(samples) * 1e3, [50, 90, 99, 99.9])
+    return {"p50": values[0], "p90": values[1], "p99": values[2], "p99.9": values[3], "max": max(samples) * 1e3}
+
+
+def bench_replay(args):
+    # Replay captured /api/predict traffic (see capture.py) against a running
+    # server with the captured inter-arrival times divided by --speed. Sends
+    # are scheduled open-loop: a slow server does not slow down the arrivals,
+    # and latency counts from the scheduled arrival, including any wait for
+    # a free connection.
+    import capture
+
+    if args.speed <= 0:
+        raise SystemExit("--speed must be positive")
+    records, sample_rates = capture.read_capture(args.capture)
+    if args.limit:
+        records = records[:args.limit]
+    if not records:
+        print(f"{args.capture} holds no requests")
+        return
+    bodies = [
+        json.dumps(record["body"]).encode() if "body" in record else record["raw"].encode() for record in records
+    ]
+    offsets = [(record["t"] - records[0]["t"]) / args.speed for record in records]
+    span = records[-1]["t"] - records[0]["t"]
+    url = urlsplit(args.url)
+    host, port = url.hostname, url.port or 80
+    path = url.path or "/"
+
+    latencies = []
+    send_lags = []
+    statuses = Counter()
+    changed = 0
+
+    async def replay_one(connections, scheduled, body, captured_status):
+        nonlocal changed
+        connection = await connections.get()
+        sent = time.perf_counter()
+        send_lags.append(sent - scheduled)
+        try:
+            if connection is None:
+                connection = await asyncio.open_connection(host, port)
+            status, keep_alive = await post(*connection, host, path, body)
+            latencies.append(time.perf_counter() - scheduled)
+            statuses[status] += 1
+            changed += status != captured_status
+            if not keep_alive:
+                connection[1].close()
+                connection = None
+        except (OSError, IndexError, ValueError, asyncio.IncompleteReadError):
+            statuses["connection error"] += 1
+            if connection is not None:
+                connection[1].close()
+            connection = None
+        finally:
+            connections.put_nowait(connection)
+
+    async def run():
+        connections = asyncio.Queue()
+        for _ in range(args.connections):
+            connections.put_nowait(None)
+        started = time.perf_counter()
+        tasks = []
+        for offset, body, record in zip(offsets, bodies, records):
+            delay = started + offset - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(replay_one(connections, started + offset, body, record["status"])))
+        await asyncio.gather(*tasks)
+        while not connections.empty():
+            connection = connections.get_nowait()
+            if connection is not None:
+                connection[1].close()
+
+    server_cpu = process_cpu_seconds(args.pid) if args.pid else None
+    client_cpu = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    asyncio.run(run())
+    elapsed = time.perf_counter() - started
+    client_usage = resource.getrusage(resource.RUSAGE_SELF)
+    client_cpu = client_usage.ru_utime + client_usage.ru_stime - client_cpu.ru_utime - client_cpu.ru_stime
+
+    errors = statuses.get("connection error", 0) + sum(
+        n for status, n in statuses.items() if isinstance(status, int) and status >= 500
+    )
+    report = {
+        "capture": args.capture,
+        "requests": len(records),
+        "capturedSeconds": round(span, 3),
+        "capturedRate": round(len(records) / span, 2) if span > 0 else None,
+        "sampleRates": sorted(sample_rates),
+        "speed": args.speed,
+        "seconds": round(elapsed, 3),
+        "rate": round(len(records) / elapsed, 2),
+        "statuses": {str(status): n for status, n in sorted(statuses.items(), key=str)},
+        "errorRate": round(errors / len(records), 6),
+        "statusChanged": changed,
+        "latencyMs": {name: round(value, 3) for name, value in distribution_ms(latencies).items()} if latencies else None,
+        "sendLagMs": {name: round(value, 3) for name, value in distribution_ms(send_lags).items()},
+        "clientCpuSeconds": round(client_cpu, 3),
+    }
+    if server_cpu is not None:
+        server_cpu = process_cpu_seconds(args.pid) - server_cpu
+        report["serverCpuSeconds"] = round(server_cpu, 3)
+        report["serverCpuPercent"] = round(server_cpu / elapsed * 100, 1)
+
+    print(f"replayed {len(records)} requests in {elapsed:.1f}s ({report['rate']:.1f}/s) against {args.url}; "
+          f"captured at {report['capturedRate']}/s, speed {args.speed}x")
+    if any(rate < 1 for rate in sample_rates):
+        print(f"captured with sample rates {sorted(sample_rates)}: "
+              f"--speed {1 / min(sample_rates):g} approximates the full arrival rate")
+    print(f"responses: {report['statuses']}  error rate {report['errorRate']:.2%}  "
+          f"status differs from capture: {changed}")
+    if latencies:
+        print("latency:   " + "  ".join(f"{name} {value:8.2f}ms" for name, value in report["latencyMs"].items()))
+    print("send lag:  " + "  ".join(f"{name} {value:8.2f}ms" for name, value in report["sendLagMs"].items()))
+    cpu = f"cpu: client {client_cpu:.2f}s"
+    if server_cpu is not None:
+        cpu += f", server {server_cpu:.2f}s ({report['serverCpuPercent']:.0f}% of one core)"
+    print(cpu)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(json.dumps(report, indent=2) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the symptom API.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    batch = subparsers.add_parser("batch", help="compare single predictions with one batch call")
+    batch.add_argument("--cases", type=int, default=10000, help="cases in the batch call")
+    batch.add_argument("--single", type=int, default=200, help="single /api/predict calls to time")
+    batch.set_defaults(func=bench_batch)
+
+    latency = subparsers.add_parser("latency", help="per-request inference latency: pandas, numpy and compiled paths")
+    latency.add_argument("--requests", type=int, default=500, help="requests to time")
+    latency.set_defaults(func=bench_latency)
+
+    load = subparsers.add_parser("load", help="concurrent load against a running server")
+    load.add_argument("--url", default="http://127.0.0.1:8000/api/predict", help="predict endpoint URL")
+    load.add_argument("--clients", type=int, default=200, help="concurrent keep-alive clients")
+    load.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    load.set_defaults(func=bench_load)
+
+    evaluate = subparsers.add_parser("evaluate", help="accuracy, latency, throughput and memory report")
+    evaluate.add_argument("--engine", choices=["sklearn", "compiled"], default="sklearn")
+    evaluate.add_argument("--repeat", type=int, default=1000, help="single-row predictions timed per model")
+    evaluate.add_argument("--batch-rows", type=int, default=10000, help="rows in the throughput batch")
+    evaluate.add_argument("--output", help="write the JSON report to this file")
+    evaluate.add_argument("--baseline", help="earlier JSON report to check for regressions")
+    evaluate.add_argument("--max-accuracy-drop", type=float, default=0.01)
+    evaluate.add_argument("--max-latency-increase", type=float, default=0.5, help="allowed relative p95 growth")
+    evaluate.set_defaults(func=bench_evaluate)
+
+    images = subparsers.add_parser("images", help="images/s through the /analyze-image process pool")
+    images.add_argument("--images", type=int, default=200, help="images to analyze")
+    images.add_argument("--workers", type=int, default=2, help="image pool processes")
+    images.add_argument("--width", type=int, default=2048)
+    images.add_argument("--height", type=int, default=1536)
+    images.add_argument("--model", help="image model file; a throwaway classifier by default")
+    images.set_defaults(func=bench_images)
+
+    startup = subparsers.add_parser("startup", help="time to first response of a fresh server per startup mode")
+    startup.add_argument("--modes", nargs="+", choices=["eager", "background"], default=["eager", "background"])
+    startup.add_argument("--runs", type=int, default=3, help="server starts per mode")
+    startup.add_argument("--port", type=int, default=8765)
+    startup.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for each server")
+    startup.set_defaults(func=bench_startup)
+
+    replay = subparsers.add_parser("replay", help="replay captured /api/predict traffic against a running server")
+    replay.add_argument("capture", help="capture file written with CAPTURE_PATH")
+    replay.add_argument("--url", default="http://127.0.0.1:8000/api/predict", help="predict endpoint URL")
+    replay.add_argument("--speed", type=float, default=1.0, help="multiple of the captured arrival rate")
+    replay.add_argument("--connections", type=int, default=256, help="keep-alive connections at most")
+    replay.add_argument("--limit", type=int, help="replay only the first requests")
+    replay.add_argument("--pid", type=int, help="server process whose CPU time, with its children's, is reported")
+    replay.add_argument("--output", help="write the JSON report to this file")
+    replay.set_defaults(func=bench_replay)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+# Packed bitsets of symptom flags.
+#
+# A case is stored as ceil(n_features / 64) uint64 words with bit i of the
+# row set when column i is present: bit i lives in word i // 64 at position
+# i % 64. This is the same layout as a Python int mask (1 << i) written out in
+# little-endian bytes, so the request mask, the cache key and the training
+# matrix all share one representation. A 132-column case takes 24 bytes
+# instead of 132 as uint8 or 1056 as an int64 frame row.
+import numpy as np
+
+# Set bits of every byte value, for NumPy versions without bitwise_count
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def n_words(n_features):
+    return (n_features + 63) // 64
+
+
+def pack(X):
+    # Dense 0/1 matrix (n_rows, n_features) -> packed (n_rows, n_words)
+    X = np.asarray(X)
+    words = n_words(X.shape[1])
+    packed = np.packbits(X.astype(bool, copy=False), axis=1, bitorder="little")
+    padded = np.zeros((X.shape[0], words * 8), dtype=np.uint8)
+    padded[:, :packed.shape[1]] = packed
+    return padded.view("<u8")
+
+
+def unpack(bits, n_features, dtype=np.uint8):
+    # Packed rows -> dense (n_rows, n_features) 0/1 matrix
+    bits = np.ascontiguousarray(bits, dtype="<u8")
+    dense = np.unpackbits(bits.view(np.uint8), axis=1, count=n_features, bitorder="little")
+    return dense.astype(dtype, copy=False)
+
+
+def from_indices(index_lists, n_features):
+    # Sparse per-row column lists -> packed rows
+    bits = np.zeros((len(index_lists), n_words(n_features)), dtype="<u8")
+    rows = np.repeat(np.arange(len(index_lists)), [len(cols) for cols in index_lists])
+    cols = np.fromiter((c for cols in index_lists for c in cols), dtype=np.intp, count=len(rows))
+    np.bitwise_or.at(bits, (rows, cols >> 6), np.left_shift(np.uint64(1), (cols & 63).astype(np.uint64)))
+    return bits
+
+
+def from_masks(masks, n_features):
+    # Python int masks (bit i = column i) -> packed rows
+    size = n_words(n_features) * 8
+    buffer = b"".join(mask.to_bytes(size, "little") for mask in masks)
+    return np.frombuffer(buffer, dtype="<u8").reshape(len(masks), -1)
+
+
+def to_mask(row):
+    return int.from_bytes(np.ascontiguousarray(row, dtype="<u8").tobytes(), "little")
+
+
+def popcount(bits):
+    # Number of set bits per row
+    bits = np.ascontiguousarray(bits, dtype="<u8")
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bits).sum(axis=-1, dtype=np.int64)
+    return _POPCOUNT8[bits.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+def overlap(bits, row):
+    # Shared set bits between every row of bits and one packed row
+    return popcount(np.bitwise_and(bits, row))
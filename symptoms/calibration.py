@@ -0,0 +1,88 @@
+# Calibration of the fused ensemble confidence.
+#
+# The weighted mean of the decision tree, random forest and naive Bayes
+# probabilities ranks diseases well but is not a probability of being right:
+# the shallow trees spread their mass over many leaves' classes, so a
+# disease all three models agree on typically scores ~0.45. Calibration maps
+# every fused score through one isotonic (monotone, piecewise linear) curve
+# learned from held-out predictions: each training row is scored by models
+# fitted on the other folds, and the curve is fitted to whether each
+# (row, disease) score belonged to the true disease. The mapped scores of a
+# row are renormalized to sum to 1, as CalibratedClassifierCV does for
+# one-vs-rest calibration.
+#
+# Complete training rows are always classified correctly, which would teach
+# the curve that every score is certain. Requests usually report only some of
+# a disease's symptoms, so each held-out row keeps a random KEEP_MIN..1 share
+# of its symptoms (at least one) before it is scored.
+#
+# The curve is stored in the model artifact as its knots ("x", "y") together
+# with the ensemble weights it was fitted for, and applied with np.interp, so
+# serving needs no scikit-learn call.
+import numpy as np
+
+FOLDS = 5
+KEEP_MIN = 0.2
+
+
+def partial_cases(X, rng):
+    keep = rng.uniform(KEEP_MIN, 1, size=(len(X), 1))
+    partial = X * (rng.random(X.shape) < keep)
+    for i in np.flatnonzero(~partial.any(axis=1)):
+        partial[i, rng.choice(np.flatnonzero(X[i]))] = 1
+    return partial
+
+
+def out_of_fold_scores(X, y, params, features, labels, weights, folds=FOLDS):
+    # Fused scores of every row, with some symptoms dropped, from models that
+    # did not train on it
+    from sklearn.model_selection import StratifiedKFold
+
+    import train
+    from inference import SymptomModels
+
+    rng = np.random.default_rng(42)
+    fused = np.zeros((len(y), len(labels)))
+    for fit_rows, held_out in StratifiedKFold(n_splits=folds, shuffle=True, random_state=42).split(X, y):
+        models = train.train_models(X[fit_rows], y[fit_rows], params)
+        fused[held_out], _ = SymptomModels(models, features, labels, weights=weights).predict_proba(partial_cases(X[held_out], rng))
+    return fused
+
+
+def fit(X, y, params, features, labels, weights, folds=FOLDS):
+    from sklearn.isotonic import IsotonicRegression
+
+    fused = out_of_fold_scores(X, y, params, features, labels, weights, folds)
+    truth = np.zeros_like(fused)
+    truth[np.arange(len(y)), y] = 1
+    curve = IsotonicRegression(y_min=0, y_max=1, out_of_bounds="clip").fit(fused.ravel(), truth.ravel())
+    calibration = {
+        "x": np.asarray(curve.X_thresholds_, dtype=np.float64),
+        "y": np.asarray(curve.y_thresholds_, dtype=np.float64),
+        "weights": dict(weights),
+    }
+    calibration["ece"] = {
+        "uncalibrated": round(expected_calibration_error(fused, y), 4),
+        "calibrated": round(expected_calibration_error(apply(calibration, fused), y), 4),
+    }
+    return calibration
+
+
+def apply(calibration, fused):
+    calibrated = np.interp(fused, calibration["x"], calibration["y"])
+    totals = calibrated.sum(axis=1, keepdims=True)
+    # A row the curve maps to all zeros keeps its uncalibrated scores
+    return np.where(totals > 0, calibrated / np.where(totals > 0, totals, 1), fused)
+
+
+def expected_calibration_error(fused, y, bins=10):
+    # Gap between top-1 confidence and accuracy, averaged over confidence bins
+    confidence = fused.max(axis=1)
+    correct = fused.argmax(axis=1) == y
+    bin_of = np.minimum((confidence * bins).astype(int), bins - 1)
+    error = 0.0
+    for b in range(bins):
+        in_bin = bin_of == b
+        if in_bin.any():
+            error += in_bin.mean() * abs(confidence[in_bin].mean() - correct[in_bin].mean())
+    return float(error)
@@ -0,0 +1,133 @@
+# Sampled capture of /api/predict traffic for replay.
+#
+# With CAPTURE_PATH set, a CAPTURE_SAMPLE_RATE fraction of /api/predict
+# requests is recorded with its arrival time, server-side duration, status
+# and JSON body. The request path only puts the raw body on a bounded queue;
+# when it is full the record is dropped and counted. A background thread
+# encodes the records as JSON lines and appends them to the file as gzip
+# members of up to CAPTURE_BATCH records, at least every
+# CAPTURE_FLUSH_SECONDS. Every member starts with a header line holding the
+# sample rate and process id. Each member is appended with a single write to
+# a file opened with O_APPEND, so the workers of one server can share a path,
+# and gzip readers see the members as one stream.
+#
+# Replay a capture with: python benchmark.py replay capture.ndjson.gz --url ...
+import gzip
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+CAPTURE_PATH = os.environ.get("CAPTURE_PATH", "")
+CAPTURE_SAMPLE_RATE = float(os.environ.get("CAPTURE_SAMPLE_RATE", "0.01"))
+CAPTURE_QUEUE_SIZE = int(os.environ.get("CAPTURE_QUEUE_SIZE", "10000"))
+CAPTURE_BATCH = int(os.environ.get("CAPTURE_BATCH", "1000"))
+CAPTURE_FLUSH_SECONDS = float(os.environ.get("CAPTURE_FLUSH_SECONDS", "1"))
+
+
+def encode(arrived, seconds, status, raw):
+    # One JSON line. A body that is valid JSON is stored as JSON, anything
+    # else as the text under "raw".
+    record = {"t": round(arrived, 6), "ms": round(seconds * 1e3, 3), "status": status}
+    try:
+        record["body"] = json.loads(raw)
+    except ValueError:
+        record["raw"] = raw.decode("utf-8", "replace")
+    return json.dumps(record, separators=(",", ":")) + "\n"
+
+
+class TrafficCapture:
+    def __init__(self, path=CAPTURE_PATH, sample_rate=CAPTURE_SAMPLE_RATE, queue_size=CAPTURE_QUEUE_SIZE,
+                 batch=CAPTURE_BATCH, flush_seconds=CAPTURE_FLUSH_SECONDS):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.batch = max(1, batch)
+        self.flush_seconds = flush_seconds
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.path) and self.sample_rate > 0
+
+    def record(self, raw, status, seconds):
+        # Called on the request path with the raw request body, the response
+        # status and the seconds the server spent on it. Never blocks.
+        if not self.enabled or random.random() >= self.sample_rate:
+            return
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait((time.time() - seconds, seconds, status, raw))
+        except queue.Full:
+            metrics.capture_records_total.inc("dropped")
+
+    def _start(self):
+        # Started on first use, so a worker forked from a preloading master
+        # gets its own thread
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="traffic-capture", daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        records = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_seconds
+        while len(records) < self.batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                records.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return records
+
+    def _loop(self):
+        header = json.dumps({"capture": 1, "sampleRate": self.sample_rate, "pid": os.getpid()}) + "\n"
+        fd = None
+        while True:
+            records = self._collect()
+            lines = header + "".join(encode(*record) for record in records)
+            data = gzip.compress(lines.encode(), compresslevel=6)
+            try:
+                if fd is None:
+                    fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                written = os.write(fd, data)
+                if written != len(data):
+                    raise OSError(f"short write of {written} of {len(data)} bytes")
+            except OSError as e:
+                logger.error(f"Writing the traffic capture to {self.path} failed: {e}")
+                metrics.capture_records_total.inc("dropped", amount=len(records))
+                continue
+            metrics.capture_records_total.inc("written", amount=len(records))
+
+
+def read_capture(path):
+    # Captured requests sorted by arrival time, and the sample rates of the
+    # capturing processes
+    requests = []
+    sample_rates = set()
+    with gzip.open(path, "rt") as f:
+        try:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if "capture" in record:
+                    sample_rates.add(record["sampleRate"])
+                else:
+                    requests.append(record)
+        except (EOFError, ValueError) as e:
+            # A member cut short, e.g. by a crash mid-write, ends the capture
+            logger.warning(f"{path} is truncated, replaying the {len(requests)} requests before it: {e}")
+    requests.sort(key=lambda record: record["t"])
+    return requests, sample_rates
@@ -0,0 +1,253 @@
+# Compiled inference engine for the fitted models.
+#
+# The decision tree and the random forest are flattened into contiguous node
+# arrays (feature, left/right child, leaf class probabilities) and evaluated
+# for all rows and trees at once. Every input is a 0/1 symptom flag and every
+# split threshold lies between 0 and 1, so each step of the walk is a plain
+# bit lookup: go right when the node's symptom is present. For Gaussian naive
+# Bayes each binary feature only ever contributes one of two precomputed
+# per-class terms, so scoring is a table lookup and a sum; Bernoulli naive
+# Bayes folds its absent-symptom terms into a bias and is a single matmul.
+#
+# The compiled models expose classes_, n_features_in_, predict and
+# predict_proba, so they can stand in for the sklearn estimators.
+#
+# load_compiled stores the compiled arrays next to the model payload and
+# memory-maps them, so every worker process serves from the same pages.
+#
+# Usage: python compiled.py   # check equivalence with sklearn on Testing.csv
+import logging
+import sys
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class CompiledForest:
+    def __init__(self, estimators, classes, n_features, chunk_size=1024):
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = n_features
+        self.n_trees = len(estimators)
+        self.chunk_size = chunk_size
+
+        features = []
+        children = []
+        proba = []
+        roots = []
+        offset = 0
+        depth = 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == -1
+            thresholds = tree.threshold[~is_leaf]
+            if np.any((thresholds <= 0) | (thresholds >= 1)):
+                raise ValueError("Tree splits are not on binary features")
+
+            node_ids = np.arange(tree.node_count)
+            # Leaves point back at themselves so extra steps are no-ops
+            left = np.where(is_leaf, node_ids, tree.children_left) + offset
+            right = np.where(is_leaf, node_ids, tree.children_right) + offset
+            features.append(np.where(is_leaf, 0, tree.feature))
+            children.append(np.stack([left, right], axis=1))
+
+            # Same normalization as DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            proba.append(value / normalizer)
+
+            roots.append(offset)
+            offset += tree.node_count
+            depth = max(depth, tree.max_depth)
+
+        self.feature = np.ascontiguousarray(np.concatenate(features), dtype=np.intp)
+        self.children = np.ascontiguousarray(np.concatenate(children), dtype=np.intp)
+        self.proba = np.ascontiguousarray(np.concatenate(proba))
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.depth = depth
+
+    def apply(self, X):
+        # Leaf node of every tree for every row, shape (n_rows, n_trees)
+        bits = np.asarray(X) > 0.5
+        rows = np.arange(bits.shape[0])[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (bits.shape[0], self.n_trees))
+        for _ in range(self.depth):
+            nodes = self.children[nodes, bits[rows, self.feature[nodes]].view(np.int8)]
+        return nodes
+
+    def predict_proba(self, X):
+        # Reducing over the tree axis adds the trees in estimator order, as
+        # RandomForestClassifier does, so the sums match it exactly
+        leaves = self.apply(X)
+        proba = np.empty((leaves.shape[0], self.proba.shape[1]))
+        for start in range(0, leaves.shape[0], self.chunk_size):
+            chunk = leaves[start:start + self.chunk_size]
+            proba[start:start + self.chunk_size] = self.proba[chunk].sum(axis=1)
+        if self.n_trees > 1:
+            proba /= self.n_trees
+        return proba
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+class CompiledGaussianNB:
+    def __init__(self, model, chunk_size=1024):
+        self.classes_ = np.asarray(model.classes_)
+        self.n_features_in_ = model.n_features_in_
+        self.chunk_size = chunk_size
+        theta = model.theta_
+        var = model.var_
+        # (x - theta)**2 / var for x == 0 and x == 1, computed exactly as
+        # GaussianNB does so the sums below match it bit for bit
+        self.terms = np.ascontiguousarray(np.stack([((0.0 - theta) ** 2) / var, ((1.0 - theta) ** 2) / var]))
+        self.log_prior = np.log(model.class_prior_)
+        self.log_norm = np.array([-0.5 * np.sum(np.log(2.0 * np.pi * var[i, :])) for i in range(len(var))])
+        self.class_index = np.arange(len(self.classes_))[:, np.newaxis]
+        self.feature_index = np.arange(self.n_features_in_)[np.newaxis, :]
+
+    def joint_log_likelihood(self, X):
+        bits = (np.asarray(X) > 0.5).view(np.int8)
+        jll = np.empty((bits.shape[0], len(self.classes_)))
+        for start in range(0, bits.shape[0], self.chunk_size):
+            chunk = bits[start:start + self.chunk_size]
+            # Pick the x == 0 or x == 1 term for every (row, class, feature)
+            terms = self.terms[chunk[:, np.newaxis, :], self.class_index, self.feature_index]
+            jll[start:start + self.chunk_size] = self.log_prior + (self.log_norm - 0.5 * terms.sum(axis=2))
+        return jll
+
+    def predict_proba(self, X):
+        jll = self.joint_log_likelihood(X)
+        jll -= jll.max(axis=1, keepdims=True)
+        proba = np.exp(jll)
+        proba /= proba.sum(axis=1, keepdims=True)
+        return proba
+
+    def predict(self, X):
+        return self.classes_[self.joint_log_likelihood(X).argmax(axis=1)]
+
+
+class CompiledBernoulliNB:
+    def __init__(self, model):
+        if model.binarize is None:
+            raise ValueError("BernoulliNB without binarize is not supported")
+        self.classes_ = np.asarray(model.classes_)
+        self.n_features_in_ = model.n_features_in_
+        # log P(x | c) = x * log p + (1 - x) * log(1 - p); the (1 - x) part
+        # is a per-class constant plus a per-feature weight on x
+        neg_prob = np.log(1 - np.exp(model.feature_log_prob_))
+        self.weights = np.ascontiguousarray((model.feature_log_prob_ - neg_prob).T)
+        self.bias = model.class_log_prior_ + neg_prob.sum(axis=1)
+        self.threshold = model.binarize
+
+    def joint_log_likelihood(self, X):
+        bits = (np.asarray(X) > self.threshold).astype(np.float64)
+        return bits @ self.weights + self.bias
+
+    def predict_proba(self, X):
+        jll = self.joint_log_likelihood(X)
+        jll -= jll.max(axis=1, keepdims=True)
+        proba = np.exp(jll)
+        proba /= proba.sum(axis=1, keepdims=True)
+        return proba
+
+    def predict(self, X):
+        return self.classes_[self.joint_log_likelihood(X).argmax(axis=1)]
+
+
+def compile_model(model):
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.naive_bayes import BernoulliNB, GaussianNB
+    from sklearn.tree import DecisionTreeClassifier
+
+    if isinstance(model, DecisionTreeClassifier):
+        return CompiledForest([model], model.classes_, model.n_features_in_)
+    if isinstance(model, RandomForestClassifier):
+        return CompiledForest(model.estimators_, model.classes_, model.n_features_in_)
+    if isinstance(model, GaussianNB):
+        return CompiledGaussianNB(model)
+    if isinstance(model, BernoulliNB):
+        return CompiledBernoulliNB(model)
+    raise ValueError(f"Cannot compile {type(model).__name__}")
+
+
+def compile_models(models):
+    return {key: compile_model(model) for key, model in models.items()}
+
+
+def check_equivalence(models, compiled, X):
+    # Returns a list of problems; empty when the compiled models agree with
+    # sklearn on every row
+    problems = []
+    for key, model in models.items():
+        expected = model.predict(X)
+        actual = compiled[key].predict(X)
+        mismatches = int(np.sum(expected != actual))
+        if mismatches:
+            problems.append(f"{key}: {mismatches}/{len(X)} predictions differ")
+        # GaussianNB's log likelihoods are large enough for sklearn's own
+        # normalization to round in the sixth decimal
+        atol = 1e-4 if isinstance(compiled[key], CompiledGaussianNB) else 1e-9
+        if not np.allclose(model.predict_proba(X), compiled[key].predict_proba(X), atol=atol):
+            problems.append(f"{key}: probabilities differ")
+    return problems
+
+
+def testing_rows(features):
+    import dataset
+    import train
+
+    return dataset.load(train.TESTING_CSV).matrix(features, dtype=np.float32)
+
+
+def compile_checked(models, features):
+    # Compile and verify against sklearn on Testing.csv; raises ValueError
+    # when the compiled models cannot be trusted
+    compiled = compile_models(models)
+    problems = check_equivalence(models, compiled, testing_rows(features))
+    if problems:
+        raise ValueError("; ".join(problems))
+    return compiled
+
+
+def load_compiled(models, features, directory, manifest):
+    # Like compile_checked, but reuses the compiled arrays saved for this
+    # payload and memory-maps them
+    import model_store
+
+    compiled = model_store.load_sidecar(directory, manifest, "compiled")
+    if compiled is None:
+        compiled = compile_models(models)
+        try:
+            model_store.save_sidecar(compiled, directory, manifest, "compiled")
+            compiled = model_store.load_sidecar(directory, manifest, "compiled")
+        except OSError as e:
+            logger.warning(f"Could not store the compiled models: {e}")
+    problems = check_equivalence(models, compiled, testing_rows(features))
+    if problems:
+        raise ValueError("; ".join(problems))
+    return compiled
+
+
+def main():
+    import model_store
+    import train
+    from conditions import disease
+
+    try:
+        artifact = model_store.load_artifact(labels=disease)
+    except model_store.ArtifactError as e:
+        print(f"{e}; training models in-process")
+        artifact = train.build_artifact()
+
+    X = testing_rows(artifact["features"])
+    problems = check_equivalence(artifact["models"], compile_models(artifact["models"]), X)
+    for problem in problems:
+        print(problem)
+    print(f"Checked {len(X)} rows of {train.TESTING_CSV}: {'FAILED' if problems else 'OK'}")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
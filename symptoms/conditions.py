@@ -0,0 +1,621 @@
+# Disease labels and condition metadata shared by the API server and the
+# offline training command. The symptom features are the columns of
+# Training.csv (see dataset.py).
+
+# Disease list
+disease = [
+    'Fungal infection', 'Allergy', 'GERD', 'Chronic cholestasis', 'Drug Reaction',
+    'Peptic ulcer disease', 'AIDS', 'Diabetes', 'Gastroenteritis', 'Bronchial Asthma', 'Hypertension',
+    'Migraine', 'Cervical spondylosis', 'Paralysis (brain hemorrhage)', 'Jaundice', 'Malaria', 'Chicken pox',
+    'Dengue', 'Typhoid', 'Hepatitis A', 'Hepatitis B', 'Hepatitis C', 'Hepatitis D', 'Hepatitis E',
+    'Alcoholic hepatitis', 'Tuberculosis', 'Common Cold', 'Pneumonia', 'Dimorphic hemorrhoids (piles)',
+    'Heart attack', 'Varicose veins', 'Hypothyroidism', 'Hyperthyroidism', 'Hypoglycemia', 'Osteoarthritis',
+    'Arthritis', '(Vertigo) Paroxysmal Positional Vertigo', 'Acne', 'Urinary tract infection', 'Psoriasis',
+    'Impetigo'
+]
+
+disease_details = {
+    "Fungal infection": {
+        "description": "A fungal infection is caused by fungi that invade the skin, nails, or hair.",
+        "recommendations": [
+            "Use antifungal creams or ointments.",
+            "Keep the affected area clean and dry.",
+            "Consult a doctor if the infection persists."
+        ],
+        "tests": [
+            "Skin scraping for microscopic examination.",
+            "Fungal culture test."
+        ]
+    },
+    "Allergy": {
+        "description": "An allergy is an immune system response to a foreign substance that's not typically harmful to your body.",
+        "recommendations": [
+            "Avoid allergens that trigger your symptoms.",
+            "Take antihistamines as prescribed.",
+            "Consult an allergist for further testing."
+        ],
+        "tests": [
+            "Skin prick test.",
+            "Blood test (IgE levels)."
+        ]
+    },
+    "GERD": {
+        "description": "Gastroesophageal reflux disease (GERD) is a chronic condition where stomach acid flows back into the esophagus, causing irritation.",
+        "recommendations": [
+            "Avoid spicy, fatty, or acidic foods.",
+            "Elevate the head of your bed while sleeping.",
+            "Consult a gastroenterologist for further diagnosis."
+        ],
+        "tests": [
+            "Endoscopy.",
+            "Esophageal pH monitoring."
+        ]
+    },
+    "Chronic cholestasis": {
+        "description": "Chronic cholestasis is a condition where bile flow from the liver is reduced or blocked, leading to liver damage.",
+        "recommendations": [
+            "Consult a hepatologist (liver specialist) for further diagnosis.",
+            "Avoid alcohol and fatty foods.",
+            "Monitor liver function regularly."
+        ],
+        "tests": [
+            "Liver function tests (LFTs).",
+            "Abdominal ultrasound."
+        ]
+    },
+    "Drug Reaction": {
+        "description": "A drug reaction occurs when the body has an adverse response to a medication.",
+        "recommendations": [
+            "Stop taking the medication immediately.",
+            "Consult a doctor for further diagnosis.",
+            "Monitor for severe symptoms like difficulty breathing."
+        ],
+        "tests": [
+            "Allergy testing.",
+            "Blood tests to check for immune response."
+        ]
+    },
+    "Peptic ulcer disease": {
+        "description": "Peptic ulcer disease involves sores in the lining of the stomach or the upper part of the small intestine.",
+        "recommendations": [
+            "Avoid spicy foods and alcohol.",
+            "Take prescribed medications like proton pump inhibitors.",
+            "Consult a gastroenterologist for further diagnosis."
+        ],
+        "tests": [
+            "Endoscopy.",
+            "Helicobacter pylori (H. pylori) test."
+        ]
+    },
+    "AIDS": {
+        "description": "Acquired Immunodeficiency Syndrome (AIDS) is a chronic, potentially life-threatening condition caused by the human immunodeficiency virus (HIV).",
+        "recommendations": [
+            "Follow antiretroviral therapy (ART) as prescribed.",
+            "Practice safe sex and avoid sharing needles.",
+            "Consult an infectious disease specialist for further diagnosis."
+        ],
+        "tests": [
+            "HIV antibody test.",
+            "Viral load test."
+        ]
+    },
+    "Diabetes": {
+        "description": "Diabetes is a chronic condition that affects how your body processes blood sugar (glucose).",
+        "recommendations": [
+            "Monitor blood sugar levels regularly.",
+            "Follow a healthy diet and exercise routine.",
+            "Consult an endocrinologist for further diagnosis."
+        ],
+        "tests": [
+            "Fasting blood sugar test.",
+            "HbA1c test."
+        ]
+    },
+    "Gastroenteritis": {
+        "description": "Gastroenteritis is an inflammation of the stomach and intestines, typically due to infection.",
+        "recommendations": [
+            "Stay hydrated and drink plenty of fluids.",
+            "Avoid solid foods until vomiting stops.",
+            "Consult a doctor if symptoms persist."
+        ],
+        "tests": [
+            "Stool test for pathogens.",
+            "Blood tests to check for dehydration."
+        ]
+    },
+    "Bronchial Asthma": {
+        "description": "Bronchial asthma is a chronic inflammatory disease of the airways that causes wheezing, breathlessness, and coughing.",
+        "recommendations": [
+            "Use inhalers as prescribed.",
+            "Avoid triggers like smoke, pollen, and dust.",
+            "Consult a pulmonologist for further diagnosis."
+        ],
+        "tests": [
+            "Spirometry.",
+            "Peak flow test."
+        ]
+    },
+    "Hypertension": {
+        "description": "Hypertension (high blood pressure) is a condition where the force of blood against the artery walls is too high.",
+        "recommendations": [
+            "Follow a low-sodium diet and exercise regularly.",
+            "Take prescribed blood pressure medications.",
+            "Consult a cardiologist for further diagnosis."
+        ],
+        "tests": [
+            "Blood pressure measurement.",
+            "Blood tests to check for underlying conditions."
+        ]
+    },
+    "Migraine": {
+        "description": "A migraine is a severe headache often accompanied by nausea, vomiting, and sensitivity to light and sound.",
+        "recommendations": [
+            "Avoid triggers like stress, certain foods, and lack of sleep.",
+            "Take prescribed migraine medications.",
+            "Consult a neurologist for further diagnosis."
+        ],
+        "tests": [
+            "Neurological examination.",
+            "MRI or CT scan to rule out other conditions."
+        ]
+    },
+    "Cervical spondylosis": {
+        "description": "Cervical spondylosis is a degenerative condition affecting the neck vertebrae and discs.",
+        "recommendations": [
+            "Practice good posture and neck exercises.",
+            "Use pain relievers as prescribed.",
+            "Consult an orthopedic specialist for further diagnosis."
+        ],
+        "tests": [
+            "X-ray of the cervical spine.",
+            "MRI or CT scan."
+        ]
+    },
+    "Paralysis (brain hemorrhage)": {
+        "description": "Paralysis due to brain hemorrhage occurs when bleeding in the brain damages nerve cells, leading to loss of muscle function.",
+        "recommendations": [
+            "Seek immediate medical attention.",
+            "Follow a rehabilitation program as prescribed.",
+            "Consult a neurologist for further diagnosis."
+        ],
+        "tests": [
+            "CT scan or MRI of the brain.",
+            "Neurological examination."
+        ]
+    },
+    "Jaundice": {
+        "description": "Jaundice is a condition where the skin and eyes turn yellow due to high bilirubin levels in the blood.",
+        "recommendations": [
+            "Avoid alcohol and fatty foods.",
+            "Stay hydrated and rest.",
+            "Consult a hepatologist for further diagnosis."
+        ],
+        "tests": [
+            "Liver function tests (LFTs).",
+            "Bilirubin level test."
+        ]
+    },
+    "Malaria": {
+        "description": "Malaria is a mosquito-borne infectious disease that causes fever, chills, and flu-like symptoms.",
+        "recommendations": [
+            "Take antimalarial medications as prescribed.",
+            "Use mosquito nets and repellents to prevent bites.",
+            "Consult an infectious disease specialist for further diagnosis."
+        ],
+        "tests": [
+            "Blood smear test.",
+            "Rapid diagnostic test (RDT)."
+        ]
+    },
+    "Chicken pox": {
+        "description": "Chicken pox is a highly contagious viral infection characterized by an itchy rash and red spots or blisters.",
+        "recommendations": [
+            "Keep the skin clean and avoid scratching.",
+            "Use calamine lotion to relieve itching.",
+            "Consult a doctor for antiviral medication."
+        ],
+        "tests": [
+            "Clinical examination of the rash.",
+            "PCR test for varicella-zoster virus."
+        ]
+    },
+    "Dengue": {
+        "description": "Dengue is a mosquito-borne viral infection that causes high fever, severe headache, and joint pain.",
+        "recommendations": [
+            "Stay hydrated and rest.",
+            "Avoid aspirin and use paracetamol for fever.",
+            "Consult a doctor if symptoms worsen."
+        ],
+        "tests": [
+            "NS1 antigen test.",
+            "Dengue IgM and IgG antibody tests."
+        ]
+    },
+    "Typhoid": {
+        "description": "Typhoid is a bacterial infection caused by Salmonella typhi, leading to high fever, abdominal pain, and weakness.",
+        "recommendations": [
+            "Take antibiotics as prescribed.",
+            "Maintain good hygiene and drink clean water.",
+            "Consult a doctor for further diagnosis."
+        ],
+        "tests": [
+            "Widal test.",
+            "Blood culture test."
+        ]
+    },
+    "Hepatitis A": {
+        "description": "Hepatitis A is a viral infection that affects the liver and is spread through contaminated food or water.",
+        "recommendations": [
+            "Get vaccinated against Hepatitis A.",
+            "Avoid alcohol and fatty foods.",
+            "Consult a hepatologist for further diagnosis."
+        ],
+        "tests": [
+            "Hepatitis A IgM antibody test.",
+            "Liver function tests (LFTs)."
+        ]
+    },
+    "Hepatitis B": {
+        "description": "Hepatitis B is a viral infection that attacks the liver and can cause both acute and chronic disease.",
+        "recommendations": [
+            "Get vaccinated against Hepatitis B.",
+            "Avoid alcohol and fatty foods.",
+            "Consult a hepatologist for further diagnosis."
+        ],
+        "tests": [
+            "Hepatitis B surface antigen (HBsAg) test.",
+            "Liver function tests (LFTs)."
+        ]
+    },
+    "Hepatitis C": {
+        "description": "Hepatitis C is a viral infection that causes liver inflammation and can lead to serious liver damage.",
+        "recommendations": [
+            "Avoid sharing needles or personal items like razors.",
+            "Take antiviral medications as prescribed.",
+            "Consult a hepatologist for further diagnosis."
+        ],
+        "tests": [
+            "Hepatitis C antibody test.",
+            "HCV RNA test."
+        ]
+    },
+    "Hepatitis D": {
+        "description": "Hepatitis D is a viral infection that occurs only in people who are also infected with Hepatitis B.",
+        "recommendations": [
+            "Get vaccinated against Hepatitis B to prevent Hepatitis D.",
+            "Avoid alcohol and fatty foods.",
+            "Consult a hepatologist for further diagnosis."
+        ],
+        "tests": [
+            "Hepatitis D antibody test.",
+            "Liver function tests (LFTs)."
+        ]
+    },
+    "Hepatitis E": {
+        "description": "Hepatitis E is a viral infection that affects the liver and is spread through contaminated water.",
+        "recommendations": [
+            "Drink clean and safe water.",
+            "Avoid alcohol and fatty foods.",
+            "Consult a hepatologist for further diagnosis."
+        ],
+        "tests": [
+            "Hepatitis E IgM antibody test.",
+            "Liver function tests (LFTs)."
+        ]
+    },
+    "Alcoholic hepatitis": {
+        "description": "Alcoholic hepatitis is liver inflammation caused by excessive alcohol consumption.",
+        "recommendations": [
+            "Stop drinking alcohol immediately.",
+            "Follow a healthy diet and lifestyle.",
+            "Consult a hepatologist for further diagnosis."
+        ],
+        "tests": [
+            "Liver function tests (LFTs).",
+            "Abdominal ultrasound."
+        ]
+    },
+    "Tuberculosis": {
+        "description": "Tuberculosis (TB) is a bacterial infection that primarily affects the lungs but can spread to other organs.",
+        "recommendations": [
+            "Take prescribed antibiotics for the full course.",
+            "Practice good hygiene and cover your mouth when coughing.",
+            "Consult an infectious disease specialist for further diagnosis."
+        ],
+        "tests": [
+            "Tuberculin skin test (TST).",
+            "Sputum test for acid-fast bacilli (AFB)."
+        ]
+    },
+    "Common Cold": {
+        "description": "The common cold is a viral infection of the upper respiratory tract, causing symptoms like a runny nose and sore throat.",
+        "recommendations": [
+            "Stay hydrated and rest.",
+            "Use over-the-counter cold medications.",
+            "Consult a doctor if symptoms persist."
+        ],
+        "tests": [
+            "Clinical examination.",
+            "No specific test required."
+        ]
+    },
+    "Pneumonia": {
+        "description": "Pneumonia is an infection that inflames the air sacs in one or both lungs, causing cough, fever, and difficulty breathing.",
+        "recommendations": [
+            "Take prescribed antibiotics.",
+            "Stay hydrated and rest.",
+            "Consult a pulmonologist for further diagnosis."
+        ],
+        "tests": [
+            "Chest X-ray.",
+            "Sputum culture."
+        ]
+    },
+    "Dimorphic hemorrhoids (piles)": {
+        "description": "Hemorrhoids are swollen veins in the lower rectum and anus, causing discomfort and bleeding.",
+        "recommendations": [
+            "Eat a high-fiber diet and stay hydrated.",
+            "Use over-the-counter creams or ointments.",
+            "Consult a gastroenterologist for further diagnosis."
+        ],
+        "tests": [
+            "Digital rectal examination.",
+            "Anoscopy."
+        ]
+    },
+    "Heart attack": {
+        "description": "A heart attack occurs when blood flow to the heart is blocked, causing damage to the heart muscle.",
+        "recommendations": [
+            "Seek immediate medical attention.",
+            "Follow a heart-healthy diet and lifestyle.",
+            "Consult a cardiologist for further diagnosis."
+        ],
+        "tests": [
+            "Electrocardiogram (ECG).",
+            "Cardiac enzyme tests."
+        ]
+    },
+    "Varicose veins": {
+        "description": "Varicose veins are swollen, twisted veins that are visible just under the surface of the skin.",
+        "recommendations": [
+            "Wear compression stockings.",
+            "Elevate your legs to reduce swelling.",
+            "Consult a vascular specialist for further diagnosis."
+        ],
+        "tests": [
+            "Doppler ultrasound.",
+            "Venography."
+        ]
+    },
+    "Hypothyroidism": {
+        "description": "Hypothyroidism is a condition where the thyroid gland does not produce enough thyroid hormone.",
+        "recommendations": [
+            "Take prescribed thyroid hormone replacement therapy.",
+            "Follow a healthy diet and exercise routine.",
+            "Consult an endocrinologist for further diagnosis."
+        ],
+        "tests": [
+            "Thyroid-stimulating hormone (TSH) test.",
+            "Free T4 test."
+        ]
+    },
+    "Hyperthyroidism": {
+        "description": "Hyperthyroidism is a condition where the thyroid gland produces too much thyroid hormone.",
+        "recommendations": [
+            "Take prescribed antithyroid medications.",
+            "Avoid iodine-rich foods.",
+            "Consult an endocrinologist for further diagnosis."
+        ],
+        "tests": [
+            "Thyroid-stimulating hormone (TSH) test.",
+            "Free T4 and T3 tests."
+        ]
+    },
+    "Hypoglycemia": {
+        "description": "Hypoglycemia is a condition where blood sugar levels drop too low, causing symptoms like dizziness and confusion.",
+        "recommendations": [
+            "Eat small, frequent meals.",
+            "Carry a source of fast-acting sugar (e.g., glucose tablets).",
+            "Consult an endocrinologist for further diagnosis."
+        ],
+        "tests": [
+            "Blood glucose test.",
+            "Fasting blood sugar test."
+        ]
+    },
+    "Osteoarthritis": {
+        "description": "Osteoarthritis is a degenerative joint disease that causes pain, stiffness, and swelling in the joints.",
+        "recommendations": [
+            "Maintain a healthy weight to reduce joint stress.",
+            "Use pain relievers and anti-inflammatory medications.",
+            "Consult an orthopedic specialist for further diagnosis."
+        ],
+        "tests": [
+            "X-ray of the affected joint.",
+            "MRI or CT scan."
+        ]
+    },
+    "Arthritis": {
+        "description": "Arthritis is inflammation of the joints, causing pain and stiffness.",
+        "recommendations": [
+            "Exercise regularly to maintain joint flexibility.",
+            "Use pain relievers and anti-inflammatory medications.",
+            "Consult a rheumatologist for further diagnosis."
+        ],
+        "tests": [
+            "Blood tests (e.g., rheumatoid factor, anti-CCP).",
+            "X-ray or MRI of the affected joints."
+        ]
+    },
+    "(Vertigo) Paroxysmal Positional Vertigo": {
+        "description": "Vertigo is a sensation of spinning or dizziness, often caused by inner ear problems.",
+        "recommendations": [
+            "Perform vestibular rehabilitation exercises.",
+            "Avoid sudden head movements.",
+            "Consult an ENT specialist for further diagnosis."
+        ],
+        "tests": [
+            "Dix-Hallpike maneuver.",
+            "Videonystagmography (VNG)."
+        ]
+    },
+    "Acne": {
+        "description": "Acne is a skin condition that occurs when hair follicles become clogged with oil and dead skin cells.",
+        "recommendations": [
+            "Wash your face twice daily with a gentle cleanser.",
+            "Use over-the-counter acne treatments.",
+            "Consult a dermatologist for further diagnosis."
+        ],
+        "tests": [
+            "Clinical examination.",
+            "No specific test required."
+        ]
+    },
+    "Urinary tract infection": {
+        "description": "A urinary tract infection (UTI) is an infection in any part of the urinary system, including kidneys, bladder, or urethra.",
+        "recommendations": [
+            "Drink plenty of water to flush out bacteria.",
+            "Take prescribed antibiotics.",
+            "Consult a urologist for further diagnosis."
+        ],
+        "tests": [
+            "Urinalysis.",
+            "Urine culture."
+        ]
+    },
+    "Psoriasis": {
+        "description": "Psoriasis is a chronic skin condition that causes red, itchy, and scaly patches.",
+        "recommendations": [
+            "Use topical treatments like corticosteroids.",
+            "Avoid triggers like stress and alcohol.",
+            "Consult a dermatologist for further diagnosis."
+        ],
+        "tests": [
+            "Clinical examination.",
+            "Skin biopsy."
+        ]
+    },
+    "Impetigo": {
+        "description": "Impetigo is a highly contagious skin infection that causes red sores and blisters.",
+        "recommendations": [
+            "Keep the affected area clean and dry.",
+            "Use prescribed antibiotic creams or ointments.",
+            "Consult a dermatologist for further diagnosis."
+        ],
+        "tests": [
+            "Clinical examination.",
+            "Bacterial culture from the sores."
+        ]
+    }
+}
+
+# Urgency of seeking care for each disease, most urgent first. Diseases not
+# listed under "high" or "medium" are "low".
+urgency_levels = ["high", "medium", "low"]
+urgency_tiers = {
+    "high": [
+        "Heart attack", "Paralysis (brain hemorrhage)", "AIDS", "Hepatitis B", "Hepatitis C",
+        "Hepatitis D", "Hepatitis E", "Alcoholic hepatitis", "Tuberculosis", "Pneumonia"
+    ],
+    "medium": [
+        "Diabetes", "Hypertension", "Migraine", "Cervical spondylosis", "Jaundice", "Malaria",
+        "Dengue", "Typhoid", "Hepatitis A", "Bronchial Asthma", "GERD", "Gastroenteritis",
+        "Urinary tract infection", "Psoriasis", "Peptic ulcer disease", "Arthritis", "Osteoarthritis"
+    ],
+}
+disease_urgency = {
+    name: next((level for level, names in urgency_tiers.items() if name in names), "low") for name in disease
+}
+
+# Everyday phrases for symptom features, used to pick symptoms out of free
+# text. Feature names themselves always match, with underscores read as spaces.
+symptom_synonyms = {
+    "itching": ["itchy", "itch", "itchiness"],
+    "skin_rash": ["rash", "rashes"],
+    "continuous_sneezing": ["sneezing", "sneezes", "keep sneezing"],
+    "shivering": ["shivers", "shaking"],
+    "chills": ["chill", "feeling cold"],
+    "joint_pain": ["joint ache", "aching joints", "joints hurt", "joints ache"],
+    "stomach_pain": ["stomach ache", "stomachache", "tummy ache", "stomach hurts"],
+    "acidity": ["heartburn", "acid reflux"],
+    "ulcers_on_tongue": ["mouth ulcers", "tongue ulcers"],
+    "vomiting": ["vomit", "throwing up", "threw up"],
+    "burning_micturition": ["burning urination", "burning when urinating", "painful urination"],
+    "fatigue": ["tired", "tiredness", "exhausted", "exhaustion", "no energy"],
+    "weight_gain": ["gaining weight", "gained weight"],
+    "anxiety": ["anxious", "nervous"],
+    "cold_hands_and_feets": ["cold hands", "cold feet"],
+    "mood_swings": ["moody"],
+    "weight_loss": ["losing weight", "lost weight"],
+    "restlessness": ["restless"],
+    "lethargy": ["lethargic", "sluggish"],
+    "cough": ["coughing", "coughs"],
+    "high_fever": ["high temperature", "very high fever"],
+    "sunken_eyes": ["hollow eyes"],
+    "breathlessness": ["short of breath", "shortness of breath", "breathless", "difficulty breathing", "hard to breathe"],
+    "sweating": ["sweat", "sweaty", "night sweats"],
+    "dehydration": ["dehydrated"],
+    "indigestion": ["upset stomach", "dyspepsia"],
+    "headache": ["head ache", "head hurts", "head pain"],
+    "yellowish_skin": ["yellow skin"],
+    "dark_urine": ["dark pee"],
+    "nausea": ["nauseous", "nauseated", "queasy", "feel sick", "feeling sick"],
+    "loss_of_appetite": ["no appetite", "not hungry", "lost my appetite"],
+    "pain_behind_the_eyes": ["pain behind my eyes", "eye pain"],
+    "back_pain": ["backache", "back ache", "back hurts"],
+    "constipation": ["constipated"],
+    "abdominal_pain": ["abdomen pain", "pain in abdomen"],
+    "diarrhoea": ["diarrhea", "loose motions", "loose stools", "runny stools"],
+    "mild_fever": ["fever", "slight fever", "low grade fever", "temperature", "feverish"],
+    "yellowing_of_eyes": ["yellow eyes"],
+    "swelled_lymph_nodes": ["swollen lymph nodes", "swollen glands"],
+    "malaise": ["feeling unwell", "generally unwell"],
+    "blurred_and_distorted_vision": ["blurred vision", "blurry vision", "distorted vision"],
+    "phlegm": ["mucus"],
+    "throat_irritation": ["sore throat", "scratchy throat", "throat pain", "irritated throat"],
+    "redness_of_eyes": ["red eyes", "bloodshot eyes"],
+    "runny_nose": ["running nose", "nose running", "runny nostrils"],
+    "congestion": ["blocked nose", "stuffy nose", "nasal congestion", "congested"],
+    "chest_pain": ["pain in chest", "pain in my chest", "chest hurts", "chest tightness"],
+    "fast_heart_rate": ["rapid heartbeat", "racing heart", "heart racing", "fast heartbeat"],
+    "bloody_stool": ["blood in stool", "blood in my stool"],
+    "neck_pain": ["neck ache", "neck hurts"],
+    "dizziness": ["dizzy", "lightheaded", "light headed"],
+    "cramps": ["cramping", "cramp"],
+    "bruising": ["bruises", "bruise easily"],
+    "swollen_legs": ["leg swelling", "legs swollen"],
+    "puffy_face_and_eyes": ["puffy face", "puffy eyes"],
+    "brittle_nails": ["nails break easily"],
+    "excessive_hunger": ["always hungry", "very hungry"],
+    "slurred_speech": ["slurring", "speech slurred"],
+    "knee_pain": ["knee ache", "knee hurts"],
+    "hip_joint_pain": ["hip pain"],
+    "muscle_weakness": ["weak muscles"],
+    "stiff_neck": ["neck stiffness"],
+    "swelling_joints": ["swollen joints"],
+    "spinning_movements": ["room spinning", "spinning sensation"],
+    "loss_of_balance": ["losing balance", "lose my balance"],
+    "unsteadiness": ["unsteady"],
+    "loss_of_smell": ["can't smell", "cannot smell", "lost my sense of smell"],
+    "bladder_discomfort": ["bladder pain"],
+    "continuous_feel_of_urine": ["constant urge to urinate", "frequent urge to urinate"],
+    "passage_of_gases": ["gas", "flatulence", "bloating"],
+    "depression": ["depressed", "feeling low"],
+    "irritability": ["irritable", "easily annoyed"],
+    "muscle_pain": ["muscle ache", "aching muscles", "body ache", "body aches", "body pain"],
+    "red_spots_over_body": ["red spots"],
+    "belly_pain": ["belly ache", "belly hurts"],
+    "watering_from_eyes": ["watery eyes", "teary eyes"],
+    "increased_appetite": ["more appetite"],
+    "polyuria": ["frequent urination", "urinating a lot"],
+    "lack_of_concentration": ["can't concentrate", "cannot concentrate", "poor concentration"],
+    "visual_disturbances": ["vision problems", "vision changes"],
+    "stomach_bleeding": ["bleeding stomach"],
+    "distention_of_abdomen": ["bloated abdomen", "swollen abdomen"],
+    "blood_in_sputum": ["coughing blood", "coughing up blood"],
+    "palpitations": ["heart palpitations", "pounding heart"],
+    "painful_walking": ["pain when walking", "hurts to walk"],
+    "pus_filled_pimples": ["pimples with pus"],
+    "skin_peeling": ["peeling skin"],
+    "blister": ["blisters"],
+}
@@ -0,0 +1,145 @@
+# Loading of the symptom CSV files.
+#
+# Each CSV is parsed once with compact dtypes (uint8 symptom flags and a
+# categorical prognosis), the flags are packed into bitsets (see bitset.py)
+# and everything is written to a binary cache of .npy files. Later
+# loads memory-map the cache instead of parsing the CSV again, so the pages
+# are shared between processes and only read when touched. The cache is
+# rebuilt whenever the CSV's size or modification time changes.
+#
+# The symptom columns are taken from the CSV header itself. Training.csv
+# defines the schema; every other file fed to the models (Testing.csv,
+# appended cases) must have exactly the same columns in the same order.
+import json
+import logging
+import os
+
+import numpy as np
+
+import bitset
+from conditions import disease
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get("DATA_CACHE_DIR", os.path.join(BASE_DIR, "cache"))
+
+# Bump when the cache layout changes
+CACHE_VERSION = 2
+
+# Create disease to integer mapping
+disease_to_int = {d: i for i, d in enumerate(disease)}
+
+
+class Dataset:
+    def __init__(self, bits, y, columns):
+        # bits holds one packed row per case, see bitset.py
+        self.bits = bits
+        self.y = y
+        self.columns = list(columns)
+        self.column_index = {c: i for i, c in enumerate(self.columns)}
+
+    def __len__(self):
+        return len(self.y)
+
+    @property
+    def X(self):
+        # Dense 0/1 matrix in CSV column order, unpacked on every access
+        return bitset.unpack(self.bits, len(self.columns))
+
+    def matrix(self, features, dtype=np.uint8):
+        # Columns in the requested feature order
+        X = bitset.unpack(self.bits, len(self.columns), dtype)
+        if list(features) == self.columns:
+            return X
+        return X[:, [self.column_index[f] for f in features]]
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _cache_paths(path, cache_dir):
+    name = os.path.splitext(os.path.basename(path))[0]
+    base = os.path.join(cache_dir, name)
+    return base + ".bits.npy", base + ".y.npy", base + ".json"
+
+
+def check_columns(columns, expected, source):
+    # Raise ValueError unless columns matches the schema exactly
+    columns = list(columns)
+    expected = list(expected)
+    if columns == expected:
+        return
+    missing = [c for c in expected if c not in set(columns)]
+    unexpected = [c for c in columns if c not in set(expected)]
+    if missing or unexpected:
+        raise ValueError(f"{source} does not match the training schema: missing {missing}, unexpected {unexpected}")
+    raise ValueError(f"{source} has the training columns in a different order")
+
+
+def read_csv(path):
+    # pandas is only needed when the cache is rebuilt, so it is not imported
+    # by processes that just load the cache
+    import pandas as pd
+
+    # Header as pandas names it, i.e. a repeated column gets a ".1" suffix
+    header = list(pd.read_csv(path, nrows=0).columns)
+    if "prognosis" not in header:
+        raise ValueError(f"{path} has no prognosis column")
+    columns = [c for c in header if c != "prognosis"]
+    # A trailing comma in the header shows up as an "Unnamed: N" column
+    blank = [c for c in columns if not c.strip() or c.startswith("Unnamed:")]
+    if blank:
+        raise ValueError(f"{path} has unnamed columns: {blank}")
+
+    dtypes = {c: np.uint8 for c in columns}
+    dtypes["prognosis"] = "category"
+    df = pd.read_csv(path, dtype=dtypes)
+
+    X = df[columns].to_numpy()
+    if X.size and X.max() > 1:
+        raise ValueError(f"{path} has symptom values other than 0 and 1")
+
+    # Data cleaning: strip the prognosis names and drop rows with a missing or
+    # unknown disease, mapping the categories once instead of every row
+    categories = df["prognosis"].cat.categories.astype(str).str.strip()
+    lookup = np.array([disease_to_int.get(c, -1) for c in categories] + [-1], dtype=np.int16)
+    y = lookup[df["prognosis"].cat.codes.to_numpy()]
+    keep = y >= 0
+    dropped = int((~keep).sum())
+    if dropped:
+        logger.info(f"Dropped {dropped} rows of {path} with a missing or unknown prognosis")
+    return np.ascontiguousarray(X[keep]), y[keep], columns
+
+
+def load(path, cache_dir=CACHE_DIR):
+    bits_path, y_path, meta_path = _cache_paths(path, cache_dir)
+    stamp = _source_stamp(path)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta["version"] == CACHE_VERSION and meta["source"] == stamp:
+            bits = np.load(bits_path, mmap_mode="r")
+            y = np.load(y_path, mmap_mode="r")
+            return Dataset(bits, y, meta["columns"])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    X, y, columns = read_csv(path)
+    bits = bitset.pack(X)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        for target, array in ((bits_path, bits), (y_path, y)):
+            tmp = f"{target}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp, target)
+        tmp = f"{meta_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": CACHE_VERSION, "source": stamp, "columns": columns}, f)
+        os.replace(tmp, meta_path)
+    except OSError as e:
+        logger.warning(f"Could not write dataset cache for {path}: {e}")
+    return Dataset(bits, y, columns)
@@ -0,0 +1,38 @@
+# gunicorn settings for running several workers off one copy of the models.
+#
+#   gunicorn -c gunicorn.conf.py app:app
+#   gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi:application
+#
+# With preload_app the master imports the application, loading the model
+# artifact and building the lookup tables, once before forking the workers.
+# The workers then share those pages copy-on-write. gc.freeze() moves every
+# object allocated during the preload out of the collector's reach, so
+# collections in the workers do not write to, and thereby copy, those pages.
+# Of the model arrays, only plain NumPy attributes (naive Bayes, the
+# calibration) are memory-mapped from the artifact and stay shared across
+# reloads. sklearn trees keep their nodes in process memory, so after a model
+# swap each worker holds its own copy; INFERENCE_ENGINE=compiled serves the
+# trees from a memory-mapped sidecar instead (see compiled.py).
+import gc
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+# GUNICORN_PRELOAD=0 loads the app in every worker instead, e.g. for comparison
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") != "0"
+
+if preload_app:
+    # Tell the app not to start background threads in the master
+    os.environ["PRELOAD_APP"] = "1"
+
+
+def when_ready(server):
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        import app
+
+        app.start_background_tasks()
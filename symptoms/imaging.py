@@ -0,0 +1,175 @@
+# Image analysis for /analyze-image.
+#
+# The web process streams each upload to a file under UPLOAD_DIR and hands
+# only the path to a dedicated pool of worker processes, so image bytes are
+# never held in the web process's memory and decoding never competes with
+# symptom predictions for its GIL. Each pool process loads the image model
+# once. JPEGs are decoded at reduced scale through Pillow's draft mode when
+# the model input is much smaller than the photo, which skips most of the
+# decoding work.
+#
+# The model is a joblib file (IMAGE_MODEL_PATH, by default
+# artifacts/image_model.joblib as written by train_image.py) holding a dict with
+#   "model":  a fitted classifier with predict_proba over flattened pixels
+#             scaled to [0, 1],
+#   "labels": the label of each of its classes,
+#   "size":   [width, height] of the model input,
+#   "mode":   Pillow mode of the model input, e.g. "L" or "RGB",
+# and optionally "descriptions", a dict of label -> short explanation.
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+import model_store
+
+DEFAULT_IMAGE_MODEL_PATH = os.path.join(model_store.DEFAULT_ARTIFACT_DIR, "image_model.joblib")
+IMAGE_MODEL_PATH = os.environ.get("IMAGE_MODEL_PATH", DEFAULT_IMAGE_MODEL_PATH)
+IMAGE_WORKERS = int(os.environ.get("IMAGE_WORKERS", "1"))
+# Images being analyzed or waiting for a pool process, per web process
+IMAGE_QUEUE_SIZE = int(os.environ.get("IMAGE_QUEUE_SIZE", "8"))
+IMAGE_TIMEOUT = float(os.environ.get("IMAGE_TIMEOUT", "10"))
+# Largest accepted upload and decoded image size
+MAX_IMAGE_BYTES = int(os.environ.get("MAX_IMAGE_BYTES", str(10 * 1024 * 1024)))
+MAX_IMAGE_PIXELS = int(os.environ.get("MAX_IMAGE_PIXELS", str(40_000_000)))
+UPLOAD_DIR = os.environ.get("UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "symptom-uploads"))
+
+
+class QueueFull(Exception):
+    pass
+
+
+def load_model(path):
+    import joblib
+
+    spec = joblib.load(path)
+    missing = [key for key in ("model", "labels", "size", "mode") if key not in spec]
+    if missing:
+        raise ValueError(f"Image model {path} is missing {missing}")
+    spec["size"] = tuple(spec["size"])
+    spec.setdefault("descriptions", {})
+    return spec
+
+
+def load_pixels(path, size, mode):
+    # Decoded, resized image as one flat float32 row in [0, 1]
+    from PIL import Image
+
+    with Image.open(path) as image:
+        # Let the JPEG decoder scale down by up to 8x while decoding; a no-op
+        # for other formats
+        image.draft(mode, size)
+        image = image.convert(mode).resize(size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+        pixels = np.asarray(image, dtype=np.float32)
+    pixels *= 1.0 / 255
+    return pixels.reshape(-1)
+
+
+# Model of the current pool process, loaded by _init_worker
+_model = None
+
+
+def _init_worker(model_path, max_pixels):
+    global _model
+    from PIL import Image
+
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    _model = load_model(model_path)
+
+
+def _classify(path, top_k):
+    # Runs in a pool process. Errors are returned as ValueError so the web
+    # process can unpickle them without importing Pillow.
+    try:
+        pixels = load_pixels(path, _model["size"], _model["mode"])
+    except Exception as e:
+        raise ValueError(f"Cannot read image ({type(e).__name__})")
+    proba = _model["model"].predict_proba(pixels[np.newaxis])[0]
+    top = np.argsort(-proba, kind="stable")[:top_k]
+    labels = _model["labels"]
+    return [
+        {
+            "label": labels[i],
+            "confidence": round(float(proba[i]), 4),
+            "description": _model["descriptions"].get(labels[i], ""),
+        }
+        for i in top
+    ]
+
+
+class ImageAnalyzer:
+    def __init__(self, model_path=IMAGE_MODEL_PATH, workers=IMAGE_WORKERS, queue_size=IMAGE_QUEUE_SIZE,
+                 timeout=IMAGE_TIMEOUT, max_pixels=MAX_IMAGE_PIXELS):
+        self.model_path = model_path
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.max_pixels = max_pixels
+        self.pending = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        # Checked per request, so a model exported by train_image.py is
+        # picked up without a restart
+        return bool(self.model_path) and os.path.exists(self.model_path)
+
+    def _pool(self):
+        # Started on first use. "spawn" keeps the pool processes free of the
+        # web process's threads and memory.
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.model_path, self.max_pixels),
+                )
+            return self._executor
+
+    def analyze(self, path, top_k=3):
+        # Top-k labels for the image file at path. Raises QueueFull when too
+        # many images are in flight, TimeoutError after IMAGE_TIMEOUT seconds
+        # and ValueError for unreadable images.
+        with self._lock:
+            if self.pending >= self.queue_size:
+                raise QueueFull("Too many images are being analyzed")
+            self.pending += 1
+        try:
+            executor = self._pool()
+            future = executor.submit(_classify, path, top_k)
+        except BaseException:
+            self._release()
+            raise
+        # The slot is held until the job has finished: after a timeout the
+        # pool process keeps working on it, as cancel() cannot stop a
+        # running job
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+        except BrokenProcessPool:
+            # A pool process died, e.g. out of memory; start a fresh pool
+            # for the next request
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False)
+            raise
+
+    def _release(self, future=None):
+        with self._lock:
+            self.pending -= 1
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,181 @@
+# Feature encoding and model inference shared by the API routes.
+import logging
+import re
+import time
+
+import numpy as np
+
+import bitset
+import calibration
+
+logger = logging.getLogger(__name__)
+
+# Model keys in the artifact and the names reported to clients
+MODEL_NAMES = [("dt", "Decision Tree"), ("rf", "Random Forest"), ("nb", "Naive Bayes")]
+
+
+def symptom_id(feature):
+    # Canonical id of a CSV column: lowercase words joined by underscores, so
+    # "foul_smell_of urine" and "dischromic _patches" are also accepted as
+    # foul_smell_of_urine and dischromic_patches
+    return re.sub(r"[^a-z0-9]+", "_", feature.lower()).strip("_")
+
+
+def base_feature(feature, features):
+    # pandas names a repeated CSV column "name.1", "name.2", ...; the repeats
+    # are the same symptom as "name". Training.csv has fluid_overload twice
+    # and only fluid_overload.1 is ever set.
+    match = re.fullmatch(r"(.+)\.\d+", feature)
+    if match is not None and match.group(1) in features:
+        return match.group(1)
+    return feature
+
+
+def symptom_columns(features):
+    # Symptom name or canonical id -> every column of that symptom, so a
+    # repeated column is set together with the original
+    columns = {}
+    for i, feature in enumerate(features):
+        columns.setdefault(base_feature(feature, features), []).append(i)
+    lookup = {}
+    for feature in features:
+        lookup.setdefault(symptom_id(feature), columns[base_feature(feature, features)])
+    lookup.update((feature, columns[base_feature(feature, features)]) for feature in features)
+    return lookup
+
+
+def parse_weights(spec):
+    # "dt:1,rf:2,nb:0.5" -> {"dt": 1.0, "rf": 2.0, "nb": 0.5}; missing models weigh 1
+    weights = {key: 1.0 for key, _ in MODEL_NAMES}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        key, _, value = item.partition(":")
+        if key not in weights:
+            raise ValueError(f"Unknown model in ensemble weights: {key}")
+        weights[key] = float(value)
+    if any(w < 0 for w in weights.values()) or sum(weights.values()) <= 0:
+        raise ValueError("Ensemble weights must be non-negative with a positive sum")
+    return weights
+
+
+def invalid_symptoms(symptoms):
+    # Entries of a client's symptom list that are not strings, e.g. nested
+    # lists or objects; mask() only accepts strings
+    return [symptom for symptom in symptoms if not isinstance(symptom, str)]
+
+
+class SymptomModels:
+    def __init__(self, models, features, labels, weights=None, version=None, calibration=None):
+        self.models = models
+        self.features = list(features)
+        self.labels = list(labels)
+        self.weights = weights or parse_weights("")
+        self.total_weight = sum(self.weights.values())
+        # Confidence calibration from the artifact (see calibration.py); the
+        # curve only holds for the ensemble weights it was fitted with
+        self.calibration = calibration
+        if calibration is not None and calibration["weights"] != self.weights:
+            logger.warning(
+                f"Calibration was fitted for ensemble weights {calibration['weights']}, serving {self.weights}; "
+                "reporting uncalibrated confidence"
+            )
+            self.calibration = None
+        # Model version the predictions come from, e.g. for cache binding
+        self.version = version
+        # Optional callback(seconds, stage) timing each model's inference
+        self.observe = None
+        # Precomputed symptom -> columns bitmask by column name or canonical id
+        self.symptom_bit = {
+            s: sum(1 << i for i in columns) for s, columns in symptom_columns(self.features).items()
+        }
+        self.validate()
+
+    def validate(self):
+        # Check the feature layout once at load time so inference can pass
+        # plain arrays instead of DataFrames with column names
+        for key, _ in MODEL_NAMES:
+            model = self.models[key]
+            if model.n_features_in_ != len(self.features):
+                raise ValueError(
+                    f"Model {key} expects {model.n_features_in_} features, "
+                    f"artifact lists {len(self.features)}"
+                )
+            names = getattr(model, "feature_names_in_", None)
+            if names is not None and list(names) != self.features:
+                raise ValueError(f"Model {key} was fitted with a different feature order")
+
+    def mask(self, symptoms):
+        # Canonical bitmask of the recognized symptoms, laid out like a packed
+        # bitset row; order and duplicates in the request do not change it
+        mask = 0
+        unknown = []
+        for symptom in symptoms:
+            bit = self.symptom_bit.get(symptom)
+            if bit is None:
+                unknown.append(symptom)
+            else:
+                mask |= bit
+        return mask, unknown
+
+    def encode_bits(self, symptom_lists):
+        # Encode N symptom lists into N packed bitset rows (see bitset.py).
+        # Unknown symptoms are skipped and reported back per case.
+        masks = []
+        unknown = []
+        for symptoms in symptom_lists:
+            mask, missing = self.mask(symptoms)
+            masks.append(mask)
+            unknown.append(missing)
+        return bitset.from_masks(masks, len(self.features)), unknown
+
+    def encode(self, symptom_lists):
+        # Dense N x n_features 0/1 matrix for the models
+        bits, unknown = self.encode_bits(symptom_lists)
+        return self.densify(bits), unknown
+
+    def encode_masks(self, masks):
+        # Dense rows from masks returned by mask()
+        return self.densify(bitset.from_masks(masks, len(self.features)))
+
+    def densify(self, bits):
+        # The models take float rows; cases stay packed up to this point
+        return bitset.unpack(bits, len(self.features), np.float32)
+
+    def predict(self, X):
+        # Run each model once over the whole matrix
+        return {key: self.models[key].predict(X) for key, _ in MODEL_NAMES}
+
+    def predict_proba(self, X):
+        # Weighted average of the models' class probabilities, scattered into
+        # the full label table so every model votes over the same columns.
+        # Also returns each model's top label, which is what predict() gives.
+        fused = np.zeros((X.shape[0], len(self.labels)))
+        votes = np.empty((len(MODEL_NAMES), X.shape[0]), dtype=np.intp)
+        for i, (key, _) in enumerate(MODEL_NAMES):
+            model = self.models[key]
+            started = time.perf_counter()
+            proba = model.predict_proba(X)
+            if self.observe is not None:
+                self.observe(time.perf_counter() - started, f"model_{key}")
+            fused[:, model.classes_] += self.weights[key] * proba
+            votes[i] = model.classes_[proba.argmax(axis=1)]
+        fused /= self.total_weight
+        return fused, votes
+
+    def rank(self, X, k):
+        # Top-k labels per row by fused probability, highest first. Each label
+        # appears at most once per row, however many models picked it.
+        fused, votes = self.predict_proba(X)
+        top, confidence = self.top_k(fused, k)
+        return top, confidence, votes
+
+    def top_k(self, fused, k):
+        # Top-k labels and their probabilities from predict_proba's output.
+        # Labels are ranked by the fused scores, which calibration may tie.
+        k = max(1, min(k, len(self.labels)))
+        top = np.argpartition(-fused, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(fused, top, axis=1), axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        if self.calibration is not None:
+            fused = calibration.apply(self.calibration, fused)
+        confidence = np.take_along_axis(fused, top, axis=1)
+        return top, confidence
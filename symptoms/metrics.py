@@ -0,0 +1,172 @@
+# Minimal in-process metrics in the Prometheus text exposition format.
+#
+# Metrics are kept per process; with several gunicorn/uvicorn workers each
+# worker exposes its own counters on /metrics.
+import threading
+import time
+from bisect import bisect_left
+
+# Latency buckets in seconds, from 25us to 2.5s
+DEFAULT_BUCKETS = (
+    0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def collect(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # Optional callable returning {labels: value}, read at scrape time
+        self.callback = callback
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def collect(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            values = dict(self._values)
+        if self.callback is not None:
+            values.update(self.callback())
+        for labels, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, *labels):
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0] * (len(self.buckets) + 2)
+            state[index] += 1
+            state[-1] += seconds
+
+    def time(self, *labels):
+        return _Timer(self, labels)
+
+    def collect(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            values = {labels: list(state) for labels, state in self._values.items()}
+        for labels, state in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), state[:-1]):
+                cumulative += count
+                le = _format_labels(self.labelnames + ("le",), labels + (bound,))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            suffix = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{suffix} {state[-1]}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+registry = Registry()
+
+requests_total = registry.register(Counter(
+    "symptom_api_requests_total", "HTTP requests by endpoint and status code", ("endpoint", "status")
+))
+errors_total = registry.register(Counter(
+    "symptom_api_errors_total", "Requests that failed with an unexpected error", ("endpoint",)
+))
+request_seconds = registry.register(Histogram(
+    "symptom_api_request_seconds", "End-to-end request latency", ("endpoint",)
+))
+stage_seconds = registry.register(Histogram(
+    "symptom_api_stage_seconds", "Latency of each prediction stage", ("stage",)
+))
+unknown_symptoms_total = registry.register(Counter(
+    "symptom_api_unknown_symptoms_total", "Submitted symptoms that are not model features"
+))
+model_load_seconds = registry.register(Gauge(
+    "symptom_api_model_load_seconds", "Time taken to load or train the serving models"
+))
+batch_size = registry.register(Histogram(
+    "symptom_api_batch_size", "Cases scored together by the micro-batcher",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+))
+shadow_seconds = registry.register(Histogram(
+    "symptom_api_shadow_seconds", "Model latency of requests mirrored to the shadow model", ("model",)
+))
+capture_records_total = registry.register(Counter(
+    "symptom_api_capture_records_total", "Captured /api/predict requests written or dropped", ("result",)
+))
+model_info = registry.register(Gauge(
+    "symptom_api_model_info", "Currently served model version and inference engine", ("version", "engine")
+))
@@ -0,0 +1,240 @@
+# On-disk storage for the fitted models.
+#
+# An artifact directory holds a joblib payload with the fitted models, the
+# feature order, the label table and the confidence calibration, plus a manifest.json that records the
+# artifact format version, the payload checksum and when it was built. The
+# manifest is written last so readers never see a half-written artifact.
+#
+# A running server can follow the manifest with ArtifactWatcher: every worker
+# process polls it and loads a newly published artifact in the background.
+#
+# joblib and scikit-learn are imported by the functions that need them, so
+# importing this module stays cheap for a server that loads in the background.
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Bump whenever the payload layout changes so stale artifacts are rejected
+ARTIFACT_VERSION = 3
+
+DEFAULT_ARTIFACT_DIR = os.environ.get("MODEL_ARTIFACT_DIR", os.path.join(BASE_DIR, "artifacts"))
+MANIFEST_FILE = "manifest.json"
+
+# Number of payload files kept around after an export, including the current one
+KEEP_PAYLOADS = 2
+
+
+class ArtifactError(Exception):
+    pass
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _prune_payloads(directory, keep):
+    payloads = [
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.startswith("models-") and name.endswith(".joblib")
+    ]
+    payloads.sort(key=os.path.getmtime, reverse=True)
+    stale = payloads[keep:]
+    kept = {os.path.basename(path) for path in payloads[:keep]}
+    # Sidecars of removed payloads, e.g. compiled-<sha>.joblib
+    for name in os.listdir(directory):
+        prefix, _, key = name.partition("-")
+        if prefix != "models" and name.endswith(".joblib") and f"models-{key}" not in kept:
+            stale.append(os.path.join(directory, name))
+    for path in stale:
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f"Could not remove old model payload {path}: {e}")
+
+
+def save_artifact(models, features, labels, directory=DEFAULT_ARTIFACT_DIR, metadata=None, calibration=None):
+    import joblib
+    import sklearn
+
+    os.makedirs(directory, exist_ok=True)
+    payload = {
+        "models": models,
+        "features": list(features),
+        "labels": list(labels),
+        "calibration": calibration,
+    }
+
+    tmp_path = os.path.join(directory, f".models-{os.getpid()}.tmp")
+    joblib.dump(payload, tmp_path)
+    checksum = _sha256(tmp_path)
+    payload_file = f"models-{checksum[:12]}.joblib"
+    os.replace(tmp_path, os.path.join(directory, payload_file))
+
+    manifest = {
+        "artifact_version": ARTIFACT_VERSION,
+        "model_version": f"{time.strftime('%Y%m%d%H%M%S', time.gmtime())}-{checksum[:12]}",
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "payload": payload_file,
+        "sha256": checksum,
+        "sklearn_version": sklearn.__version__,
+        "n_features": len(payload["features"]),
+        "n_labels": len(payload["labels"]),
+    }
+    if calibration is not None:
+        manifest["calibration_ece"] = calibration["ece"]
+    if metadata:
+        manifest.update(metadata)
+
+    manifest_tmp = os.path.join(directory, f".{MANIFEST_FILE}-{os.getpid()}.tmp")
+    with open(manifest_tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_tmp, os.path.join(directory, MANIFEST_FILE))
+
+    _prune_payloads(directory, KEEP_PAYLOADS)
+    logger.info(f"Saved model artifact {manifest['model_version']} to {directory}")
+    return manifest
+
+
+def read_manifest(directory=DEFAULT_ARTIFACT_DIR):
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise ArtifactError(f"No model artifact found in {directory}")
+    except ValueError as e:
+        raise ArtifactError(f"Unreadable model manifest {manifest_path}: {e}")
+
+
+def verify_artifact(directory=DEFAULT_ARTIFACT_DIR):
+    # Manifest of a supported artifact whose payload is present and intact,
+    # without loading the models
+    manifest = read_manifest(directory)
+
+    if manifest.get("artifact_version") != ARTIFACT_VERSION:
+        raise ArtifactError(
+            f"Model artifact version {manifest.get('artifact_version')} is not supported "
+            f"(expected {ARTIFACT_VERSION})"
+        )
+
+    payload_path = os.path.join(directory, manifest["payload"])
+    if not os.path.exists(payload_path):
+        raise ArtifactError(f"Model payload {payload_path} is missing")
+    if _sha256(payload_path) != manifest["sha256"]:
+        raise ArtifactError(f"Checksum mismatch for model payload {payload_path}")
+    return manifest
+
+
+def load_artifact(directory=DEFAULT_ARTIFACT_DIR, features=None, labels=None, mmap_mode=None):
+    # With mmap_mode="r" the plain NumPy arrays in the payload, e.g. naive
+    # Bayes parameters, are memory-mapped read-only instead of copied, so
+    # every process that loads the same artifact shares their pages through
+    # the page cache. sklearn trees rebuild their node arrays in process
+    # memory; compiled.load_compiled memory-maps flat copies of them.
+    import joblib
+    import sklearn
+
+    manifest = verify_artifact(directory)
+    payload_path = os.path.join(directory, manifest["payload"])
+
+    if manifest.get("sklearn_version") != sklearn.__version__:
+        logger.warning(
+            f"Model artifact was built with scikit-learn {manifest.get('sklearn_version')}, "
+            f"running {sklearn.__version__}"
+        )
+
+    payload = joblib.load(payload_path, mmap_mode=mmap_mode)
+    if features is not None and payload["features"] != list(features):
+        raise ArtifactError("Model artifact feature order does not match the symptom list")
+    if labels is not None and payload["labels"] != list(labels):
+        raise ArtifactError("Model artifact labels do not match the disease list")
+
+    payload["manifest"] = manifest
+    return payload
+
+
+def _sidecar_path(directory, manifest, name):
+    return os.path.join(directory, f"{name}-{manifest['sha256'][:12]}.joblib")
+
+
+def save_sidecar(obj, directory, manifest, name):
+    # Data derived from a payload, stored next to it and pruned with it
+    import joblib
+
+    path = _sidecar_path(directory, manifest, name)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(obj, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_sidecar(directory, manifest, name, mmap_mode="r"):
+    # Returns None when the sidecar has not been written yet
+    import joblib
+
+    path = _sidecar_path(directory, manifest, name)
+    if not os.path.exists(path):
+        return None
+    return joblib.load(path, mmap_mode=mmap_mode)
+
+
+class ArtifactWatcher:
+    def __init__(self, on_change, current_version, directory=DEFAULT_ARTIFACT_DIR, interval=5.0, labels=None,
+                 mmap_mode=None):
+        # on_change(payload) is called with each newly published artifact;
+        # current_version() returns the model version being served
+        self.on_change = on_change
+        self.current_version = current_version
+        self.directory = directory
+        self.interval = interval
+        self.labels = labels
+        self.mmap_mode = mmap_mode
+        # Version that failed to load, not retried until a newer one appears
+        self._failed = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self):
+        # Load and hand over the published artifact if it is not the one in
+        # use; returns True when a new artifact was activated
+        try:
+            manifest = read_manifest(self.directory)
+        except ArtifactError:
+            return False
+        version = manifest.get("model_version")
+        if version in (self.current_version(), self._failed):
+            return False
+        try:
+            payload = load_artifact(self.directory, labels=self.labels, mmap_mode=self.mmap_mode)
+            self.on_change(payload)
+        except Exception:
+            self._failed = version
+            raise
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Could not load the published model artifact: {e}")
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="artifact-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,149 @@
+# Pre-serialized JSON for the condition metadata.
+#
+# Disease descriptions, recommendations and tests never change at runtime,
+# so each disease's JSON is encoded once at startup. A prediction response is
+# then put together from those bytes plus the few per-request numbers instead
+# of building and serializing fresh dicts for every condition. The output is
+# byte-for-byte what json.dumps gives for the equivalent dicts.
+#
+# The /api/catalog documents (symptoms, diseases with their urgency and
+# details) are likewise encoded and gzip-compressed once per feature set.
+import gzip
+import hashlib
+import json
+import re
+
+from inference import MODEL_NAMES, base_feature
+
+DISCLAIMER = "This is an AI-assisted diagnosis and should not replace professional medical advice."
+
+
+def dumps(payload):
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+def build_condition(name, details, urgency):
+    return {
+        "name": name,
+        "description": details.get("description", "No description available"),
+        "recommendations": details.get("recommendations", []),
+        "tests": details.get("tests", []),
+        "urgency": urgency
+    }
+
+
+def etag_of(body):
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+def envelope(payload, key):
+    # JSON of payload split around the contents of its (empty) list under key
+    encoded = dumps(dict(payload, **{key: []}))
+    head, tail = encoded.split(dumps(key) + b":[]")
+    return head + dumps(key) + b":[", b"]" + tail
+
+
+# Pieces of /api/predict and /api/predict/batch responses
+PREDICTION_HEAD, PREDICTION_TAIL = envelope({
+    "success": True,
+    "message": "Diagnosis completed",
+    "possibleConditions": [],
+    "disclaimer": DISCLAIMER,
+}, "possibleConditions")
+BATCH_HEAD, BATCH_TAIL = envelope({
+    "success": True,
+    "message": "Diagnosis completed",
+    "results": [],
+    "disclaimer": DISCLAIMER,
+}, "results")
+
+
+class ConditionPayloads:
+    def __init__(self, labels, disease_details, disease_urgency):
+        self.labels = list(labels)
+        # Condition object without its closing brace, ready for the
+        # per-request confidence and models fields
+        self.prefixes = []
+        # Full documents for /api/diseases/<id> and their (unquoted) strong ETags
+        self.documents = []
+        self.etags = []
+        for i, name in enumerate(self.labels):
+            condition = build_condition(name, disease_details.get(name, {}), disease_urgency.get(name, "low"))
+            self.prefixes.append(dumps(condition)[:-1])
+            document = dumps(dict(id=i, **condition))
+            self.documents.append(document)
+            self.etags.append(etag_of(document))
+        self.index = {name: i for i, name in enumerate(self.labels)}
+        # "models" lists for each subset of models, keyed by a bitmask
+        self.model_lists = [
+            dumps([name for bit, (_, name) in enumerate(MODEL_NAMES) if subset >> bit & 1])
+            for subset in range(1 << len(MODEL_NAMES))
+        ]
+
+    def lookup(self, key):
+        # Label index from a numeric id or a disease name; None if unknown
+        # isdigit() alone also accepts digits such as "²" that int() rejects
+        if key.isascii() and key.isdigit():
+            i = int(key)
+            return i if i < len(self.labels) else None
+        return self.index.get(key)
+
+    def conditions(self, labels, confidence, votes):
+        # JSON list contents of the ranked conditions of one case, best
+        # first. "models" lists the models whose own top prediction was that
+        # disease; conditions without any probability are cut off after the
+        # first one.
+        parts = []
+        for label, score in zip(labels.tolist(), confidence.tolist()):
+            if score <= 0 and parts:
+                break
+            subset = 0
+            for bit, vote in enumerate(votes.tolist()):
+                if vote == label:
+                    subset |= 1 << bit
+            parts.append(
+                self.prefixes[label] + b',"confidence":' + repr(round(score, 4)).encode() +
+                b',"models":' + self.model_lists[subset] + b"}"
+            )
+        return b",".join(parts)
+
+    def prediction(self, labels, confidence, votes):
+        return PREDICTION_HEAD + self.conditions(labels, confidence, votes) + PREDICTION_TAIL
+
+
+# Words kept lowercase inside symptom display names
+MINOR_WORDS = {"a", "an", "and", "at", "for", "from", "in", "of", "on", "or", "the", "to", "with"}
+
+
+def symptom_name(feature):
+    # Display name of a symptom feature, e.g. "Watering from Eyes" for
+    # watering_from_eyes and "Toxic Look (Typhos)" for toxic_look_(typhos)
+    words = feature.replace("_", " ").lower().split()
+    return " ".join(
+        word if i and word in MINOR_WORDS else re.sub(r"[a-z]", lambda m: m.group().upper(), word, count=1)
+        for i, word in enumerate(words)
+    )
+
+
+class Catalog:
+    # /api/catalog documents: the whole catalog under "", and its "symptoms"
+    # and "diseases" parts. Each is kept as (JSON, gzip of the JSON, strong
+    # ETag of the JSON). "version" identifies the catalog content, so a
+    # client can tell whether the parts it holds belong together.
+    def __init__(self, features, labels, disease_details, disease_urgency, urgency_levels, symptom_synonyms):
+        symptoms = [
+            {"id": feature, "name": symptom_name(feature), "synonyms": symptom_synonyms.get(feature, [])}
+            # One entry per symptom; its id also sets the repeated columns
+            for feature in features if base_feature(feature, features) == feature
+        ]
+        diseases = [
+            dict(id=i, **build_condition(name, disease_details.get(name, {}), disease_urgency.get(name, "low")))
+            for i, name in enumerate(labels)
+        ]
+        catalog = {"symptoms": symptoms, "diseases": diseases, "urgencyLevels": urgency_levels}
+        self.version = etag_of(dumps(catalog))[:16]
+        self.documents = {}
+        for part, payload in (("", catalog), ("symptoms", {"symptoms": symptoms}), ("diseases", {"diseases": diseases})):
+            body = dumps(dict(version=self.version, **payload))
+            # mtime=0 keeps the compressed bytes identical across processes
+            self.documents[part] = (body, gzip.compress(body, mtime=0), etag_of(body))
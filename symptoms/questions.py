@@ -0,0 +1,93 @@
+# Adaptive questioning: which symptom to ask about next.
+#
+# Per-disease symptom frequencies are counted once from the recorded cases
+# (Training.csv plus appended cases, through the similar-cases index) and
+# smoothed, giving P(symptom | disease) for every pair. The answers so far
+# are turned into a posterior over the diseases with naive Bayes: each
+# confirmed symptom multiplies in P(s | d), each denied one 1 - P(s | d), and
+# symptoms nobody asked about are left out. For every candidate symptom the
+# expected entropy of the posterior after a yes or a no is then computed for
+# all candidates at once as a few (n_diseases, n_symptoms) array operations,
+# and the symptom with the largest expected reduction in entropy
+# (information gain) is asked next. Entropies are in bits.
+import numpy as np
+
+import bitset
+
+
+LOG2 = np.log(2)
+
+
+class QuestionPlanner:
+    def __init__(self, counts, totals, alpha=1.0):
+        # counts[d, s]: recorded cases of disease d with symptom s;
+        # totals[d]: recorded cases of disease d
+        counts = np.asarray(counts, dtype=np.float64)
+        totals = np.asarray(totals, dtype=np.float64)
+        # Diseases without any recorded case can never be the answer
+        self.labels = np.flatnonzero(totals > 0)
+        counts = counts[self.labels]
+        totals = totals[self.labels]
+        # Laplace-smoothed P(s | d), so a single unusual answer never rules a
+        # disease out completely; every frequency is strictly between 0 and 1
+        self.frequency = (counts + alpha) / (totals[:, np.newaxis] + 2 * alpha)
+        self.log_yes = np.log(self.frequency)
+        self.log_no = np.log1p(-self.frequency)
+        self.log_prior = np.log(totals / totals.sum())
+
+    def posterior(self, confirmed, denied):
+        # P(d | answers) over self.labels and its logarithm
+        log_p = self.log_prior + self.log_yes[:, confirmed].sum(axis=1) + self.log_no[:, denied].sum(axis=1)
+        log_p -= log_p.max()
+        log_p -= np.log(np.exp(log_p).sum())
+        return np.exp(log_p), log_p
+
+    def information_gain(self, p, log_p):
+        # Expected entropy reduction of asking each symptom. The joint
+        # probabilities of disease and answer are p * P(s | d) and
+        # p * (1 - P(s | d)); their logarithms come from the precomputed
+        # tables instead of a log over the whole table per request. The
+        # entropy of the posterior after an answer with probability q is
+        # log q - sum(joint * log joint) / q.
+        p = p[:, np.newaxis]
+        log_p = log_p[:, np.newaxis]
+        yes = p * self.frequency
+        no = p - yes
+        p_yes = yes.sum(axis=0)
+        p_no = 1.0 - p_yes
+        expected = (
+            xlogx(p_yes) + xlogx(p_no)
+            - (yes * (log_p + self.log_yes)).sum(axis=0)
+            - (no * (log_p + self.log_no)).sum(axis=0)
+        )
+        return (-(p * log_p).sum() - expected) / LOG2
+
+    def next_question(self, confirmed, denied):
+        # (symptom column or None, its information gain in bits, posterior,
+        # entropy of the posterior in bits). Symptoms already answered are not
+        # asked again; None when no remaining answer would change the posterior.
+        p, log_p = self.posterior(confirmed, denied)
+        gain = self.information_gain(p, log_p)
+        gain[confirmed] = -np.inf
+        gain[denied] = -np.inf
+        best = int(np.argmax(gain))
+        entropy = float(-(p * log_p).sum() / LOG2)
+        if not gain[best] > 1e-9:
+            return None, 0.0, p, entropy
+        return best, float(gain[best]), p, entropy
+
+
+def xlogx(x):
+    # x * log(x) with 0 * log(0) = 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(x > 0, x * np.log(x), 0.0)
+
+
+def planner_from_index(index, n_labels, alpha=1.0):
+    # Frequencies from the deduplicated patterns of a similar.CaseIndex,
+    # weighted by how many recorded cases each pattern stands for
+    flags = bitset.unpack(index.bits, len(index.columns), np.float64)
+    counts = np.zeros((n_labels, len(index.columns)))
+    np.add.at(counts, index.labels, flags * index.counts[:, np.newaxis])
+    totals = np.bincount(index.labels, weights=index.counts, minlength=n_labels)
+    return QuestionPlanner(counts, totals, alpha)
@@ -0,0 +1,132 @@
+# Incremental retraining from cases appended through the API.
+#
+# Labelled cases are appended to train.APPENDED_CSV, which has the same header
+# as Training.csv. Every append
+#   1. updates a copy of the naive Bayes model with partial_fit and publishes
+#      it right away as a new artifact, next to the unchanged trees, and
+#   2. schedules a refit of all models on Training.csv plus every appended
+#      case REFIT_DELAY seconds later. Cases appended in the meantime are
+#      picked up by the same refit.
+# Artifacts are published through model_store, so every worker process picks
+# them up with its ArtifactWatcher and swaps them in without a restart. With
+# several workers, concurrent partial_fit updates may overwrite each other;
+# the next refit trains on every logged case either way.
+import copy
+import csv
+import fcntl
+import logging
+import os
+import threading
+
+import numpy as np
+
+import model_store
+import train
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait after an append before refitting every model
+REFIT_DELAY = float(os.environ.get("REFIT_DELAY", "300"))
+
+
+class CaseLog:
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = list(columns)
+
+    def append(self, X, prognoses):
+        # Rows of 0/1 flags in column order and their disease names. The file
+        # lock keeps rows from several workers from interleaving.
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", newline="") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                writer = csv.writer(f)
+                if os.fstat(f.fileno()).st_size == 0:
+                    writer.writerow(self.columns + ["prognosis"])
+                for row, prognosis in zip(X, prognoses):
+                    writer.writerow(row.tolist() + [prognosis])
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class Retrainer:
+    def __init__(self, publish, case_log, directory=model_store.DEFAULT_ARTIFACT_DIR, refit_delay=REFIT_DELAY):
+        # publish(payload) activates an artifact payload in this process
+        self.publish = publish
+        self.case_log = case_log
+        self.directory = directory
+        self.refit_delay = refit_delay
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def add_cases(self, artifact, X, y):
+        # Log the cases, publish the served models with an updated naive Bayes
+        # and schedule a full refit. Returns the new artifact's manifest.
+        with self._lock:
+            labels = artifact["labels"]
+            self.case_log.append(X, [labels[label] for label in y])
+
+            nb = copy.deepcopy(artifact["models"]["nb"])
+            # partial_fit cannot add classes; cases of a disease the model has
+            # never seen wait for the refit
+            known = np.isin(y, nb.classes_)
+            if known.any():
+                nb.partial_fit(X[known], y[known])
+            models = dict(artifact["models"], nb=nb)
+
+            # The calibration is kept until the refit fits a new one
+            calibration = artifact.get("calibration")
+            manifest = model_store.save_artifact(
+                models, artifact["features"], labels,
+                directory=self.directory, calibration=calibration,
+                metadata={
+                    "update": "partial_fit",
+                    "base_version": artifact["manifest"]["model_version"],
+                    "appended_rows": int(len(y)),
+                },
+            )
+            self.publish({
+                "models": models, "features": artifact["features"], "labels": labels, "calibration": calibration,
+                "manifest": manifest,
+            })
+            self._schedule_refit()
+        return manifest
+
+    def _schedule_refit(self):
+        if self._timer is None:
+            self._timer = threading.Timer(self.refit_delay, self.refit)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def refit(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        try:
+            built = train.build_artifact(appended_csv=self.case_log.path, params=train.load_params(self.directory))
+            manifest = model_store.save_artifact(
+                built["models"], built["features"], built["labels"],
+                directory=self.directory, calibration=built["calibration"],
+                metadata={
+                    "update": "refit",
+                    "params": built["params"],
+                    "training_file": os.path.basename(train.TRAINING_CSV),
+                    "training_rows": built["training_rows"],
+                    "training_seconds": built["training_seconds"],
+                },
+            )
+            built["manifest"] = manifest
+            self.publish(built)
+            return manifest
+        except Exception as e:
+            logger.error(f"Model refit failed: {e}")
+            return None
+
+    def cancel(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
@@ -0,0 +1,321 @@
+# Offline bulk scoring of case files.
+#
+# Scores every case of a CSV or NDJSON file with the exported model artifact,
+# the same feature order and ensemble as the API, without going through HTTP.
+#   - CSV input has a header with every feature column of the artifact, in
+#     any order; other columns, such as prognosis, are ignored. Values are
+#     0/1 flags, as in Training.csv.
+#   - NDJSON input has one {"symptoms": [...]} object per line, optionally
+#     with an "id"; without one the 0-based line number is used. Unknown
+#     symptoms are counted and ignored. A line that is not valid JSON, or
+#     whose symptoms are not a list of strings, stops the run with an error
+#     naming the line.
+# The parent process only cuts the input into chunks of about --chunk-mb
+# megabytes at line boundaries and writes results. Parsing, scoring and formatting run
+# in a pool of --workers processes, each of which memory-maps the artifact
+# once. At most two chunks per worker are in flight and results are written
+# in input order as they complete, so memory stays bounded however large the
+# file is.
+#
+# The output has one line per case with its row number (or id), and the
+# topK conditions with their ensemble confidence. It is CSV unless the output
+# file ends in .ndjson or .jsonl.
+#
+# Usage: python score.py cases.csv -o scores.csv [--workers 4] [--chunk-mb 16] [--top-k 3]
+#        python score.py cases.ndjson -o scores.ndjson [--engine compiled]
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import bitset
+import model_store
+
+logger = logging.getLogger(__name__)
+
+# Models of the current pool process, loaded by _init_worker, and the
+# layout of the CSV header it last saw
+_models = None
+_layout = None
+
+
+def _init_worker(directory, engine, weights):
+    global _models
+    from conditions import disease
+    from inference import SymptomModels, parse_weights
+
+    artifact = model_store.load_artifact(directory, labels=disease, mmap_mode="r")
+    models = artifact["models"]
+    if engine == "compiled":
+        import compiled
+        models = compiled.load_compiled(models, artifact["features"], directory, artifact["manifest"])
+    _models = SymptomModels(
+        models, artifact["features"], artifact["labels"], weights=parse_weights(weights),
+        calibration=artifact.get("calibration"),
+    )
+
+
+def parse_flags(chunk, n_columns, positions):
+    # Fast path for plain 0/1 CSV lines: every feature field is a single
+    # digit, so its value is the byte just before the separator that ends
+    # it. Returns None when the chunk needs the full CSV parser, e.g. for
+    # quoted fields, blank lines or other values.
+    if b'"' in chunk:
+        return None
+    chunk = chunk.replace(b"\r", b"")
+    if not chunk.endswith(b"\n"):
+        chunk += b"\n"
+    data = np.frombuffer(chunk, dtype=np.uint8)
+    ends = np.flatnonzero((data == ord(",")) | (data == ord("\n")))
+    n_rows = chunk.count(b"\n")
+    if len(ends) != n_rows * n_columns:
+        return None
+    ends = ends.reshape(n_rows, n_columns)
+    # With one newline per row, each of them ending its row, every line has
+    # exactly n_columns fields
+    if (data[ends[:, -1]] != ord("\n")).any():
+        return None
+    positions = np.asarray(positions)
+    if len(positions) and (np.diff(positions) == 1).all():
+        # Features in one block of columns, as in Training.csv
+        feature_ends = ends[:, positions[0]:positions[-1] + 1]
+    else:
+        feature_ends = ends[:, positions]
+    # Single-character fields: two bytes back is the previous separator. For
+    # the first field of the chunk that is index -1, the final newline.
+    before = data[feature_ends - 2]
+    if ((before != ord(",")) & (before != ord("\n"))).any():
+        return None
+    flags = data[feature_ends - 1] - ord("0")
+    # Bytes below "0" wrap around and fail this check as well
+    if flags.size and flags.max() > 1:
+        return None
+    return flags
+
+
+def csv_layout(header, features):
+    # Number of columns and the position of every feature in the header
+    import pandas as pd
+
+    # Column names as pandas, and so dataset.py, names them
+    columns = list(pd.read_csv(io.BytesIO(header), nrows=0).columns)
+    missing = [feature for feature in features if feature not in columns]
+    if missing:
+        raise ValueError(f"Input is missing feature columns: {missing}")
+    return len(columns), [columns.index(feature) for feature in features]
+
+
+def parse_csv(header, chunk, features):
+    # Packed feature rows from a chunk of CSV lines
+    global _layout
+    if _layout is None or _layout[0] != header:
+        _layout = (header, *csv_layout(header, features))
+    _, n_columns, positions = _layout
+    flags = parse_flags(chunk, n_columns, positions)
+    if flags is None:
+        import pandas as pd
+
+        frame = pd.read_csv(io.BytesIO(header + chunk), header=0, usecols=features, dtype=np.uint8)
+        flags = frame[features].to_numpy()
+        if flags.size and flags.max() > 1:
+            raise ValueError("CSV has symptom values other than 0 and 1")
+    return bitset.pack(flags), None, 0
+
+
+def parse_ndjson(chunk, models, first_row):
+    # Packed feature rows, ids and the unknown symptom count. Cases without
+    # an "id" get their 0-based line number; blank lines are skipped but
+    # still counted.
+    from inference import invalid_symptoms
+
+    masks = []
+    ids = []
+    unknown = 0
+    for row, line in enumerate(chunk.split(b"\n"), first_row):
+        if not line.strip():
+            continue
+        try:
+            case = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Line {row + 1}: invalid JSON ({e})")
+        symptoms = case.get("symptoms") if isinstance(case, dict) else None
+        if symptoms is None:
+            symptoms = []
+        if not isinstance(symptoms, list) or invalid_symptoms(symptoms):
+            raise ValueError(f"Line {row + 1}: symptoms must be a list of strings")
+        mask, missing = models.mask(symptoms)
+        masks.append(mask)
+        key = case.get("id")
+        ids.append(row if key is None else key)
+        unknown += len(missing)
+    return bitset.from_masks(masks, len(models.features)), ids, unknown
+
+
+def csv_fields(rows):
+    # Each row's fields as one CSV-formatted string, quoted where needed
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="")
+    formatted = []
+    for row in rows:
+        output.seek(0)
+        output.truncate()
+        writer.writerow(row)
+        formatted.append(output.getvalue())
+    return formatted
+
+
+def format_csv(first_row, ids, labels, confidence, names, inverse):
+    # Each distinct case is formatted once
+    suffixes = csv_fields(
+        [value for label, score in zip(row_labels, row_confidence) for value in (names[label], round(score, 4))]
+        for row_labels, row_confidence in zip(labels.tolist(), confidence.tolist())
+    )
+    keys = csv_fields([key] for key in ids) if ids is not None else range(first_row, first_row + len(inverse))
+    return "".join(f"{key},{suffixes[i]}\n" for key, i in zip(keys, inverse.tolist())).encode()
+
+
+def format_ndjson(first_row, ids, labels, confidence, names, inverse):
+    conditions = [
+        json.dumps([
+            {"name": names[label], "confidence": round(score, 4)}
+            for label, score in zip(row_labels, row_confidence)
+        ], separators=(",", ":"))
+        for row_labels, row_confidence in zip(labels.tolist(), confidence.tolist())
+    ]
+    keys = ids if ids is not None else range(first_row, first_row + len(inverse))
+    return "".join(
+        f'{{"id":{json.dumps(key)},"possibleConditions":{conditions[i]}}}\n' for key, i in zip(keys, inverse.tolist())
+    ).encode()
+
+
+def _score_chunk(first_row, chunk, header, top_k, output_format):
+    # Runs in a pool process; returns (output bytes, rows, unknown symptoms).
+    # Case files repeat the same symptom combinations over and over, so only
+    # the distinct rows of the chunk are scored and formatted.
+    if header is None:
+        bits, ids, unknown = parse_ndjson(chunk, _models, first_row)
+    else:
+        bits, ids, unknown = parse_csv(header, chunk, _models.features)
+    if not len(bits):
+        return b"", 0, unknown
+    unique, inverse = np.unique(bits, axis=0, return_inverse=True)
+    labels, confidence, _ = _models.rank(_models.densify(unique), top_k)
+    formatter = format_ndjson if output_format == "ndjson" else format_csv
+    return formatter(first_row, ids, labels, confidence, _models.labels, inverse.reshape(-1)), len(bits), unknown
+
+
+def read_chunks(f, chunk_bytes):
+    # (first row number, raw lines) pairs of about chunk_bytes each, cut at
+    # line boundaries
+    first_row = 0
+    while True:
+        chunk = f.read(chunk_bytes)
+        if not chunk:
+            return
+        if not chunk.endswith(b"\n"):
+            chunk += f.readline()
+        yield first_row, chunk
+        first_row += chunk.count(b"\n") + (not chunk.endswith(b"\n"))
+
+
+def output_header(top_k):
+    fields = ["id"]
+    for i in range(1, top_k + 1):
+        fields += [f"condition_{i}", f"confidence_{i}"]
+    output = io.StringIO()
+    csv.writer(output, lineterminator="\n").writerow(fields)
+    return output.getvalue().encode()
+
+
+def score_file(input_path, output, input_format, output_format, workers, chunk_bytes, top_k,
+               directory=model_store.DEFAULT_ARTIFACT_DIR, engine="sklearn", weights=""):
+    # Streams input_path through the pool into the binary file object output;
+    # returns (rows, unknown symptoms)
+    # Check the artifact once here: a failure in the pool initializer would
+    # only surface as a BrokenProcessPool
+    model_store.verify_artifact(directory)
+    rows = 0
+    unknown = 0
+    with open(input_path, "rb") as f, ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(directory, engine, weights)
+    ) as executor:
+        header = f.readline() if input_format == "csv" else None
+        if output_format == "csv":
+            output.write(output_header(top_k))
+        pending = deque()
+        for first_row, chunk in read_chunks(f, chunk_bytes):
+            pending.append(executor.submit(_score_chunk, first_row, chunk, header, top_k, output_format))
+            # Bound the chunks held in memory: wait for the oldest one before
+            # reading further
+            while len(pending) >= 2 * workers:
+                body, n, missing = pending.popleft().result()
+                output.write(body)
+                rows += n
+                unknown += missing
+        while pending:
+            body, n, missing = pending.popleft().result()
+            output.write(body)
+            rows += n
+            unknown += missing
+    return rows, unknown
+
+
+def file_format(path, default):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".ndjson", ".jsonl"):
+        return "ndjson"
+    if extension == ".csv":
+        return "csv"
+    return default
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a CSV or NDJSON file of cases with the exported models.")
+    parser.add_argument("input", help="CSV with the feature columns, or NDJSON of {\"symptoms\": [...]}")
+    parser.add_argument("-o", "--output", default="-", help="output file, - for stdout")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="input format; by default from the extension")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="scoring processes")
+    parser.add_argument("--chunk-mb", type=float, default=16, help="approximate chunk size in megabytes")
+    parser.add_argument("--top-k", type=int, default=3, help="conditions per case")
+    parser.add_argument("--artifact-dir", default=model_store.DEFAULT_ARTIFACT_DIR, help="model artifact directory")
+    parser.add_argument("--engine", choices=["sklearn", "compiled"], default=os.environ.get("INFERENCE_ENGINE", "sklearn"))
+    args = parser.parse_args(argv)
+    if args.top_k < 1 or args.chunk_mb <= 0 or args.workers < 1:
+        parser.error("--top-k, --chunk-mb and --workers must be positive")
+
+    input_format = args.format or file_format(args.input, "csv")
+    output_format = file_format(args.output, "csv")
+    output = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    started = time.perf_counter()
+    try:
+        rows, unknown = score_file(
+            args.input, output, input_format, output_format, args.workers, max(1, int(args.chunk_mb * 1e6)), args.top_k,
+            directory=args.artifact_dir, engine=args.engine, weights=os.environ.get("ENSEMBLE_WEIGHTS", ""),
+        )
+    except (ValueError, model_store.ArtifactError) as e:
+        print(f"Cannot score {args.input}: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+    elapsed = time.perf_counter() - started
+
+    size = os.path.getsize(args.input)
+    print(f"Scored {rows} rows in {elapsed:.2f}s: {rows / elapsed:,.0f} rows/s, "
+          f"{size / elapsed / 1e6:.1f} MB/s of input", file=sys.stderr)
+    if unknown:
+        print(f"{unknown} unknown symptoms were ignored", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(main())
@@ -0,0 +1,148 @@
+# Shadow evaluation of a candidate model on live traffic.
+#
+# A candidate artifact, e.g. one exported by tune.py to another directory, is
+# loaded next to the serving models when SHADOW_ARTIFACT_DIR is set. Every
+# /api/predict case the serving models score is offered to ShadowEvaluator,
+# which puts the symptoms and the served ranking on a bounded queue without
+# waiting: when the queue is full the case is dropped and counted, so the
+# request never blocks on the candidate. A background thread scores the
+# queued cases one at a time with the candidate, as a single request would be
+# scored, and records
+#   - top-1 agreement: the candidate's best condition is the served one,
+#   - top-k agreement: the candidate's best condition is among the served ones,
+#   - candidate and serving model latency.
+# SHADOW_SAMPLE_RATE mirrors only a fraction of the traffic when the extra
+# CPU matters. Responses served from the cache are not mirrored.
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+import metrics
+import model_store
+from inference import SymptomModels
+
+logger = logging.getLogger(__name__)
+
+SHADOW_ARTIFACT_DIR = os.environ.get("SHADOW_ARTIFACT_DIR", "")
+# "sklearn" or "compiled", as INFERENCE_ENGINE
+SHADOW_ENGINE = os.environ.get("SHADOW_ENGINE", "sklearn")
+SHADOW_QUEUE_SIZE = int(os.environ.get("SHADOW_QUEUE_SIZE", "1024"))
+SHADOW_SAMPLE_RATE = float(os.environ.get("SHADOW_SAMPLE_RATE", "1.0"))
+
+# Latency samples kept for the percentiles in stats()
+LATENCY_WINDOW = 10000
+
+
+def percentiles_micros(samples):
+    if not samples:
+        return None
+    values = np.percentile(np.fromiter(samples, dtype=np.float64), [50, 95, 99]) * 1e6
+    return {f"p{q}": round(float(v), 1) for q, v in zip((50, 95, 99), values)}
+
+
+class ShadowEvaluator:
+    def __init__(self, candidate, queue_size=SHADOW_QUEUE_SIZE, sample_rate=SHADOW_SAMPLE_RATE):
+        self.candidate = candidate
+        self.sample_rate = sample_rate
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.offered = 0
+        self.dropped = 0
+        self.scored = 0
+        self.errors = 0
+        self.top1_agreements = 0
+        self.topk_agreements = 0
+        self.latency = {"serving": deque(maxlen=LATENCY_WINDOW), "candidate": deque(maxlen=LATENCY_WINDOW)}
+
+    def offer(self, symptoms, labels, seconds):
+        # Called on the request path: symptoms as submitted, the served label
+        # ranking and the serving models' time. Never blocks.
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait((symptoms, labels, seconds))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return
+        with self._lock:
+            self.offered += 1
+
+    def _start(self):
+        # Started on first use, so a worker forked from a preloading master
+        # gets its own thread
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="shadow", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            symptoms, labels, seconds = self._queue.get()
+            try:
+                mask, _ = self.candidate.mask(symptoms)
+                started = time.perf_counter()
+                top, _, _ = self.candidate.rank(self.candidate.encode_masks([mask]), len(labels))
+                elapsed = time.perf_counter() - started
+            except Exception as e:
+                logger.error(f"Shadow model failed: {e}")
+                with self._lock:
+                    self.errors += 1
+                continue
+            best = int(top[0, 0])
+            with self._lock:
+                self.scored += 1
+                self.top1_agreements += best == labels[0]
+                self.topk_agreements += best in labels
+                self.latency["serving"].append(seconds)
+                self.latency["candidate"].append(elapsed)
+            metrics.shadow_seconds.observe(seconds, "serving")
+            metrics.shadow_seconds.observe(elapsed, "candidate")
+
+    def counters(self):
+        with self._lock:
+            scored = self.scored
+            return {
+                "offered": self.offered,
+                "dropped": self.dropped,
+                "scored": scored,
+                "errors": self.errors,
+                "queued": self._queue.qsize(),
+                "top1Agreement": round(self.top1_agreements / scored, 4) if scored else None,
+                "topKAgreement": round(self.topk_agreements / scored, 4) if scored else None,
+            }
+
+    def stats(self):
+        stats = {"candidateVersion": self.candidate.version, "sampleRate": self.sample_rate}
+        stats.update(self.counters())
+        with self._lock:
+            latency = {name: list(samples) for name, samples in self.latency.items()}
+        stats["latencyMicros"] = {name: percentiles_micros(samples) for name, samples in latency.items()}
+        return stats
+
+
+def load_evaluator(labels, weights=None, directory=SHADOW_ARTIFACT_DIR, engine=SHADOW_ENGINE):
+    # ShadowEvaluator for the artifact in directory, or None when no shadow
+    # model is configured
+    if not directory:
+        return None
+    artifact = model_store.load_artifact(directory, labels=labels, mmap_mode="r")
+    models = artifact["models"]
+    if engine == "compiled":
+        import compiled
+        models = compiled.load_compiled(models, artifact["features"], directory, artifact["manifest"])
+    candidate = SymptomModels(
+        models, artifact["features"], artifact["labels"], weights=weights,
+        version=artifact["manifest"]["model_version"], calibration=artifact.get("calibration"),
+    )
+    logger.info(f"Shadowing /api/predict with model version {candidate.version} ({engine}) from {directory}")
+    return ShadowEvaluator(candidate)
@@ -0,0 +1,102 @@
+# Nearest recorded cases for a set of symptoms.
+#
+# Training rows are deduplicated into distinct (symptom bitset, prognosis)
+# patterns with a row count; Training.csv's 4,920 rows collapse to a few
+# hundred. An inverted index maps each symptom column to the patterns that
+# have it, stored as one CSR pair of arrays. A query only touches the posting
+# lists of its own symptoms: counting pattern ids over those lists gives the
+# intersection size with every candidate, from which the Jaccard similarity
+# |q & p| / |q | p| follows with the precomputed pattern sizes. Patterns that
+# share no symptom with the query are never visited.
+import os
+
+import numpy as np
+
+import bitset
+import dataset
+from inference import symptom_columns
+
+
+class CaseIndex:
+    def __init__(self, bits, y, columns):
+        self.columns = list(columns)
+        # Columns by name or canonical id, as in SymptomModels
+        self.column_index = symptom_columns(self.columns)
+        bits = np.asarray(bits, dtype="<u8").reshape(len(y), -1)
+        y = np.asarray(y)
+
+        keys = np.concatenate([bits, y.astype("<u8")[:, np.newaxis]], axis=1)
+        unique, counts = np.unique(keys, axis=0, return_counts=True)
+        self.bits = np.ascontiguousarray(unique[:, :-1])
+        self.labels = unique[:, -1].astype(np.intp)
+        self.counts = counts
+        self.sizes = bitset.popcount(self.bits)
+        self.n_rows = int(len(y))
+
+        # Posting list of column c: patterns[indptr[c]:indptr[c + 1]]
+        postings = []
+        for col in range(len(self.columns)):
+            word = self.bits[:, col >> 6]
+            postings.append(np.flatnonzero((word >> np.uint64(col & 63)) & np.uint64(1)))
+        self.indptr = np.zeros(len(self.columns) + 1, dtype=np.intp)
+        self.indptr[1:] = np.cumsum([len(p) for p in postings])
+        self.patterns = np.concatenate(postings) if postings else np.empty(0, dtype=np.intp)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def columns_of(self, symptoms):
+        # Distinct known columns of the query and the unknown symptoms
+        cols = set()
+        unknown = []
+        for symptom in symptoms:
+            columns = self.column_index.get(symptom)
+            if columns is None:
+                unknown.append(symptom)
+            else:
+                cols.update(columns)
+        return sorted(cols), unknown
+
+    def query(self, cols, k):
+        # Top-k patterns by Jaccard similarity, then by row count; returns
+        # (pattern ids, similarity, shared symptom count)
+        if not cols or k < 1:
+            return np.empty(0, dtype=np.intp), np.empty(0), np.empty(0, dtype=np.intp)
+        ids = np.concatenate([self.patterns[self.indptr[c]:self.indptr[c + 1]] for c in cols])
+        # Intersection size for every hit; a pattern appears once per shared
+        # symptom. bincount is a single pass over all patterns, for short
+        # posting lists sorting just the hits is cheaper.
+        if len(ids) * 8 >= len(self):
+            shared = np.bincount(ids, minlength=len(self))[ids]
+        else:
+            _, inverse, counts = np.unique(ids, return_inverse=True, return_counts=True)
+            shared = counts[inverse]
+        similarity = shared / (len(cols) + self.sizes[ids] - shared)
+
+        # One entry per pattern, then every pattern at least as similar as
+        # the k-th best, so ties at the cutoff are decided by row count below
+        ids, first = np.unique(ids, return_index=True)
+        similarity, shared = similarity[first], shared[first]
+        if len(ids) > k:
+            cutoff = np.partition(similarity, len(ids) - k)[len(ids) - k]
+            top = similarity >= cutoff
+            ids, similarity, shared = ids[top], similarity[top], shared[top]
+        order = np.lexsort((ids, -self.counts[ids], -similarity))[:k]
+        return ids[order], similarity[order], shared[order]
+
+    def symptoms_of(self, pattern):
+        row = bitset.unpack(self.bits[pattern:pattern + 1], len(self.columns))[0]
+        return [self.columns[col] for col in np.flatnonzero(row)]
+
+
+def load_index(training_csv, appended_csv=None):
+    # Index over the training rows plus any cases appended through the API
+    data = dataset.load(training_csv)
+    bits = np.asarray(data.bits)
+    y = np.asarray(data.y)
+    if appended_csv and os.path.exists(appended_csv):
+        appended = dataset.load(appended_csv)
+        dataset.check_columns(appended.columns, data.columns, appended_csv)
+        bits = np.concatenate([bits, appended.bits])
+        y = np.concatenate([y, appended.y])
+    return CaseIndex(bits, y, data.columns)
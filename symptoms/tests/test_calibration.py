@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+import calibration
+import train
+from conditions import disease
+from inference import SymptomModels, parse_weights
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    X, y, features = train.load_dataset(train.TRAINING_CSV)
+    weights = parse_weights("")
+    models = train.train_models(X, y)
+    curve = calibration.fit(X, y, train.DEFAULT_PARAMS, list(features), list(disease), weights)
+    return X, y, features, models, curve
+
+
+def test_calibration_lowers_the_held_out_error(fitted):
+    _, _, _, _, curve = fitted
+    assert curve["ece"]["calibrated"] < curve["ece"]["uncalibrated"] / 2
+
+
+def test_calibrated_confidence_keeps_the_ranking(fitted):
+    X, _, features, models, curve = fitted
+    partial = calibration.partial_cases(X[:500], np.random.default_rng(0))
+    raw = SymptomModels(models, features, disease)
+    calibrated = SymptomModels(models, features, disease, calibration=curve)
+    raw_top, raw_confidence, _ = raw.rank(partial, 5)
+    top, confidence, _ = calibrated.rank(partial, 5)
+    assert (top == raw_top).all()
+    assert (confidence <= 1 + 1e-12).all() and (np.diff(confidence, axis=1) <= 1e-12).all()
+    assert not np.allclose(confidence, raw_confidence)
+
+
+def test_calibration_for_other_weights_is_not_applied(fitted):
+    _, _, features, models, curve = fitted
+    models = SymptomModels(models, features, disease, weights=parse_weights("rf:2"), calibration=curve)
+    assert models.calibration is None
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+import compiled
+import train
+
+# The default models plus the alternatives tune.py can select
+PARAMS = {
+    "default": train.DEFAULT_PARAMS,
+    "tuned": {
+        "dt": {"estimator": "DecisionTreeClassifier", "params": {"criterion": "entropy", "random_state": 42}},
+        "rf": {"estimator": "RandomForestClassifier", "params": {"n_estimators": 10, "random_state": 42}},
+        "nb": {"estimator": "BernoulliNB", "params": {"alpha": 0.5}},
+    },
+}
+
+
+@pytest.fixture(scope="module")
+def training():
+    X, y, features = train.load_dataset(train.TRAINING_CSV)
+    return X, y, list(features)
+
+
+@pytest.fixture(scope="module", params=sorted(PARAMS))
+def models(request, training):
+    X, y, _ = training
+    return train.train_models(X, y, PARAMS[request.param])
+
+
+def assert_equivalent(models, X, nb_atol=1e-9):
+    compiled_models = compiled.compile_models(models)
+    for key, model in models.items():
+        atol = nb_atol if type(model).__name__ == "GaussianNB" else 1e-9
+        np.testing.assert_array_equal(compiled_models[key].predict(X), model.predict(X), err_msg=key)
+        np.testing.assert_allclose(
+            compiled_models[key].predict_proba(X), model.predict_proba(X), rtol=0, atol=atol, err_msg=key
+        )
+
+
+def test_matches_sklearn_on_testing_csv(models, training):
+    assert_equivalent(models, compiled.testing_rows(training[2]))
+
+
+def test_matches_sklearn_on_random_vectors(models, training):
+    rng = np.random.default_rng(42)
+    n_features = len(training[2])
+    # Sparse rows like real cases as well as dense ones
+    X = np.concatenate([
+        rng.random((10000, n_features)) < 0.04,
+        rng.random((2000, n_features)) < 0.5,
+    ]).astype(np.float32)
+    # GaussianNB's joint log likelihoods reach ~1e11, where sklearn's
+    # logsumexp normalization itself rounds in the sixth decimal or so; the
+    # compiled engine subtracts the maximum first
+    assert_equivalent(models, X, nb_atol=1e-4)
@@ -0,0 +1,56 @@
+import time
+
+import pytest
+from PIL import Image
+
+import imaging
+import train_image
+
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory):
+    # Two labels of plain red and blue pictures
+    directory = tmp_path_factory.mktemp("images")
+    for label, color in (("red", (220, 30, 30)), ("blue", (30, 30, 220))):
+        (directory / label).mkdir()
+        for i in range(4):
+            shade = tuple(min(255, c + 8 * i) for c in color)
+            Image.new("RGB", (40 + i, 30), shade).save(directory / label / f"{i}.png")
+    path = str(directory / "image_model.joblib")
+    train_image.save_model(train_image.build_model(str(directory), (8, 8)), path)
+    return path
+
+
+def test_trained_model_classifies_through_the_pool(model_path, tmp_path):
+    image = tmp_path / "photo.jpg"
+    Image.new("RGB", (640, 480), (200, 40, 40)).save(image)
+    analyzer = imaging.ImageAnalyzer(model_path, workers=1, timeout=60)
+    try:
+        assert analyzer.available
+        predictions = analyzer.analyze(str(image))
+    finally:
+        analyzer.shutdown()
+    assert predictions[0]["label"] == "red"
+    assert analyzer.pending == 0
+
+
+def test_timed_out_job_keeps_its_slot_until_it_finishes(model_path, tmp_path):
+    image = tmp_path / "photo.png"
+    Image.new("RGB", (64, 64), (40, 40, 200)).save(image)
+    # The first job also waits for the pool process to start and load the model
+    analyzer = imaging.ImageAnalyzer(model_path, workers=1, queue_size=1, timeout=0.01)
+    try:
+        with pytest.raises(TimeoutError):
+            analyzer.analyze(str(image))
+        with pytest.raises(imaging.QueueFull):
+            analyzer.analyze(str(image))
+        deadline = time.monotonic() + 60
+        while analyzer.pending and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert analyzer.pending == 0
+    finally:
+        analyzer.shutdown()
+
+
+def test_missing_model_is_not_available(tmp_path):
+    assert not imaging.ImageAnalyzer(str(tmp_path / "image_model.joblib")).available
@@ -0,0 +1,24 @@
+import numpy as np
+
+import train
+from conditions import disease
+from inference import SymptomModels, base_feature, symptom_columns
+
+
+def test_repeated_column_is_set_with_its_symptom():
+    _, _, features = train.load_dataset(train.TRAINING_CSV)
+    features = list(features)
+    columns = symptom_columns(features)
+    both = [features.index("fluid_overload"), features.index("fluid_overload.1")]
+    assert columns["fluid_overload"] == both
+    assert columns["fluid_overload_1"] == both
+    assert base_feature("fluid_overload.1", features) == "fluid_overload"
+    assert all(len(columns[feature]) == 1 for feature in features if not feature.startswith("fluid_overload"))
+
+
+def test_fluid_overload_changes_the_prediction():
+    X, y, features = train.load_dataset(train.TRAINING_CSV)
+    models = SymptomModels(train.train_models(X, y), features, disease)
+    X_with, _ = models.encode([["fluid_overload", "yellowish_skin"]])
+    X_without, _ = models.encode([["yellowish_skin"]])
+    assert not np.allclose(models.predict_proba(X_with)[0], models.predict_proba(X_without)[0])
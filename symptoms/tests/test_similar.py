@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+import bitset
+import train
+from similar import load_index
+
+
+@pytest.fixture(scope="module")
+def index():
+    return load_index(train.TRAINING_CSV)
+
+
+def brute_force(index, cols, k):
+    # Every pattern ranked by Jaccard similarity, then row count, then id
+    flags = bitset.unpack(index.bits, len(index.columns)).astype(bool)
+    query = np.zeros(len(index.columns), dtype=bool)
+    query[cols] = True
+    shared = (flags & query).sum(axis=1)
+    similarity = shared / (flags | query).sum(axis=1)
+    ids = np.flatnonzero(shared)
+    order = np.lexsort((ids, -index.counts[ids], -similarity[ids]))[:k]
+    return ids[order], similarity[ids[order]]
+
+
+def test_ties_at_the_cutoff_go_to_the_most_recorded_pattern(index):
+    cols, _ = index.columns_of(["chest_pain"])
+    ids, _, _ = index.query(cols, 5)
+    expected, _ = brute_force(index, cols, 5)
+    assert index.counts[ids].tolist() == index.counts[expected].tolist()
+
+
+def test_query_matches_brute_force(index):
+    rng = np.random.default_rng(0)
+    for _ in range(500):
+        cols = sorted(rng.choice(len(index.columns), size=rng.integers(1, 7), replace=False).tolist())
+        k = int(rng.integers(1, 20))
+        ids, similarity, shared = index.query(cols, k)
+        expected, expected_similarity = brute_force(index, cols, k)
+        assert ids.tolist() == expected.tolist()
+        np.testing.assert_allclose(similarity, expected_similarity)
@@ -0,0 +1,115 @@
+# Free-text symptom extraction.
+#
+# Every symptom feature name and synonym is compiled into one Aho-Corasick
+# automaton, so a transcript is scanned in a single pass whatever the size of
+# the synonym dictionary. Text and phrases are normalized the same way:
+# lowercase, with every run of characters other than letters and digits
+# turned into one space. "foul_smell_of urine", "Foul smell of urine!" and
+# "foul-smell-of-urine" all read "foul smell of urine". Phrases are padded
+# with spaces so they only match whole words.
+import re
+from collections import deque
+
+_SEPARATORS = re.compile(r"[^a-z0-9]+")
+
+# pandas suffix for a repeated CSV column, e.g. "fluid_overload.1"
+_DUPLICATE_SUFFIX = re.compile(r"\.\d+$")
+
+
+def normalize(text):
+    return _SEPARATORS.sub(" ", text.lower()).strip()
+
+
+def feature_phrase(feature):
+    return normalize(_DUPLICATE_SUFFIX.sub("", feature))
+
+
+class SymptomMatcher:
+    def __init__(self, features, synonyms=None):
+        # phrase -> features it stands for; a phrase may name several columns
+        phrases = {}
+        for feature in features:
+            phrases.setdefault(feature_phrase(feature), []).append(feature)
+        known = set(features)
+        for feature, words in (synonyms or {}).items():
+            if feature not in known:
+                continue
+            for word in words:
+                targets = phrases.setdefault(normalize(word), [])
+                if feature not in targets:
+                    targets.append(feature)
+        phrases.pop("", None)
+
+        self.patterns = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for phrase, targets in phrases.items():
+            self._add(f" {phrase} ", targets)
+        self._build()
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def _add(self, pattern, targets):
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = next_state
+        self._out[state].append(len(self.patterns))
+        self.patterns.append((pattern, targets))
+
+    def _build(self):
+        # Breadth-first failure links; each state also reports the patterns
+        # of its failure state, which are suffixes of its own
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                self._out[next_state].extend(self._out[self._fail[next_state]])
+
+    def find(self, text):
+        # (start, end, pattern id) of every phrase occurrence, overlaps included
+        text = f" {normalize(text)} "
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        matches = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pattern_id in out[state]:
+                matches.append((i + 1 - len(self.patterns[pattern_id][0]), i + 1, pattern_id))
+        return matches
+
+    def extract(self, text):
+        # Features mentioned in the text, in order of first mention. A phrase
+        # inside a longer matched phrase ("fever" in "high fever") is ignored.
+        matches = sorted(self.find(text), key=lambda m: (m[0], -m[1]))
+        features = []
+        seen = set()
+        covered = 0
+        for start, end, pattern_id in matches:
+            # Adjacent phrases share one padding space, which still counts
+            # as a separate mention because the later one ends further right
+            if end <= covered:
+                continue
+            covered = end
+            for feature in self.patterns[pattern_id][1]:
+                if feature not in seen:
+                    seen.add(feature)
+                    features.append(feature)
+        return features
@@ -0,0 +1,160 @@
+# Train the symptom models and export them as a versioned artifact.
+#
+# The symptom features are the columns of the training CSV. Cases appended
+# through the API (see retrain.py) are trained on as well when present. The
+# model settings come from params.json in the artifact directory, written by
+# tune.py, and fall back to DEFAULT_PARAMS.
+#
+# Usage: python train.py [--training Training.csv] [--appended cases.csv] [--output artifacts/]
+import argparse
+import importlib
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+import bitset
+import calibration
+import dataset
+import model_store
+from conditions import disease
+from inference import parse_weights
+
+logger = logging.getLogger(__name__)
+
+TRAINING_CSV = os.path.join(model_store.BASE_DIR, "Training.csv")
+TESTING_CSV = os.path.join(model_store.BASE_DIR, "Testing.csv")
+APPENDED_CSV = os.environ.get("APPENDED_CASES_CSV", os.path.join(model_store.BASE_DIR, "data", "appended_cases.csv"))
+# Tuned model settings in the artifact directory, see tune.py
+PARAMS_FILE = "params.json"
+
+# Estimators a model slot may use and their modules, imported on first use so
+# that a server which only loads an artifact never imports the training code
+ESTIMATORS = {
+    "DecisionTreeClassifier": "sklearn.tree",
+    "RandomForestClassifier": "sklearn.ensemble",
+    "GaussianNB": "sklearn.naive_bayes",
+    "BernoulliNB": "sklearn.naive_bayes",
+}
+
+# Estimator and settings of each model slot unless params.json says otherwise
+DEFAULT_PARAMS = {
+    "dt": {"estimator": "DecisionTreeClassifier", "params": {"max_depth": 5, "random_state": 42}},
+    "rf": {"estimator": "RandomForestClassifier", "params": {"n_estimators": 50, "max_depth": 5, "random_state": 42}},
+    "nb": {"estimator": "GaussianNB", "params": {}},
+}
+
+
+def estimator_class(name):
+    return getattr(importlib.import_module(ESTIMATORS[name]), name)
+
+
+def make_estimator(spec):
+    return estimator_class(spec["estimator"])(**spec["params"])
+
+
+def load_params(directory=model_store.DEFAULT_ARTIFACT_DIR):
+    path = os.path.join(directory, PARAMS_FILE)
+    try:
+        with open(path) as f:
+            params = json.load(f)
+    except FileNotFoundError:
+        return DEFAULT_PARAMS
+    for key, spec in params.items():
+        if key not in DEFAULT_PARAMS or spec.get("estimator") not in ESTIMATORS:
+            raise ValueError(f"Invalid model settings for {key} in {path}")
+    return dict(DEFAULT_PARAMS, **params)
+
+
+def save_params(params, directory=model_store.DEFAULT_ARTIFACT_DIR):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, PARAMS_FILE)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(params, f, indent=2)
+    os.replace(tmp, path)
+
+
+def train_models(X, y, params=DEFAULT_PARAMS):
+    models = {}
+    for key, spec in params.items():
+        models[key] = make_estimator(spec)
+        models[key].fit(X, y)
+    return models
+
+
+def load_dataset(path, appended_csv=None):
+    # Symptom matrix in CSV column order, labels and the column names. Appended
+    # cases must follow the same schema. Rows are shuffled to avoid order bias
+    # while still packed, and only unpacked for fitting.
+    from sklearn.utils import shuffle
+
+    data = dataset.load(path)
+    bits = np.asarray(data.bits)
+    y = np.asarray(data.y)
+    if appended_csv and os.path.exists(appended_csv):
+        appended = dataset.load(appended_csv)
+        dataset.check_columns(appended.columns, data.columns, appended_csv)
+        bits = np.concatenate([bits, appended.bits])
+        y = np.concatenate([y, appended.y])
+    bits, y = shuffle(bits, y, random_state=42)
+    return bitset.unpack(bits, len(data.columns)), y, data.columns
+
+
+def build_artifact(training_csv=TRAINING_CSV, appended_csv=APPENDED_CSV, params=None, weights=None):
+    logger.info(f"Training models from {training_csv}...")
+    started = time.perf_counter()
+    params = params or load_params()
+    # Calibrate for the weights the server fuses with, see calibration.py
+    weights = weights or parse_weights(os.environ.get("ENSEMBLE_WEIGHTS", ""))
+    # Fit on plain arrays so inference can skip sklearn's feature-name check;
+    # the feature order is stored in the artifact and checked at load time
+    X, y, features = load_dataset(training_csv, appended_csv)
+    models = train_models(X, y, params)
+    elapsed = time.perf_counter() - started
+    logger.info(f"Models trained on {len(y)} rows in {elapsed:.2f}s")
+    started = time.perf_counter()
+    fitted = calibration.fit(X, y, params, list(features), list(disease), weights)
+    logger.info(
+        f"Confidence calibrated in {time.perf_counter() - started:.2f}s, "
+        f"held-out ECE {fitted['ece']['uncalibrated']} -> {fitted['ece']['calibrated']}"
+    )
+    return {
+        "models": models,
+        "features": list(features),
+        "labels": list(disease),
+        "calibration": fitted,
+        "params": params,
+        "training_rows": len(y),
+        "training_seconds": round(elapsed, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the symptom models and export them as an artifact.")
+    parser.add_argument("--training", default=TRAINING_CSV, help="training CSV file")
+    parser.add_argument("--appended", default=APPENDED_CSV, help="CSV of cases appended through the API")
+    parser.add_argument("--output", default=model_store.DEFAULT_ARTIFACT_DIR, help="artifact directory")
+    parser.add_argument("--weights", default=os.environ.get("ENSEMBLE_WEIGHTS", ""),
+                        help="ensemble weights the calibration is fitted for, e.g. dt:1,rf:2,nb:1")
+    args = parser.parse_args(argv)
+
+    artifact = build_artifact(args.training, args.appended, load_params(args.output), parse_weights(args.weights))
+    manifest = model_store.save_artifact(
+        artifact["models"], artifact["features"], artifact["labels"],
+        directory=args.output, calibration=artifact["calibration"],
+        metadata={
+            "params": artifact["params"],
+            "training_file": os.path.basename(args.training),
+            "training_rows": artifact["training_rows"],
+            "training_seconds": artifact["training_seconds"],
+        },
+    )
+    print(f"Exported model artifact {manifest['model_version']} to {args.output}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
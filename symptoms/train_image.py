@@ -0,0 +1,103 @@
+# Train the image model served by /analyze-image (see imaging.py).
+#
+# The training images are laid out one folder per label:
+#   images/
+#     eczema/*.jpg
+#     psoriasis/*.png
+#     ...
+# and an optional images/descriptions.json maps labels to the short
+# explanation shown with a diagnosis. Every image is decoded and resized
+# exactly as the server does it, and a multinomial logistic regression is
+# fitted on the flattened pixels. The bundle is written to the server's
+# default IMAGE_MODEL_PATH, artifacts/image_model.joblib, so a server started
+# afterwards picks it up without configuration.
+#
+# Usage: python train_image.py images/ [--output artifacts/image_model.joblib] [--size 64] [--mode RGB]
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+import imaging
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp")
+DESCRIPTIONS_FILE = "descriptions.json"
+
+
+def load_images(directory, size, mode):
+    # Pixel rows, label indexes and the labels in folder name order
+    labels = sorted(
+        name for name in os.listdir(directory) if os.path.isdir(os.path.join(directory, name))
+    )
+    rows = []
+    y = []
+    for label_index, label in enumerate(labels):
+        folder = os.path.join(directory, label)
+        for name in sorted(os.listdir(folder)):
+            if not name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            path = os.path.join(folder, name)
+            try:
+                rows.append(imaging.load_pixels(path, size, mode))
+            except Exception as e:
+                logger.warning(f"Skipping unreadable image {path}: {e}")
+                continue
+            y.append(label_index)
+    if len(set(y)) < 2:
+        raise ValueError(f"{directory} needs images in at least two label folders")
+    return np.stack(rows), np.asarray(y), labels
+
+
+def build_model(directory, size=(64, 64), mode="RGB"):
+    from sklearn.linear_model import LogisticRegression
+
+    started = time.perf_counter()
+    X, y, labels = load_images(directory, size, mode)
+    model = LogisticRegression(max_iter=1000).fit(X, y)
+    descriptions = {}
+    path = os.path.join(directory, DESCRIPTIONS_FILE)
+    if os.path.exists(path):
+        with open(path) as f:
+            descriptions = json.load(f)
+    logger.info(f"Image model trained on {len(y)} images of {len(labels)} labels in {time.perf_counter() - started:.2f}s")
+    return {"model": model, "labels": labels, "size": list(size), "mode": mode, "descriptions": descriptions}
+
+
+def save_model(spec, path):
+    # Written to a temporary file and renamed, so a server never loads a
+    # half-written model
+    import joblib
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(spec, tmp)
+    os.replace(tmp, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the /analyze-image model from a folder of labeled images.")
+    parser.add_argument("images", help="directory with one folder of images per label")
+    parser.add_argument("--output", default=imaging.DEFAULT_IMAGE_MODEL_PATH, help="image model file")
+    parser.add_argument("--size", type=int, default=64, help="width and height of the model input")
+    parser.add_argument("--mode", default="RGB", help="Pillow mode of the model input, e.g. L or RGB")
+    args = parser.parse_args(argv)
+
+    try:
+        spec = build_model(args.images, (args.size, args.size), args.mode)
+    except (OSError, ValueError) as e:
+        print(f"Cannot train the image model: {e}", file=sys.stderr)
+        return 1
+    save_model(spec, args.output)
+    print(f"Exported image model with labels {spec['labels']} to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
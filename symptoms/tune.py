@@ -0,0 +1,222 @@
+# Hyperparameter search and model selection for the symptom models.
+#
+# Every model slot (decision tree, random forest, naive Bayes) is searched
+# with a cross-validated grid over its candidate estimators; the naive Bayes
+# slot also tries BernoulliNB, which models the 0/1 symptom flags directly.
+# The searches and the final fits run in parallel across all cores through
+# joblib. Each candidate configuration is then refit on the full training
+# data and measured for
+#   - cross-validated and Testing.csv accuracy,
+#   - median single-row predict_proba latency, timed one candidate at a time
+#     so the measurements do not compete for cores, and
+#   - pickled model size.
+# Per slot, the configurations not beaten on all three of accuracy, latency
+# and size form the Pareto front. The one served is the fastest (then
+# smallest) front member whose cross-validated accuracy is within
+# --tolerance of the best. The choice is written to params.json in the
+# artifact directory, where train.py and the retrainer's refits pick it up,
+# and exported as a new artifact.
+#
+# Usage: python tune.py [--jobs -1] [--folds 5] [--tolerance 0.005] [--engine sklearn|compiled]
+#                       [--report tuning.json] [--output artifacts/] [--no-export]
+import argparse
+import json
+import logging
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.model_selection import GridSearchCV, StratifiedKFold
+
+import dataset
+import model_store
+import train
+
+logger = logging.getLogger(__name__)
+
+# Candidate estimators and parameter grids of each model slot. random_state
+# is fixed so a configuration always trains to the same model.
+SEARCH_SPACE = {
+    "dt": [
+        ("DecisionTreeClassifier", {
+            "max_depth": [5, 10, 20, None],
+            "min_samples_leaf": [1, 2, 5],
+            "criterion": ["gini", "entropy"],
+            "random_state": [42],
+        }),
+    ],
+    "rf": [
+        ("RandomForestClassifier", {
+            "n_estimators": [10, 25, 50, 100],
+            "max_depth": [5, 10, None],
+            "max_features": ["sqrt", "log2"],
+            "random_state": [42],
+        }),
+    ],
+    "nb": [
+        ("GaussianNB", {"var_smoothing": [1e-9, 1e-6, 1e-3, 1e-1]}),
+        ("BernoulliNB", {"alpha": [0.01, 0.1, 0.5, 1.0]}),
+    ],
+}
+
+
+def search(key, X, y, folds, jobs):
+    # Cross-validated accuracy of every configuration of one slot
+    cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=42)
+    candidates = []
+    for name, grid in SEARCH_SPACE[key]:
+        started = time.perf_counter()
+        grid_search = GridSearchCV(train.estimator_class(name)(), grid, cv=cv, n_jobs=jobs, refit=False)
+        grid_search.fit(X, y)
+        results = grid_search.cv_results_
+        logger.info(f"{key}: searched {len(results['params'])} {name} configurations "
+                    f"in {time.perf_counter() - started:.1f}s")
+        for params, mean, std in zip(results["params"], results["mean_test_score"], results["std_test_score"]):
+            candidates.append({
+                "estimator": name,
+                "params": params,
+                "cvAccuracy": round(float(mean), 4),
+                "cvStd": round(float(std), 4),
+            })
+    return candidates
+
+
+def fit(spec, X, y):
+    model = train.make_estimator(spec)
+    model.fit(X, y)
+    return model
+
+
+def latency_micros(model, rows, repeat):
+    for row in rows[:10]:
+        model.predict_proba(row)
+    samples = []
+    for i in range(repeat):
+        row = rows[i % len(rows)]
+        started = time.perf_counter()
+        model.predict_proba(row)
+        samples.append(time.perf_counter() - started)
+    return float(np.median(samples)) * 1e6
+
+
+def measure(candidates, models, X_test, y_test, engine, repeat):
+    rows = [X_test[i:i + 1] for i in range(len(X_test))]
+    for candidate, model in zip(candidates, models):
+        if engine == "compiled":
+            import compiled
+            model = compiled.compile_model(model)
+        candidate["testAccuracy"] = round(float(np.mean(model.predict(X_test) == y_test)), 4)
+        candidate["latencyMicros"] = round(latency_micros(model, rows, repeat), 1)
+        candidate["sizeBytes"] = len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def dominates(a, b):
+    # a is at least as good as b on every objective and better on one
+    at_least = (a["cvAccuracy"] >= b["cvAccuracy"] and a["latencyMicros"] <= b["latencyMicros"]
+                and a["sizeBytes"] <= b["sizeBytes"])
+    better = (a["cvAccuracy"] > b["cvAccuracy"] or a["latencyMicros"] < b["latencyMicros"]
+              or a["sizeBytes"] < b["sizeBytes"])
+    return at_least and better
+
+
+def pareto_front(candidates):
+    return [c for c in candidates if not any(dominates(other, c) for other in candidates)]
+
+
+def select(front, tolerance):
+    best = max(c["cvAccuracy"] for c in front)
+    eligible = [c for c in front if c["cvAccuracy"] >= best - tolerance]
+    return min(eligible, key=lambda c: (c["latencyMicros"], c["sizeBytes"], -c["cvAccuracy"]))
+
+
+def tune(X, y, X_test, y_test, folds=5, jobs=-1, tolerance=0.005, engine="sklearn", repeat=200):
+    # Returns (selected params per slot, report)
+    selected = {}
+    report = {
+        "generatedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "trainingRows": int(len(y)),
+        "testRows": int(len(y_test)),
+        "folds": folds,
+        "tolerance": tolerance,
+        "engine": engine,
+        "models": {},
+    }
+    for key in SEARCH_SPACE:
+        candidates = search(key, X, y, folds, jobs)
+        started = time.perf_counter()
+        models = Parallel(n_jobs=jobs)(delayed(fit)(c, X, y) for c in candidates)
+        logger.info(f"{key}: fitted {len(models)} configurations in {time.perf_counter() - started:.1f}s")
+        measure(candidates, models, X_test, y_test, engine, repeat)
+
+        front = pareto_front(candidates)
+        choice = select(front, tolerance)
+        selected[key] = {"estimator": choice["estimator"], "params": choice["params"]}
+        report["models"][key] = {
+            "selected": choice,
+            "paretoFront": sorted(front, key=lambda c: c["latencyMicros"]),
+            "candidates": candidates,
+        }
+    return selected, report
+
+
+def summary(report):
+    return {
+        key: {field: result["selected"][field] for field in ("estimator", "cvAccuracy", "latencyMicros", "sizeBytes")}
+        for key, result in report["models"].items()
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tune the symptom models and export the selected configuration.")
+    parser.add_argument("--training", default=train.TRAINING_CSV, help="training CSV file")
+    parser.add_argument("--appended", default=train.APPENDED_CSV, help="CSV of cases appended through the API")
+    parser.add_argument("--jobs", type=int, default=-1, help="parallel jobs; -1 uses every core")
+    parser.add_argument("--folds", type=int, default=5, help="cross-validation folds")
+    parser.add_argument("--tolerance", type=float, default=0.005,
+                        help="accuracy below the best that may be traded for speed and size")
+    parser.add_argument("--engine", choices=["sklearn", "compiled"], default=os.environ.get("INFERENCE_ENGINE", "sklearn"),
+                        help="inference engine to time")
+    parser.add_argument("--repeat", type=int, default=200, help="single-row predictions timed per configuration")
+    parser.add_argument("--report", help="write the JSON report to this file")
+    parser.add_argument("--output", default=model_store.DEFAULT_ARTIFACT_DIR, help="artifact directory")
+    parser.add_argument("--no-export", action="store_true", help="only report, keep the current params and artifact")
+    args = parser.parse_args(argv)
+
+    X, y, features = train.load_dataset(args.training, args.appended)
+    testing = dataset.load(train.TESTING_CSV)
+    X_test = testing.matrix(features, dtype=np.float32)
+    y_test = np.asarray(testing.y)
+
+    selected, report = tune(X, y, X_test, y_test, args.folds, args.jobs, args.tolerance, args.engine, args.repeat)
+    if args.report:
+        with open(args.report, "w") as f:
+            f.write(json.dumps(report, indent=2) + "\n")
+    for key, result in summary(report).items():
+        print(f"{key}: {result['estimator']} {selected[key]['params']} cv accuracy {result['cvAccuracy']}, "
+              f"{result['latencyMicros']}us, {result['sizeBytes']} bytes")
+    if args.no_export:
+        return 0
+
+    train.save_params(selected, args.output)
+    artifact = train.build_artifact(args.training, args.appended, selected)
+    manifest = model_store.save_artifact(
+        artifact["models"], artifact["features"], artifact["labels"],
+        directory=args.output, calibration=artifact["calibration"],
+        metadata={
+            "params": selected,
+            "tuning": summary(report),
+            "training_file": os.path.basename(args.training),
+            "training_rows": artifact["training_rows"],
+            "training_seconds": artifact["training_seconds"],
+        },
+    )
+    print(f"Exported model artifact {manifest['model_version']} to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())